@@ -0,0 +1,391 @@
+"""
+向量化的用户—波束分配核
+
+assign_users_to_beams 的语义：按用户顺序逐个分配，每个用户在覆盖它且未满员的开启波束中选择
+(已分配用户数, -功率) 最小者，并列时取字典顺序靠前的波束。
+
+1. 候选计算：站点较少时按用户分块计算 用户×站点 的距离矩阵，按所属站点展开到各个波束，
+   再对覆盖圆内的组合计算方位角并套用扇区掩码（dense_candidates）；站点较多时使用 beam_index 的网格索引。
+2. 容量与并列的处理：用户的选择只会影响与它共享候选波束的用户，按“同一用户的候选波束相连”
+   划分连通分量后各分量互不影响。只含一个波束的分量中，用户都只有这一个候选，
+   贪心结果就是按用户顺序的前 max_users 个，用一次稳定排序求组内名次即可；
+   含多个波束的分量与用户顺序和实时计数相关，对这部分用户按原顺序执行贪心（greedy_assign）。
+两部分结果与原实现逐用户一致。
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from BackEnd.beam_index import (EARTH_RADIUS_KM, MIN_CELL, BeamSiteIndex, beam_sites, chord_length, greedy_assign,
+                               in_sector, unit_vectors, user_bearing, within_beams)
+from BackEnd.spatial_index import expand_ranges, neighbor_offsets, pack_cells
+
+# 稠密计算时每块最多处理的 用户×站点 组合数
+_BLOCK = 1 << 22
+# 站点数不超过该值时使用稠密计算
+_DENSE_SITES = 16
+# 波束半径在建立 AssignmentState 后被调大时，格子层数超过该值就直接检查全部用户（偏移数随层数三次方增长）
+_MAX_REACH = 3
+
+
+def _csr(users: np.ndarray, beams: np.ndarray, n_users: int) -> Tuple[np.ndarray, np.ndarray]:
+    """（用户, 波束）对转换为按用户分组、组内波束行号升序的 CSR"""
+    order = np.lexsort((beams, users))
+    indptr = np.zeros(n_users + 1, dtype=np.int64)
+    np.cumsum(np.bincount(users, minlength=n_users), out=indptr[1:])
+    return indptr, beams[order]
+
+
+def dense_candidates(positions, columns, block: int = _BLOCK) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    分块计算 用户×站点 的距离矩阵，展开到各个波束后对覆盖圆内的组合计算方位角并套用扇区掩码
+
+    参数:
+        positions: (U, 2) 用户经纬度
+        columns: beam_index.beam_columns 的结果
+
+    返回:
+        (np.ndarray, np.ndarray): CSR 形式的 indptr 与波束行号，同 BeamSiteIndex.candidates
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    n = positions.shape[0]
+    rows, sites, site_of = beam_sites(columns)
+    radius = columns["radius"][rows]
+    azimuth = columns["azimuth"][rows]
+    beamwidth = columns["beamwidth"][rows]
+    # 站点 -> 波束（rows 中的下标，CSR）
+    site_beams = np.argsort(site_of, kind="stable")
+    site_indptr = np.zeros(sites.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(site_of, minlength=sites.shape[0]), out=site_indptr[1:])
+    site_radius = np.full(sites.shape[0], -np.inf)
+    np.maximum.at(site_radius, site_of, radius)
+    # 只与单个用户或单个站点有关的项（弧度、纬度余弦）各算一次，再广播为矩阵
+    site_lat, site_lon = np.radians(sites[:, 0]), np.radians(sites[:, 1])
+    site_cos = np.cos(site_lat)
+    users_parts, beams_parts = [], []
+    batch = max(1, block // max(sites.shape[0], 1))
+    for start in range(0, n if rows.size else 0, batch):
+        stop = min(start + batch, n)
+        lat, lon = positions[start:stop, 0], positions[start:stop, 1]
+        lat2, lon2 = np.radians(lat)[:, None], np.radians(lon)[:, None]
+        a = np.sin((lat2 - site_lat) / 2) ** 2 + site_cos * np.cos(lat2) * np.sin((lon2 - site_lon) / 2) ** 2
+        distance = EARTH_RADIUS_KM * (2 * np.arcsin(np.sqrt(a)))
+        # 先按站点最大覆盖半径筛选，再展开到站点的各个波束；方位角只对覆盖圆内的组合计算
+        u, site = np.nonzero(distance <= site_radius)
+        pair, index = expand_ranges(site_indptr[site], site_indptr[site + 1])
+        k = site_beams[index]
+        inside = distance[u, site][pair] <= radius[k]
+        u, site, k = u[pair][inside], site[pair][inside], k[inside]
+        sector = in_sector(user_bearing(lat[u], lon[u], sites[site, 0], sites[site, 1]), azimuth[k], beamwidth[k])
+        users_parts.append(u[sector] + start)
+        beams_parts.append(rows[k[sector]])
+    if not users_parts:
+        return np.zeros(n + 1, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return _csr(np.concatenate(users_parts), np.concatenate(beams_parts), n)
+
+
+def beam_components(indptr: np.ndarray, beam_rows: np.ndarray, n_beams: int) -> np.ndarray:
+    """
+    候选关系的连通分量：同一用户的候选波束属于同一分量
+
+    返回:
+        np.ndarray: 每个波束所在分量的标号（分量内最小的波束行号）
+    """
+    label = np.arange(n_beams)
+    counts = np.diff(indptr)
+    shared = np.repeat(counts > 1, counts)
+    if not shared.any():
+        return label
+    owner = np.repeat(np.arange(counts.size), counts)[shared]
+    first = beam_rows[indptr[owner]]
+    other = beam_rows[shared]
+    while True:
+        smaller = np.minimum(label[first], label[other])
+        updated = label.copy()
+        np.minimum.at(updated, first, smaller)
+        np.minimum.at(updated, other, smaller)
+        updated = updated[updated]
+        if np.array_equal(updated, label):
+            return label
+        label = updated
+
+
+def resolve_assignment(indptr: np.ndarray, beam_rows: np.ndarray, max_users, power) -> np.ndarray:
+    """
+    在候选表上求与原贪心逐用户一致的分配结果
+
+    参数:
+        indptr / beam_rows: 候选表（CSR，组内波束行号升序）
+        max_users / power: 每个波束的容量与功率（按行号）
+
+    返回:
+        np.ndarray: 每个用户分配到的波束行号，未分配为 -1
+    """
+    capacity = np.asarray(max_users)
+    n_users = indptr.size - 1
+    assigned = np.full(n_users, -1, dtype=np.int64)
+    counts = np.diff(indptr)
+    served = np.flatnonzero(counts > 0)
+    if served.size == 0:
+        return assigned
+    label = beam_components(indptr, beam_rows, capacity.size)
+    first = beam_rows[indptr[served]]
+    comp_size = np.bincount(label, minlength=capacity.size)
+    simple = comp_size[label[first]] == 1
+
+    # 单波束分量：按用户顺序取前 max_users 个
+    users, beams = served[simple], first[simple]
+    order = np.argsort(beams, kind="stable")
+    users, beams = users[order], beams[order]
+    group_start = np.ones(beams.size, dtype=bool)
+    group_start[1:] = beams[1:] != beams[:-1]
+    starts = np.flatnonzero(group_start)
+    rank = np.arange(beams.size) - np.repeat(starts, np.diff(np.append(starts, beams.size)))
+    accept = rank < capacity[beams]
+    assigned[users[accept]] = beams[accept]
+
+    # 多波束分量：按原顺序贪心
+    contested = served[~simple]
+    if contested.size:
+        sub_indptr = np.zeros(contested.size + 1, dtype=np.int64)
+        np.cumsum(counts[contested], out=sub_indptr[1:])
+        sub_rows = beam_rows[expand_ranges(indptr[contested], indptr[contested + 1])[1]]
+        assigned[contested] = greedy_assign(sub_indptr, sub_rows, capacity.tolist(), list(power))
+    return assigned
+
+
+def candidate_table(positions, columns, dense_sites: Optional[int] = _DENSE_SITES) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    全部用户的候选波束表
+
+    参数:
+        positions / columns / dense_sites: 同 assign_users
+
+    返回:
+        (np.ndarray, np.ndarray): CSR 候选表 (indptr, beam_rows)，组内波束行号升序
+    """
+    _, sites, _ = beam_sites(columns)
+    if dense_sites is not None and sites.shape[0] <= dense_sites:
+        return dense_candidates(positions, columns)
+    return BeamSiteIndex(columns).candidates(positions)
+
+
+def assign_users(positions, columns, max_users, power, dense_sites: Optional[int] = _DENSE_SITES) -> np.ndarray:
+    """
+    计算全部用户的分配结果
+
+    参数:
+        positions: (U, 2) 用户经纬度（按分配顺序）
+        columns: beam_index.beam_columns 的结果
+        max_users / power: 每个波束的容量与功率
+        dense_sites: 站点数不超过该值时使用稠密计算，为 None 时总是使用网格索引
+
+    返回:
+        np.ndarray: 每个用户分配到的波束行号，未分配为 -1
+    """
+    indptr, beam_rows = candidate_table(positions, columns, dense_sites)
+    return resolve_assignment(indptr, beam_rows, max_users, power)
+
+
+
+class AssignmentState:
+    """
+    一次全量分配的结果与索引，用于单个波束参数变化后的增量重分配
+
+    覆盖关系保存为按用户分组的 CSR 候选表，另存每个波束覆盖的用户（与容量无关）。
+    波束变化后候选改变的用户，其新候选先放在字典中，不移动整个 CSR；累计到用户数的 1/8 后再合并。
+    波束 b 的参数变化时只有 b 新旧覆盖范围内用户的候选表改变；由 resolve_assignment 的分量划分可知，
+    与 b 不连通的分量结果不变，只需对“新旧覆盖关系的并集中与 b 连通的波束”覆盖的用户按原顺序重新分配。
+    用户按单位向量网格排序，查询单个波束的覆盖范围时只检查站点附近的格子。
+
+    用法:
+        state = AssignmentState(positions, columns, max_users, power)
+        users, rows, beams = state.update_beam(row, columns, max_users, power)
+    """
+
+    COLUMNS = ("lat", "lon", "radius", "azimuth", "beamwidth", "active")
+
+    def __init__(self, positions, columns, max_users, power, dense_sites: Optional[int] = _DENSE_SITES):
+        """
+        参数:
+            positions / columns / max_users / power / dense_sites: 同 assign_users
+        """
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        self.columns = {key: np.array(columns[key]) for key in self.COLUMNS}
+        self.max_users = np.array(max_users)
+        self.power = np.array(power, dtype=np.float64)
+        n_users = self.positions.shape[0]
+        self.n_beams = n_beams = self.max_users.shape[0]
+
+        indptr, beam_rows = candidate_table(self.positions, self.columns, dense_sites)
+        users = np.repeat(np.arange(n_users), np.diff(indptr))
+        self._indptr, self._beam_rows = indptr, beam_rows
+        # 候选已改变、尚未合并回 CSR 的用户 -> 新候选（升序）
+        self._patched = {}
+        self._is_patched = np.zeros(n_users, dtype=bool)
+        self._patch_limit = max(n_users // 8, 64)
+        order = np.argsort(beam_rows, kind="stable")
+        bounds = np.zeros(n_beams + 1, dtype=np.int64)
+        np.cumsum(np.bincount(beam_rows, minlength=n_beams), out=bounds[1:])
+        by_beam = users[order]
+        self.beam_users = [by_beam[bounds[b]:bounds[b + 1]] for b in range(n_beams)]
+        self.assigned = resolve_assignment(indptr, beam_rows, self.max_users, self.power)
+
+        # 用户网格（格子边长取当前最大覆盖弦长）
+        self._vectors = unit_vectors(self.positions[:, 0], self.positions[:, 1])
+        self.cell_size = max(float(chord_length(self.columns["radius"]).max(initial=0.0)), MIN_CELL)
+        keys = pack_cells(np.floor(self._vectors / self.cell_size))
+        self._user_order = np.argsort(keys, kind="stable")
+        self._user_keys = keys[self._user_order]
+
+    def matches(self, row: int, columns, max_users, power) -> bool:
+        """除 row 以外的波束参数是否与缓存一致（不一致时需要全量重新分配）"""
+        if len(max_users) != self.n_beams:
+            return False
+        current = [(self.columns[key], np.asarray(columns[key])) for key in self.COLUMNS]
+        current += [(self.max_users, np.asarray(max_users)), (self.power, np.asarray(power, dtype=np.float64))]
+        for cached, value in current:
+            differ = cached != value
+            differ[row] = False
+            if differ.any():
+                return False
+        return True
+
+    def footprint(self, row: int) -> np.ndarray:
+        """波束 row 当前覆盖的用户（升序），只检查站点附近格子中的用户；覆盖范围远大于格子时检查全部用户"""
+        cols = self.columns
+        if not cols["active"][row] or cols["radius"][row] < 0 or self._user_keys.size == 0:
+            return np.empty(0, dtype=np.int64)
+        lat, lon, radius = cols["lat"][row], cols["lon"][row], cols["radius"][row]
+        reach = int(np.ceil((chord_length(radius) * (1 + 1e-6) + 1e-9) / self.cell_size))
+        if reach > _MAX_REACH:
+            users = np.arange(self.positions.shape[0])
+        else:
+            center = pack_cells(np.floor(unit_vectors(lat, lon) / self.cell_size))
+            keys = center + neighbor_offsets(reach)
+            lo = np.searchsorted(self._user_keys, keys, side="left")
+            hi = np.searchsorted(self._user_keys, keys, side="right")
+            users = self._user_order[expand_ranges(lo, hi)[1]]
+        inside = within_beams(self.positions[users, 0], self.positions[users, 1], lat, lon, radius,
+                              cols["azimuth"][row], cols["beamwidth"][row])
+        return np.sort(users[inside])
+
+    def _candidates(self, users: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """若干用户的候选表，CSR 形式"""
+        lo, hi = self._indptr[users], self._indptr[users + 1]
+        counts = hi - lo
+        is_patched = self._is_patched[users]
+        patched = np.flatnonzero(is_patched)
+        lists = [self._patched[user] for user in users[patched].tolist()]
+        counts[patched] = [beams.size for beams in lists]
+        indptr = np.zeros(users.size + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        if not lists:
+            return indptr, self._beam_rows[expand_ranges(lo, hi)[1]]
+        plain = np.flatnonzero(~is_patched)
+        beams = np.empty(indptr[-1], dtype=np.int64)
+        beams[expand_ranges(indptr[plain], indptr[plain + 1])[1]] = \
+            self._beam_rows[expand_ranges(lo[plain], hi[plain])[1]]
+        beams[expand_ranges(indptr[patched], indptr[patched + 1])[1]] = np.concatenate(lists)
+        return indptr, beams
+
+    def _patch(self, users: np.ndarray, row: int, added: np.ndarray):
+        """users（升序）的候选中去掉 row，再给其中属于 added 的用户加上 row"""
+        indptr, beams = self._candidates(users)
+        owner = np.repeat(np.arange(users.size), np.diff(indptr))
+        keep = beams != row
+        gained = np.searchsorted(users, added)
+        owner = np.concatenate([owner[keep], gained])
+        beams = np.concatenate([beams[keep], np.full(gained.size, row, dtype=np.int64)])
+        order = np.lexsort((beams, owner))
+        split = np.cumsum(np.bincount(owner, minlength=users.size))[:-1]
+        self._patched.update(zip(users.tolist(), np.split(beams[order], split)))
+        self._is_patched[users] = True
+        if len(self._patched) > self._patch_limit:
+            # 合并回 CSR，代价由此前的多次修改分摊
+            self._indptr, self._beam_rows = self._candidates(np.arange(self._is_patched.size))
+            self._patched.clear()
+            self._is_patched[:] = False
+
+    def update_beam(self, row: int, columns, max_users, power) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        波束 row 的参数变化后增量重新分配
+
+        参数:
+            row: 变化的波束行号
+            columns / max_users / power: 全部波束的当前参数（只读取 row 行）
+
+        返回:
+            (np.ndarray, np.ndarray, np.ndarray): 重新分配的用户（升序）、它们的新波束行号（-1 为未分配）、
+                                                  需要重建用户集合的波束行号
+        """
+        for key in self.COLUMNS:
+            self.columns[key][row] = columns[key][row]
+        self.max_users[row] = max_users[row]
+        self.power[row] = power[row]
+
+        old = self.beam_users[row]
+        new = self.footprint(row)
+        removed = np.setdiff1d(old, new, assume_unique=True)
+        added = np.setdiff1d(new, old, assume_unique=True)
+        if removed.size or added.size:
+            self._patch(np.union1d(removed, added), row, added)
+        self.beam_users[row] = new
+
+        # 在新旧覆盖关系的并集中找出与 row 连通的波束及其覆盖的用户
+        in_closure = np.zeros(self.n_beams, dtype=bool)
+        in_closure[row] = True
+        users = np.union1d(old, new)
+        pending = users
+        while pending.size:
+            _, beams = self._candidates(pending)
+            beams = np.unique(beams[~in_closure[beams]])
+            if beams.size == 0:
+                break
+            in_closure[beams] = True
+            reached = np.concatenate([self.beam_users[b] for b in beams.tolist()])
+            pending = np.setdiff1d(reached, users)
+            users = np.union1d(users, pending)
+
+        indptr, beam_rows = self._candidates(users)
+        rows = resolve_assignment(indptr, beam_rows, self.max_users, self.power)
+        self.assigned[users] = rows
+        return users, rows, np.flatnonzero(in_closure)
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from BackEnd.beam_control import BeamControlSystem
+    from BackEnd.beam_index import beam_columns
+    from BackEnd.beam_logic import BeamDataManager
+
+    random.seed(1)
+    np.random.seed(1)
+    bcs = BeamControlSystem(60, 300, 2000, [800, 1800, 2600], BeamDataManager.get_optimized_beam_centers())
+    positions = np.array(BeamDataManager.generate_realistic_users(5000))
+    beams = list(bcs.beams.values())
+    columns = beam_columns(beams)
+    max_users = [b.max_users for b in beams]
+    power = [b.power for b in beams]
+
+    index = BeamSiteIndex(columns)
+    t0 = time.perf_counter()
+    expected = greedy_assign(*index.candidates(positions), max_users, power)
+    t1 = time.perf_counter()
+    actual = assign_users(positions, columns, max_users, power)
+    t2 = time.perf_counter()
+    print(f"{len(positions)} 用户 × {len(beams)} 波束：逐用户贪心 {(t1 - t0) * 1000:.1f}ms，"
+          f"向量化核 {(t2 - t1) * 1000:.1f}ms，结果一致: {np.array_equal(expected, actual)}")
+
+    # 修改单个波束的方位角后增量重新分配
+    state = AssignmentState(positions, columns, max_users, power)
+    columns["azimuth"][7] = 100.0
+    t0 = time.perf_counter()
+    users, rows, touched = state.update_beam(7, columns, max_users, power)
+    t1 = time.perf_counter()
+    full = assign_users(positions, columns, max_users, power)
+    print(f"增量重分配 {len(users)} 个用户、{len(touched)} 个波束，耗时 {(t1 - t0) * 1000:.1f}ms，"
+          f"与全量分配一致: {np.array_equal(state.assigned, full)}")
@@ -1,21 +1,48 @@
 import numpy as np
 import random
 from typing import List, Dict, Tuple, Optional
+from BackEnd.beam_assign import AssignmentState, candidate_table
+from BackEnd.beam_matching import optimal_assign
+from BackEnd.beam_reuse import reuse_conflicts
+from BackEnd.beam_store import BeamMembers, BeamStore, StoreField, UserStore
 
 # ===================== 波束信息 =====================
 class Beam:
+    # 波束是 BeamStore 中一行的视图，字段保存在按列存储的数组中
+    __slots__ = ("_store", "_row")
+
+    beam_id = StoreField("beam_id", int)
+    radius = StoreField("radius")
+    max_users = StoreField("max_users", int)
+    freq = StoreField("freq", None)
+    power = StoreField("power")
+    azimuth = StoreField("azimuth")
+    beamwidth = StoreField("beamwidth")
+    active = StoreField("active", bool)
+
     def __init__(self, beam_id: int, center: Tuple[float, float], radius: float, max_users: int, freq: float,
-                 azimuth: float = 0.0, beamwidth: float = 60.0):
-        self.beam_id = beam_id
-        self.center = center
-        self.radius = radius
-        self.max_users = max_users
-        self.freq = freq
-        self.users = set()
-        self.power = 1.0
-        self.azimuth = azimuth % 360
-        self.beamwidth = max(0, min(beamwidth, 360))
-        self.active = True
+                 azimuth: float = 0.0, beamwidth: float = 60.0, store: Optional[BeamStore] = None):
+        self._store = store if store is not None else BeamStore(1)
+        self._row = self._store.append(
+            beam_id=beam_id, lat=center[0], lon=center[1], radius=radius, max_users=max_users, freq=freq,
+            power=1.0, azimuth=azimuth % 360, beamwidth=max(0, min(beamwidth, 360)), active=True
+        )
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        return float(self._store.lat[self._row]), float(self._store.lon[self._row])
+
+    @center.setter
+    def center(self, center: Tuple[float, float]):
+        self._store.lat[self._row], self._store.lon[self._row] = center
+
+    @property
+    def users(self) -> BeamMembers:
+        return BeamMembers(self._store, self._row)
+
+    @users.setter
+    def users(self, user_ids):
+        self._store.replace_members(self._row, user_ids)
 
     def is_within(self, user_pos: Tuple[float, float]) -> bool:
         if not self.active:
@@ -75,18 +102,51 @@ class Beam:
 
 
 class User:
-    def __init__(self, user_id: int, pos: Tuple[float, float]):
-        self.user_id = user_id
-        self.pos = pos
-        self.connected_beam: Optional[int] = None
+    # 用户是 UserStore 中一行的视图
+    __slots__ = ("_store", "_row")
+
+    user_id = StoreField("user_id", int)
+
+    def __init__(self, user_id: int, pos: Tuple[float, float], store: Optional[UserStore] = None):
+        self._store = store if store is not None else UserStore(1)
+        self._row = self._store.append(user_id=user_id, lat=pos[0], lon=pos[1], connected=-1)
+
+    @property
+    def pos(self) -> Tuple[float, float]:
+        return float(self._store.lat[self._row]), float(self._store.lon[self._row])
+
+    @pos.setter
+    def pos(self, pos: Tuple[float, float]):
+        self._store.set_position(self._row, pos)
+
+    @property
+    def connected_beam(self) -> Optional[int]:
+        beam_id = int(self._store.connected[self._row])
+        return None if beam_id < 0 else beam_id
+
+    @connected_beam.setter
+    def connected_beam(self, beam_id: Optional[int]):
+        self._store.connected[self._row] = -1 if beam_id is None else beam_id
 
 
 class BeamControlSystem:
     def __init__(self, n_beams: int, beam_radius: float, max_users_per_beam: int,
-                 freq_list: List[float], initial_centers: Optional[List[Tuple[float, float]]] = None):
+                 freq_list: List[float], initial_centers: Optional[List[Tuple[float, float]]] = None,
+                 optimal: bool = False):
         self.beams: Dict[int, Beam] = {}
         self.users: Dict[int, User] = {}
         self.time = 0
+        # 最优模式：服务用户数最多的分配（见 beam_matching），从上一步结果热启动
+        self.optimal = optimal
+        # 波束与用户的字段按列存储，Beam / User 为其中一行的视图
+        self.beam_store = BeamStore()
+        self.user_store = UserStore()
+        # 最近一次全量分配的缓存，用于单个波束参数变化后的增量重分配
+        self._assignment: Optional[AssignmentState] = None
+        self._assigned_beams: List[int] = []
+        self._beam_rows = np.empty(0, dtype=np.int64)
+        self._user_rows = np.empty(0, dtype=np.int64)
+        self._user_generation = -1
 
         centers = initial_centers if initial_centers else [
             (random.uniform(-60, 60), random.uniform(-180, 180))
@@ -100,35 +160,102 @@ class BeamControlSystem:
                 azimuth = beam_in_site * 60
                 self.beams[beam_id] = Beam(
                     beam_id, site_center, beam_radius, max_users_per_beam,
-                    freq, azimuth, 60.0
+                    freq, azimuth, 60.0, store=self.beam_store
                 )
 
+    def _rows(self):
+        beam_rows = np.fromiter((b._row for b in self.beams.values()), dtype=np.int64, count=len(self.beams))
+        user_rows = np.fromiter((u._row for u in self.users.values()), dtype=np.int64, count=len(self.users))
+        return beam_rows, user_rows
+
+    def _beam_columns(self, beam_rows: np.ndarray) -> dict:
+        return self.beam_store.columns(beam_rows, ("lat", "lon", "radius", "azimuth", "beamwidth", "active"))
+
+    def _apply_assignment(self, user_rows: np.ndarray, assigned: np.ndarray):
+        # 写回用户所连波束编号（assigned 为波束在 self.beams 中的序号，-1 为未分配）
+        beam_ids = self.beam_store.beam_id[self._beam_rows]
+        self.user_store.connected[user_rows] = np.where(assigned >= 0, beam_ids[assigned], -1)
+
+    def _previous_assignment(self, beam_rows: np.ndarray, user_rows: np.ndarray) -> Optional[np.ndarray]:
+        # 用户当前所连波束在 self.beams 中的序号，没有任何已连接用户时返回 None
+        connected = self.user_store.connected[user_rows]
+        if not np.any(connected >= 0):
+            return None
+        beam_ids = self.beam_store.beam_id[beam_rows]
+        order = np.argsort(beam_ids)
+        pos = np.minimum(np.searchsorted(beam_ids, connected, sorter=order), beam_ids.size - 1)
+        found = order[pos]
+        return np.where((connected >= 0) & (beam_ids[found] == connected), found, -1)
+
+    def set_optimal(self, optimal: bool):
+        self.optimal = optimal
+        self.assign_users_to_beams()
+
     def assign_users_to_beams(self):
-        for beam in self.beams.values():
-            beam.users.clear()
-        for user in self.users.values():
-            candidates = [b for b in self.beams.values() if b.active and b.is_within(user.pos) and b.can_accept()]
-            if candidates:
-                best = min(candidates, key=lambda b: (len(b.users), -b.power))
-                best.add_user(user.user_id)
-                user.connected_beam = best.beam_id
-            else:
-                user.connected_beam = None
+        # 向量化分配核（见 beam_assign）直接读取列存储，分配结果与逐对调用 is_within 的贪心相同
+        beam_rows, user_rows = self._rows()
+        store = self.beam_store
+        positions, columns = self.user_store.positions(user_rows), self._beam_columns(beam_rows)
+        max_users, power = store.max_users[beam_rows], store.power[beam_rows]
+        if self.optimal:
+            self._assignment = None
+            indptr, candidates = candidate_table(positions, columns)
+            assigned = optimal_assign(indptr, candidates, max_users, power,
+                                      self._previous_assignment(beam_rows, user_rows))
+        else:
+            self._assignment = AssignmentState(positions, columns, max_users, power)
+            assigned = self._assignment.assigned
+        self._assigned_beams = list(self.beams)
+        self._beam_rows, self._user_rows = beam_rows, user_rows
+        self._user_generation = self.user_store.generation
+        self._apply_assignment(user_rows, assigned)
+        store.set_membership(np.where(assigned >= 0, beam_rows[assigned], -1), self.user_store.user_id[user_rows])
+
+    def reassign_beam(self, beam_id: int):
+        # 只重新分配与该波束连通的用户；最优模式（热启动全量求解），或波束、用户（包括用户位置）在上次全量分配后
+        # 有其他变化时退回全量分配
+        state = self._assignment
+        if self.optimal or state is None or len(self.users) != self._user_rows.size \
+                or self.user_store.generation != self._user_generation or list(self.beams) != self._assigned_beams:
+            self.assign_users_to_beams()
+            return
+        beam_rows = self._beam_rows
+        row = self._assigned_beams.index(beam_id)
+        store = self.beam_store
+        columns = self._beam_columns(beam_rows)
+        max_users, power = store.max_users[beam_rows], store.power[beam_rows]
+        if not state.matches(row, columns, max_users, power):
+            self.assign_users_to_beams()
+            return
+        users, rows, touched = state.update_beam(row, columns, max_users, power)
+        user_rows = self._user_rows[users]
+        self._apply_assignment(user_rows, rows)
+        user_ids = self.user_store.user_id[user_rows]
+        order = np.argsort(rows, kind="stable")
+        bounds = np.searchsorted(rows[order], touched)
+        ends = np.searchsorted(rows[order], touched, side="right")
+        for b, start, stop in zip(touched.tolist(), bounds.tolist(), ends.tolist()):
+            store.replace_members(int(beam_rows[b]), user_ids[order[start:stop]].tolist())
 
     def add_user(self, user_id: int, pos: Tuple[float, float]):
-        self.users[user_id] = User(user_id, pos)
+        previous = self.users.get(user_id)
+        if previous is not None:
+            self.user_store.release(previous._row)
+        self.users[user_id] = User(user_id, pos, store=self.user_store)
+        self._assignment = None
 
     def remove_user(self, user_id: int):
         if user_id in self.users:
+            self._assignment = None
             beam_id = self.users[user_id].connected_beam
             if beam_id is not None and beam_id in self.beams:
                 self.beams[beam_id].remove_user(user_id)
-            del self.users[user_id]
+            self.user_store.release(self.users.pop(user_id)._row)
 
     def set_beam_power(self, beam_id: int, power: float):
         if beam_id in self.beams:
             self.beams[beam_id].set_power(power)
-            self.assign_users_to_beams()
+            self.reassign_beam(beam_id)
 
     def set_beam_center(self, beam_id: int, center: Tuple[float, float]):
         if beam_id in self.beams:
@@ -137,33 +264,32 @@ class BeamControlSystem:
     def set_beam_azimuth(self, beam_id: int, azimuth: float):
         if beam_id in self.beams:
             self.beams[beam_id].set_azimuth(azimuth)
-            self.assign_users_to_beams()
+            self.reassign_beam(beam_id)
 
     def set_beam_beamwidth(self, beam_id: int, beamwidth: float):
         if beam_id in self.beams:
             self.beams[beam_id].set_beamwidth(beamwidth)
-            self.assign_users_to_beams()
+            self.reassign_beam(beam_id)
 
     def set_beam_active(self, beam_id: int, active: bool):
         if beam_id in self.beams:
             self.beams[beam_id].set_active(active)
-            self.assign_users_to_beams()
+            self.reassign_beam(beam_id)
 
     def frequency_reuse(self):
-        conflicts = []
-        freq_map: Dict[float, List[Beam]] = {}
-        for b in self.beams.values():
-            if b.active:
-                freq_map.setdefault(b.freq, []).append(b)
-
-        for freq, beams in freq_map.items():
-            for i in range(len(beams)):
-                for j in range(i + 1, len(beams)):
-                    bi, bj = beams[i], beams[j]
-                    if self._distance(bi.center, bj.center) < bi.radius + bj.radius and \
-                            self._azimuth_overlap(bi.azimuth, bi.beamwidth, bj.azimuth, bj.beamwidth):
-                        conflicts.append((bi.beam_id, bj.beam_id, freq, round(self._distance(bi.center, bj.center), 2)))
-        return conflicts
+        # 按频率与空间网格分组，只检查相邻波束对（见 beam_reuse），顺序与逐对比较相同
+        beams = list(self.beams.values())
+        rows = np.fromiter((b._row for b in beams), dtype=np.int64, count=len(beams))
+        columns = self._beam_columns(rows)
+        freq = self.beam_store.freq[rows]
+        i, j, distance = reuse_conflicts(columns, freq)
+        # 与原实现一样以组内第一个开启波束的频率值作为该组频率（800 与 800.0 属于同一组）
+        group_freq = {}
+        for f in freq[columns["active"]].tolist():
+            group_freq.setdefault(f, f)
+        beam_ids = self.beam_store.beam_id[rows]
+        return list(zip(beam_ids[i].tolist(), beam_ids[j].tolist(), [group_freq[f] for f in freq[i].tolist()],
+                        np.round(distance, 2).tolist()))
 
     def _azimuth_overlap(self, az1, bw1, az2, bw2):
         def range_overlap(l1, u1, l2, u2):
@@ -0,0 +1,282 @@
+"""
+波束覆盖范围的空间索引
+
+BeamControlSystem.assign_users_to_beams 原先对每个用户逐个调用所有波束的 Beam.is_within。
+本模块把波束站点中心放入单位球面三维坐标上的网格：用户与站点的大圆距离 d 不超过覆盖半径 R
+等价于两点弦长不超过 2·sin(R / 2R⊕)，格子边长取最大弦长时，只有用户所在格子及相邻 26 个格子中的
+站点可能覆盖该用户。候选对由排序后的格子键向量化生成，再用与 Beam.is_within
+逐项相同的公式精确判定距离与扇区，得到按用户分组的 CSR 候选表。
+
+greedy_assign 按用户顺序在候选表上执行与原实现相同的贪心分配（候选按波束字典顺序排列，
+min 的并列规则不变），结果与逐对调用 Beam.is_within 完全一致。
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+from BackEnd.spatial_index import expand_ranges, neighbor_matches, neighbor_offsets, pack_cells
+
+EARTH_RADIUS_KM = 6371
+# 单位球面网格的最小格子边长，覆盖半径全为 0 时避免除零
+MIN_CELL = 1e-5
+
+
+def beam_columns(beams) -> dict:
+    """将 Beam 对象列表转换为按列存储的数组（行号即列表下标）"""
+    centers = np.array([beam.center for beam in beams], dtype=np.float64).reshape(-1, 2)
+    return {
+        "lat": centers[:, 0],
+        "lon": centers[:, 1],
+        "radius": np.array([beam.radius for beam in beams], dtype=np.float64),
+        "azimuth": np.array([beam.azimuth for beam in beams], dtype=np.float64),
+        "beamwidth": np.array([beam.beamwidth for beam in beams], dtype=np.float64),
+        "active": np.array([beam.active for beam in beams], dtype=bool),
+    }
+
+
+def unit_vectors(lat, lon) -> np.ndarray:
+    """经纬度（度）转换为单位球面坐标 (…, 3)"""
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_length(radius) -> np.ndarray:
+    """大圆距离（km）对应的单位球弦长"""
+    half_angle = np.minimum(np.asarray(radius, dtype=np.float64) / (2 * EARTH_RADIUS_KM), np.pi / 2)
+    return 2 * np.sin(np.maximum(half_angle, 0.0))
+
+
+def haversine_distance(user_lat, user_lon, beam_lat, beam_lon) -> np.ndarray:
+    """用户到波束中心的大圆距离（km），参数按 numpy 规则广播，公式与 Beam.is_within 相同"""
+    lat1, lon1 = np.radians(beam_lat), np.radians(beam_lon)
+    lat2, lon2 = np.radians(user_lat), np.radians(user_lon)
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arcsin(np.sqrt(a))
+    return EARTH_RADIUS_KM * c
+
+
+def user_bearing(user_lat, user_lon, beam_lat, beam_lon) -> np.ndarray:
+    """用户相对波束中心的方位角（度，0~360），公式与 Beam.is_within 相同"""
+    y = np.sin(np.radians(user_lon - beam_lon)) * np.cos(np.radians(user_lat))
+    x = np.cos(np.radians(beam_lat)) * np.sin(np.radians(user_lat)) - \
+        np.sin(np.radians(beam_lat)) * np.cos(np.radians(user_lat)) * \
+        np.cos(np.radians(user_lon - beam_lon))
+    return np.degrees(np.arctan2(y, x)) % 360
+
+
+def in_sector(user_azimuth, azimuth, beamwidth) -> np.ndarray:
+    """方位角是否落在波束扇区 azimuth ± beamwidth/2 内（与 Beam.is_within 的分支判断相同）"""
+    lower = azimuth - beamwidth / 2
+    upper = azimuth + beamwidth / 2
+    return np.where(
+        lower < 0,
+        (user_azimuth >= lower + 360) | (user_azimuth <= upper),
+        np.where(upper > 360,
+                 (user_azimuth >= lower) | (user_azimuth <= upper - 360),
+                 (lower <= user_azimuth) & (user_azimuth <= upper)),
+    )
+
+
+def within_beams(user_lat, user_lon, beam_lat, beam_lon, radius, azimuth, beamwidth) -> np.ndarray:
+    """Beam.is_within 的逐元素数组版本（不含 active 判断），参数按 numpy 规则广播"""
+    inside = haversine_distance(user_lat, user_lon, beam_lat, beam_lon) <= radius
+    return inside & in_sector(user_bearing(user_lat, user_lon, beam_lat, beam_lon), azimuth, beamwidth)
+
+
+def beam_sites(columns) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    开启波束按中心去重得到站点
+
+    返回:
+        (np.ndarray, np.ndarray, np.ndarray): 开启波束的行号（升序）、站点经纬度 (S, 2)、每个波束所属站点
+    """
+    rows = np.flatnonzero(columns["active"] & (columns["radius"] >= 0))
+    centers = np.stack([columns["lat"][rows], columns["lon"][rows]], axis=1)
+    sites, site_of = np.unique(centers, axis=0, return_inverse=True)
+    return rows, sites, site_of.reshape(-1)
+
+
+class BeamSiteIndex:
+    """
+    开启波束所在站点的网格索引
+
+    同一站点的多个扇区波束共享中心，索引以站点为单位：先找出格子相邻的（用户, 站点）对，
+    用单位向量点积（弦长）剔除超出站点最大覆盖半径的组合，再展开为该站点的各个波束做精确判定。
+
+    用法:
+        index = BeamSiteIndex(list(bcs.beams.values()))
+        indptr, beam_rows = index.candidates(user_positions)
+        # 用户 k 的候选波束为 beam_rows[indptr[k]:indptr[k + 1]]（波束行号升序）
+    """
+
+    def __init__(self, beams):
+        """
+        参数:
+            beams: Beam 对象列表，或 beam_columns 的结果
+        """
+        self.columns = beams if isinstance(beams, dict) else beam_columns(beams)
+        cols = self.columns
+        rows, sites, site_of = beam_sites(cols)
+        n_sites = sites.shape[0]
+        # 站点 -> 波束行号（CSR，站点内按行号升序）
+        order = np.lexsort((rows, site_of))
+        self.site_indptr = np.zeros(n_sites + 1, dtype=np.int64)
+        np.cumsum(np.bincount(site_of, minlength=n_sites), out=self.site_indptr[1:])
+        self.site_beams = rows[order]
+        self.site_vectors = unit_vectors(sites[:, 0], sites[:, 1])
+        chords = np.zeros(n_sites)
+        np.maximum.at(chords, site_of, chord_length(cols["radius"][rows]))
+        # 留出少量余量，避免浮点误差把边界上的用户排除在外
+        self.site_chords = chords * (1 + 1e-6) + 1e-9
+        self._chord_limit = self.site_chords ** 2 + 1e-12
+        self.cell_size = max(float(self.site_chords.max(initial=0.0)), MIN_CELL)
+        keys = self._keys(self.site_vectors)
+        key_order = np.argsort(keys, kind="stable")
+        self._sorted_sites = key_order
+        self._sorted_keys = keys[key_order]
+
+    def __len__(self) -> int:
+        return self.site_beams.shape[0]
+
+    def _keys(self, points: np.ndarray) -> np.ndarray:
+        return pack_cells(np.floor(points / self.cell_size))
+
+    def candidate_sites(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        与用户距离不超过站点最大覆盖半径的（用户, 站点）对
+
+        参数:
+            vectors: (U, 3) 用户单位向量
+
+        返回:
+            (np.ndarray, np.ndarray): 用户序号、站点序号
+        """
+        empty = np.empty(0, dtype=np.int64)
+        n = vectors.shape[0]
+        if n == 0 or len(self) == 0:
+            return empty, empty
+        # 同一格子的用户共享邻近站点，先按格子去重
+        cells, user_cell = np.unique(self._keys(vectors), return_inverse=True)
+        user_cell = user_cell.reshape(-1)
+        pair_cell, index = neighbor_matches(cells, self._sorted_keys, neighbor_offsets(1))
+        if pair_cell.size == 0:
+            return empty, empty
+        pair_site = self._sorted_sites[index]
+
+        # 展开为格子内的每个用户
+        users_by_cell = np.argsort(user_cell, kind="stable")
+        cell_start = np.zeros(cells.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(user_cell, minlength=cells.size), out=cell_start[1:])
+        pair, index = expand_ranges(cell_start[pair_cell], cell_start[pair_cell + 1])
+        users = users_by_cell[index]
+        sites = pair_site[pair]
+
+        # 弦长² = 2 - 2·cos(圆心角)
+        dot = np.einsum("ij,ij->i", vectors[users], self.site_vectors[sites])
+        keep = 2.0 - 2.0 * dot <= self._chord_limit[sites]
+        return users[keep], sites[keep]
+
+    def candidate_pairs(self, user_lat, user_lon) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        候选（用户, 波束）对，是精确覆盖关系的超集
+
+        返回:
+            (np.ndarray, np.ndarray): 用户序号、波束行号
+        """
+        users, sites = self.candidate_sites(unit_vectors(user_lat, user_lon))
+        pair, index = expand_ranges(self.site_indptr[sites], self.site_indptr[sites + 1])
+        return users[pair], self.site_beams[index]
+
+    def candidates(self, positions) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        每个用户可被覆盖的开启波束（精确判定）
+
+        参数:
+            positions: (U, 2) 用户经纬度
+
+        返回:
+            (np.ndarray, np.ndarray): CSR 形式的 indptr (U+1,) 与波束行号，每个用户内按行号升序
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        n = positions.shape[0]
+        users, beams = self.candidate_pairs(positions[:, 0], positions[:, 1])
+        cols = self.columns
+        keep = within_beams(positions[users, 0], positions[users, 1], cols["lat"][beams], cols["lon"][beams],
+                            cols["radius"][beams], cols["azimuth"][beams], cols["beamwidth"][beams])
+        users, beams = users[keep], beams[keep]
+        order = np.lexsort((beams, users))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(users, minlength=n), out=indptr[1:])
+        return indptr, beams[order]
+
+
+def greedy_assign(indptr: np.ndarray, beam_rows: np.ndarray, max_users, power) -> List[int]:
+    """
+    按用户顺序贪心分配：在尚未满员的候选波束中选 (已分配用户数, -功率) 最小者，并列时取行号最小者
+
+    参数:
+        indptr / beam_rows: BeamSiteIndex.candidates 的结果
+        max_users / power: 每个波束的容量与功率（按行号）
+
+    返回:
+        List[int]: 每个用户分配到的波束行号，未分配为 -1
+    """
+    capacity = list(max_users)
+    neg_power = [-p for p in power]
+    counts = [0] * len(capacity)
+    bounds = indptr.tolist()
+    rows = beam_rows.tolist()
+    assigned = [-1] * (len(bounds) - 1)
+    for user in range(len(assigned)):
+        start, stop = bounds[user], bounds[user + 1]
+        if start == stop:
+            continue
+        best = -1
+        best_key = None
+        for row in rows[start:stop]:
+            count = counts[row]
+            if count < capacity[row]:
+                key = (count, neg_power[row])
+                if best_key is None or key < best_key:
+                    best, best_key = row, key
+        if best >= 0:
+            counts[best] += 1
+            assigned[user] = best
+    return assigned
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from BackEnd.beam_control import BeamControlSystem
+
+    random.seed(0)
+    np.random.seed(0)
+    bcs = BeamControlSystem(n_beams=600, beam_radius=500, max_users_per_beam=30, freq_list=[800, 1800, 2600])
+    for uid in range(4000):
+        bcs.add_user(uid, (random.uniform(-60, 60), random.uniform(-180, 180)))
+
+    # 原实现：逐对调用 Beam.is_within
+    t0 = time.perf_counter()
+    for beam in bcs.beams.values():
+        beam.users.clear()
+    for user in bcs.users.values():
+        cands = [b for b in bcs.beams.values() if b.active and b.is_within(user.pos) and b.can_accept()]
+        if cands:
+            best = min(cands, key=lambda b: (len(b.users), -b.power))
+            best.add_user(user.user_id)
+            user.connected_beam = best.beam_id
+        else:
+            user.connected_beam = None
+    t1 = time.perf_counter()
+    expected = {u.user_id: u.connected_beam for u in bcs.users.values()}
+
+    bcs.assign_users_to_beams()
+    t2 = time.perf_counter()
+    actual = {u.user_id: u.connected_beam for u in bcs.users.values()}
+    print(f"{len(bcs.users)} 用户 × {len(bcs.beams)} 波束：逐对判断 {t1 - t0:.2f}s，空间索引 {t2 - t1:.3f}s，"
+          f"结果一致: {expected == actual}")
@@ -0,0 +1,201 @@
+"""
+容量约束下服务用户数最多的分配（最优模式）
+
+assign_users_to_beams 的贪心按用户顺序分配，先到的用户可能占用后到用户唯一的候选波束，
+导致存在可行解时仍有用户未被服务。把候选表看作 用户—波束 二分图、波束容量为 max_users，
+服务用户数最多的分配就是该图上的最大流。
+
+求解从一个初始分配出发（上一步的结果或贪心结果），只沿增广路径调整：
+未分配用户 u 加入波束 b1，b1 中的用户 v1 转到 b2，……，最后一个用户转到仍有空位的波束。
+增广在“波束图”上进行：已分配在 b、且 c 也覆盖它的用户 v 构成一条边 b → c（见证用户 v）。
+每一轮从有空位的波束反向做 BFS 得到层次，再按层次逐个为未分配用户找增广路径（Dinic），
+直到某一轮没有任何增广路径。结果的服务用户数最大，且只有增广路径上的用户改变了波束，
+上一步结果变化不大时重新求解只需少量增广。
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from BackEnd.beam_assign import resolve_assignment
+
+
+def warm_start(indptr: np.ndarray, beam_rows: np.ndarray, max_users, initial) -> np.ndarray:
+    """
+    整理初始分配：丢弃不在候选表中的组合，超出容量的波束只保留靠前的用户
+
+    参数:
+        indptr / beam_rows: 候选表（CSR，组内波束行号升序）
+        max_users: 每个波束的容量（按行号）
+        initial: 每个用户的初始波束行号，-1 表示未分配
+
+    返回:
+        np.ndarray: 可行的初始分配
+    """
+    capacity = np.asarray(max_users, dtype=np.int64)
+    n_users = indptr.size - 1
+    assigned = np.asarray(initial, dtype=np.int64).copy()
+    users = np.flatnonzero(assigned >= 0)
+    if users.size == 0:
+        return assigned
+    # 候选表的键 user * B + beam 天然升序
+    keys = np.repeat(np.arange(n_users, dtype=np.int64), np.diff(indptr)) * capacity.size + beam_rows
+    wanted = users * capacity.size + assigned[users]
+    pos = np.minimum(np.searchsorted(keys, wanted), max(keys.size - 1, 0))
+    valid = keys[pos] == wanted if keys.size else np.zeros(users.size, dtype=bool)
+    assigned[users[~valid]] = -1
+
+    users = users[valid]
+    beams = assigned[users]
+    order = np.argsort(beams, kind="stable")
+    users, beams = users[order], beams[order]
+    group_start = np.ones(beams.size, dtype=bool)
+    group_start[1:] = beams[1:] != beams[:-1]
+    starts = np.flatnonzero(group_start)
+    rank = np.arange(beams.size) - np.repeat(starts, np.diff(np.append(starts, beams.size)))
+    assigned[users[rank >= capacity[beams]]] = -1
+    return assigned
+
+
+def optimal_assign(indptr: np.ndarray, beam_rows: np.ndarray, max_users, power,
+                   initial: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    服务用户数最多的分配
+
+    参数:
+        indptr / beam_rows: 候选表（CSR，组内波束行号升序）
+        max_users / power: 每个波束的容量与功率（按行号）
+        initial: 初始分配（波束行号，-1 为未分配），为 None 时从贪心结果出发
+
+    返回:
+        np.ndarray: 每个用户分配到的波束行号，未分配为 -1
+    """
+    capacity = np.asarray(max_users, dtype=np.int64)
+    if initial is None:
+        assigned = resolve_assignment(indptr, beam_rows, capacity, power)
+    else:
+        assigned = warm_start(indptr, beam_rows, capacity, initial)
+    pair_users = np.repeat(np.arange(indptr.size - 1, dtype=np.int64), np.diff(indptr))
+    while _augment_phase(indptr, beam_rows, pair_users, capacity, assigned):
+        pass
+    return assigned
+
+
+def _augment_phase(indptr, beam_rows, pair_users, capacity, assigned) -> int:
+    """一轮 Dinic：分层后沿层次寻找增广路径，返回增广次数"""
+    n_beams = capacity.size
+    load = np.bincount(assigned[assigned >= 0], minlength=n_beams)
+    unreached = n_beams + 1
+    dist = np.where(load < capacity, 0, unreached)
+
+    pair_free = assigned[pair_users] < 0
+    if not pair_free.any():
+        return 0
+
+    # 波束图的边 b -> c，见证用户为已分配在 b 且被 c 覆盖的用户
+    src = assigned[pair_users]
+    edge = (src >= 0) & (src != beam_rows)
+    e_src, e_dst, e_user = src[edge], beam_rows[edge], pair_users[edge]
+
+    # 从有空位的波束反向分层
+    level = 0
+    while True:
+        reach = (dist[e_dst] == level) & (dist[e_src] == unreached)
+        if not reach.any():
+            break
+        dist[e_src[reach]] = level + 1
+        level += 1
+
+    # 每个波束沿层次向下的边
+    down = dist[e_dst] + 1 == dist[e_src]
+    h_src, h_dst, h_user = e_src[down], e_dst[down], e_user[down]
+    order = np.argsort(h_src, kind="stable")
+    hop_dst, hop_user = h_dst[order].tolist(), h_user[order].tolist()
+    hop_ptr = np.zeros(n_beams + 1, dtype=np.int64)
+    np.cumsum(np.bincount(h_src, minlength=n_beams), out=hop_ptr[1:])
+    hop_end = hop_ptr[1:].tolist()
+    cursor = hop_ptr[:-1].tolist()
+
+    free_users = np.unique(pair_users[pair_free & (dist[beam_rows] < unreached)]).tolist()
+    bounds = indptr.tolist()
+    rows = beam_rows.tolist()
+    level_of = dist.tolist()
+    capacity_of = capacity.tolist()
+    load_of = load.tolist()
+    owner = assigned.tolist()
+
+    augmented = 0
+    for user in free_users:
+        candidates = sorted((level_of[b], b) for b in rows[bounds[user]:bounds[user + 1]] if level_of[b] < unreached)
+        for _, start in candidates:
+            if level_of[start] == unreached:
+                continue
+            path, movers = [start], []
+            while path:
+                beam = path[-1]
+                if level_of[beam] == 0:
+                    if load_of[beam] < capacity_of[beam]:
+                        break
+                    level_of[beam] = unreached
+                else:
+                    step = None
+                    while cursor[beam] < hop_end[beam]:
+                        k = cursor[beam]
+                        cursor[beam] += 1
+                        mover, target = hop_user[k], hop_dst[k]
+                        if owner[mover] == beam and level_of[target] + 1 == level_of[beam]:
+                            step = (mover, target)
+                            break
+                    if step is not None:
+                        movers.append(step[0])
+                        path.append(step[1])
+                        continue
+                    level_of[beam] = unreached
+                path.pop()
+                if movers:
+                    movers.pop()
+            if path:
+                for mover, target in zip(movers, path[1:]):
+                    owner[mover] = target
+                owner[user] = start
+                load_of[path[-1]] += 1
+                augmented += 1
+                break
+    assigned[:] = owner
+    return augmented
+
+
+if __name__ == "__main__":
+    import time
+
+    from BackEnd.beam_assign import candidate_table
+    from BackEnd.beam_control import BeamControlSystem
+    from BackEnd.beam_logic import BeamDataManager
+
+    np.random.seed(2)
+    bcs = BeamControlSystem(60, 300, 1800, [800, 1800, 2600], BeamDataManager.get_optimized_beam_centers())
+    positions = np.array(BeamDataManager.generate_realistic_users(100000))
+    beams = list(bcs.beams.values())
+    columns = bcs._beam_columns(np.array([b._row for b in beams]))
+    max_users = np.array([b.max_users for b in beams])
+    power = np.array([b.power for b in beams])
+    indptr, rows = candidate_table(positions, columns)
+
+    greedy = resolve_assignment(indptr, rows, max_users, power)
+    t0 = time.perf_counter()
+    best = optimal_assign(indptr, rows, max_users, power)
+    t1 = time.perf_counter()
+    print(f"{len(positions)} 用户 × {len(beams)} 波束：贪心服务 {np.count_nonzero(greedy >= 0)} 个用户，"
+          f"最优模式服务 {np.count_nonzero(best >= 0)} 个用户，求解耗时 {t1 - t0:.3f}s")
+
+    # 关闭一个波束后从上一步结果热启动
+    columns["active"][5] = False
+    indptr, rows = candidate_table(positions, columns)
+    t0 = time.perf_counter()
+    warm = optimal_assign(indptr, rows, max_users, power, initial=best)
+    t1 = time.perf_counter()
+    cold = optimal_assign(indptr, rows, max_users, power)
+    t2 = time.perf_counter()
+    print(f"关闭波束 5 后：热启动 {t1 - t0:.3f}s，冷启动 {t2 - t1:.3f}s，服务用户数 "
+          f"{np.count_nonzero(warm >= 0)} / {np.count_nonzero(cold >= 0)}，"
+          f"其余波束中改变波束的用户 {np.count_nonzero((warm != best) & (best >= 0) & (best != 5))} 个")
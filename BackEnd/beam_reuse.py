@@ -0,0 +1,120 @@
+"""
+同频波束冲突检测
+
+BeamControlSystem.frequency_reuse 原先对每个频率下的所有开启波束两两调用 _distance 与 _azimuth_overlap。
+本模块按频率分组，每组把波束站点（中心相同的波束）放入单位球面的网格（beam_index 的弦长换算）：
+大圆距离小于 R_i + R_j 的两个波束，弦长必然不超过 2·R_max 对应的弦长，只需检查相邻格子中的站点对；
+站点对展开为波束对后，再用与原实现相同的公式向量化计算距离与方位角重叠。
+
+结果按 (频率首次出现的顺序, i, j) 排列，与原实现的双重循环顺序一致。
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from BackEnd.beam_index import MIN_CELL, chord_length, haversine_distance, unit_vectors
+from BackEnd.spatial_index import cell_pairs, expand_ranges, pack_cells
+
+
+def azimuth_overlap(az1, bw1, az2, bw2) -> np.ndarray:
+    """
+    两个扇区的方位角范围是否重叠，与 BeamControlSystem._azimuth_overlap 相同（参数按 numpy 规则广播）
+    """
+    l1 = np.mod(az1 - bw1 / 2, 360)
+    u1 = np.mod(az1 + bw1 / 2, 360)
+    l2 = np.mod(az2 - bw2 / 2, 360)
+    u2 = np.mod(az2 + bw2 / 2, 360)
+    u1 = np.where(l1 > u1, u1 + 360, u1)
+    u2 = np.where(l2 > u2, u2 + 360, u2)
+    return np.maximum(l1, l2) <= np.minimum(u1, u2)
+
+
+def near_pairs(vectors: np.ndarray, reach: float) -> Tuple[np.ndarray, np.ndarray]:
+    """弦长不超过 reach 的所有点对 (i, j)，i < j（未排序），格子边长取 reach"""
+    rows, cols = cell_pairs(pack_cells(np.floor(vectors / reach)), unique=True)
+    diff = vectors[rows] - vectors[cols]
+    keep = np.einsum("ij,ij->i", diff, diff) <= reach * reach
+    return rows[keep], cols[keep]
+
+
+def reuse_conflicts(columns, freq) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    所有同频且覆盖范围、方位角均重叠的开启波束对
+
+    参数:
+        columns: beam_index.beam_columns 的结果
+        freq: 每个波束的频率（按行号）
+
+    返回:
+        (np.ndarray, np.ndarray, np.ndarray): 行号 i、行号 j（i < j）与中心距离（km）
+    """
+    freq = np.asarray(freq, dtype=np.float64)
+    lat, lon, radius = columns["lat"], columns["lon"], columns["radius"]
+    active = np.flatnonzero(columns["active"])
+    # 同一站点的波束中心相同，网格中只放站点
+    centers = np.stack([lat[active], lon[active]], axis=1)
+    sites, site_of = np.unique(centers, axis=0, return_inverse=True)
+    site_of = site_of.reshape(-1)
+    site_vectors = unit_vectors(sites[:, 0], sites[:, 1])
+    _, first, codes = np.unique(freq[active], return_index=True, return_inverse=True)
+    codes = codes.reshape(-1)
+    rows_parts, cols_parts, rank_parts = [], [], []
+    for code in np.argsort(first, kind="stable").tolist():
+        group = active[codes == code]
+        if group.size < 2:
+            continue
+        group_sites, local = np.unique(site_of[codes == code], return_inverse=True)
+        local = local.reshape(-1)
+        # 格子边长取组内最大半径两倍对应的弦长，留出浮点误差
+        reach = float(chord_length(2 * radius[group].max())) + 1e-9
+        si, sj = near_pairs(site_vectors[group_sites], max(reach, MIN_CELL))
+        same = np.arange(group_sites.size)
+        si, sj = np.concatenate([si, same]), np.concatenate([sj, same])
+
+        # 站点对展开为波束对
+        by_site = group[np.argsort(local, kind="stable")]
+        size = np.bincount(local, minlength=group_sites.size)
+        start = np.cumsum(size) - size
+        width = size[sj]
+        counts = size[si] * width
+        pair, k = expand_ranges(np.zeros_like(counts), counts)
+        a = by_site[start[si][pair] + k // width[pair]]
+        b = by_site[start[sj][pair] + k % width[pair]]
+        keep = np.where(si[pair] == sj[pair], a < b, True)
+        rows_parts.append(np.minimum(a[keep], b[keep]))
+        cols_parts.append(np.maximum(a[keep], b[keep]))
+        rank_parts.append(np.full(rows_parts[-1].size, len(rank_parts), dtype=np.int64))
+    if not rows_parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    rows = np.concatenate(rows_parts)
+    cols = np.concatenate(cols_parts)
+    rank = np.concatenate(rank_parts)
+
+    azimuth, beamwidth = columns["azimuth"], columns["beamwidth"]
+    overlap = np.flatnonzero(azimuth_overlap(azimuth[rows], beamwidth[rows], azimuth[cols], beamwidth[cols]))
+    rows, cols, rank = rows[overlap], cols[overlap], rank[overlap]
+    distance = haversine_distance(lat[cols], lon[cols], lat[rows], lon[rows])
+    conflict = np.flatnonzero(distance < radius[rows] + radius[cols])
+    rows, cols, rank, distance = rows[conflict], cols[conflict], rank[conflict], distance[conflict]
+    # 按 (频率首次出现的顺序, i, j) 排序
+    order = np.argsort((rank * lat.size + rows) * lat.size + cols, kind="stable")
+    return rows[order], cols[order], distance[order]
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from BackEnd.beam_control import BeamControlSystem
+
+    random.seed(3)
+    bcs = BeamControlSystem(50000, 300, 100, [800, 1800, 2600])
+    for beam_id in random.sample(list(bcs.beams), 5000):
+        bcs.beams[beam_id].set_active(False)
+
+    t0 = time.perf_counter()
+    conflicts = bcs.frequency_reuse()
+    t1 = time.perf_counter()
+    print(f"{len(bcs.beams)} 个波束：同频冲突 {len(conflicts)} 对，耗时 {t1 - t0:.3f}s")
+    print("前 3 对:", conflicts[:3])
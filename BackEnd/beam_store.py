@@ -0,0 +1,256 @@
+"""
+波束与用户的按列存储
+
+Beam / User 原先是带实例字典的普通对象，Beam.users 为 int 集合，百万用户时内存与 GC 开销主要来自对象头。
+这里把波束和用户的全部字段保存在 numpy 列中（容量按倍增扩展），Beam / User 只是带 __slots__ 的
+（存储, 行号）视图，属性读写直接落到列上，原有接口保持不变；向量化分配核直接读取这些列。
+
+波束的用户集合以 CSR 形式保存（indptr 按波束行号，ids 为用户编号），整批分配后一次性重建；
+通过 Beam.users 的 add / discard / clear 修改单个波束时，该波束的成员转为 Python 集合单独保存，
+直到下一次整批重建。
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+
+class ColumnStore:
+    """
+    按列存储的基类：FIELDS 为 (列名, dtype, 默认值)，append 返回新行号
+
+    release 归还的行恢复默认值并放入空闲表，append 优先复用，增删反复进行时存储不会无限增长；
+    被归还行的旧视图不应再使用。
+    """
+
+    FIELDS = ()
+
+    def __init__(self, capacity: int = 16):
+        self.size = 0
+        self.capacity = max(int(capacity), 1)
+        self._free = []
+        for name, dtype, default in self.FIELDS:
+            setattr(self, name, np.full(self.capacity, default, dtype=dtype))
+
+    def __len__(self) -> int:
+        return self.size - len(self._free)
+
+    def _grow(self, capacity: int):
+        for name, dtype, default in self.FIELDS:
+            column = np.full(capacity, default, dtype=dtype)
+            column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def append(self, **values) -> int:
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(self.capacity * 2)
+            row = self.size
+            self.size += 1
+        for name, value in values.items():
+            getattr(self, name)[row] = value
+        return row
+
+    def release(self, row: int):
+        """归还一行，供之后的 append 复用"""
+        for name, _, default in self.FIELDS:
+            getattr(self, name)[row] = default
+        self._free.append(row)
+
+    def columns(self, rows: np.ndarray, names: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """取出若干行的列（拷贝），供向量化计算使用"""
+        names = [field[0] for field in self.FIELDS] if names is None else names
+        return {name: getattr(self, name)[rows] for name in names}
+
+
+class StoreField:
+    """视图属性：读写存储中对应列的对应行（cast 为 None 时原样返回，用于 object 列）"""
+
+    def __init__(self, column: str, cast=float):
+        self.column = column
+        self.cast = cast
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = getattr(obj._store, self.column)[obj._row]
+        return value if self.cast is None else self.cast(value)
+
+    def __set__(self, obj, value):
+        getattr(obj._store, self.column)[obj._row] = value
+
+
+class BeamStore(ColumnStore):
+    """波束列存储与成员 CSR"""
+
+    FIELDS = (
+        ("beam_id", np.int64, -1),
+        ("lat", np.float64, 0.0),
+        ("lon", np.float64, 0.0),
+        ("radius", np.float64, 0.0),
+        ("max_users", np.int64, 0),
+        # 频率按原值保存（800 读回仍为 int 800），向量化计算时再转换为浮点
+        ("freq", object, 0.0),
+        ("power", np.float64, 1.0),
+        ("azimuth", np.float64, 0.0),
+        ("beamwidth", np.float64, 60.0),
+        ("active", np.bool_, True),
+    )
+
+    def __init__(self, capacity: int = 16):
+        super().__init__(capacity)
+        self.member_indptr = np.zeros(1, dtype=np.int64)
+        self.member_ids = np.empty(0, dtype=np.int64)
+        self._overrides: Dict[int, set] = {}
+
+    def set_membership(self, beam_rows: np.ndarray, user_ids: np.ndarray):
+        """
+        整批设置全部波束的成员
+
+        参数:
+            beam_rows: 每个用户所属的波束行号，-1 表示未分配
+            user_ids: 对应的用户编号
+        """
+        beam_rows = np.asarray(beam_rows, dtype=np.int64)
+        served = beam_rows >= 0
+        rows = beam_rows[served]
+        order = np.argsort(rows, kind="stable")
+        self.member_ids = np.asarray(user_ids, dtype=np.int64)[served][order]
+        self.member_indptr = np.zeros(self.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.size), out=self.member_indptr[1:])
+        self._overrides.clear()
+
+    def replace_members(self, row: int, user_ids: Iterable[int]):
+        """替换单个波束的成员"""
+        self._overrides[row] = set(user_ids)
+
+    def _base(self, row: int) -> np.ndarray:
+        if row + 1 < self.member_indptr.size:
+            return self.member_ids[self.member_indptr[row]:self.member_indptr[row + 1]]
+        return self.member_ids[:0]
+
+    def members(self, row: int):
+        """波束成员（集合或数组）"""
+        override = self._overrides.get(row)
+        return override if override is not None else self._base(row)
+
+    def editable_members(self, row: int) -> set:
+        """波束成员的可修改集合（首次修改时从 CSR 复制）"""
+        override = self._overrides.get(row)
+        if override is None:
+            override = self._overrides[row] = set(self._base(row).tolist())
+        return override
+
+    def member_count(self, row: int) -> int:
+        override = self._overrides.get(row)
+        if override is not None:
+            return len(override)
+        return self._base(row).size
+
+    def member_counts(self, rows: np.ndarray) -> np.ndarray:
+        """若干波束的成员数"""
+        rows = np.asarray(rows, dtype=np.int64)
+        counts = np.zeros(rows.size, dtype=np.int64)
+        known = rows + 1 < self.member_indptr.size
+        counts[known] = self.member_indptr[rows[known] + 1] - self.member_indptr[rows[known]]
+        if self._overrides:
+            for k, row in enumerate(rows.tolist()):
+                override = self._overrides.get(row)
+                if override is not None:
+                    counts[k] = len(override)
+        return counts
+
+
+class UserStore(ColumnStore):
+    """用户列存储；connected 为所连波束编号，-1 表示未连接"""
+
+    FIELDS = (
+        ("user_id", np.int64, -1),
+        ("lat", np.float64, 0.0),
+        ("lon", np.float64, 0.0),
+        ("connected", np.int64, -1),
+    )
+
+    def __init__(self, capacity: int = 16):
+        super().__init__(capacity)
+        # 位置版本号：新增用户或经由 set_position 修改位置时加一，用于判断缓存的分配是否过期
+        self.generation = 0
+
+    def append(self, **values) -> int:
+        self.generation += 1
+        return super().append(**values)
+
+    def set_position(self, row: int, pos):
+        self.lat[row], self.lon[row] = pos
+        self.generation += 1
+
+    def positions(self, rows: np.ndarray) -> np.ndarray:
+        """若干用户的 (纬度, 经度) 数组"""
+        return np.stack([self.lat[rows], self.lon[rows]], axis=1)
+
+
+class BeamMembers:
+    """Beam.users 的集合视图，支持 len / in / 迭代 / add / discard / clear"""
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: BeamStore, row: int):
+        self._store = store
+        self._row = row
+
+    def __len__(self) -> int:
+        return self._store.member_count(self._row)
+
+    def __iter__(self):
+        members = self._store.members(self._row)
+        return iter(members if isinstance(members, set) else members.tolist())
+
+    def __contains__(self, user_id) -> bool:
+        members = self._store.members(self._row)
+        return user_id in members if isinstance(members, set) else bool(np.any(members == user_id))
+
+    def __eq__(self, other) -> bool:
+        return set(self) == set(other)
+
+    def __repr__(self) -> str:
+        return repr(set(self))
+
+    def add(self, user_id):
+        self._store.editable_members(self._row).add(user_id)
+
+    def discard(self, user_id):
+        self._store.editable_members(self._row).discard(user_id)
+
+    def clear(self):
+        self._store.replace_members(self._row, ())
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import tracemalloc
+
+    from BackEnd.beam_control import BeamControlSystem
+
+    n = 200000
+    rng = np.random.default_rng(0)
+    lat, lon = rng.uniform(-60, 60, n).tolist(), rng.uniform(-180, 180, n).tolist()
+
+    tracemalloc.start()
+    bcs = BeamControlSystem(1200, 300, 200, [800, 1800, 2600])
+    for uid in range(n):
+        bcs.add_user(uid, (lat[uid], lon[uid]))
+    t0 = time.perf_counter()
+    bcs.assign_users_to_beams()
+    elapsed = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    user = next(iter(bcs.users.values()))
+    print(f"{n} 用户 × {len(bcs.beams)} 波束：分配耗时 {elapsed:.2f}s，内存 {current / 2 ** 20:.1f}MB，"
+          f"每个用户视图 {sys.getsizeof(user)} 字节")
+    served = sum(len(b.users) for b in bcs.beams.values())
+    print("已分配用户:", served, "与用户状态一致:",
+          served == sum(u["connected_beam"] is not None for u in bcs.get_user_status()))
@@ -0,0 +1,243 @@
+"""
+协议包抓包文件
+
+追加写入的抓包格式，由两个文件组成：
+    <path>      原始协议包首尾相接
+    <path>.idx  16字节文件头 + 定长索引记录（偏移、长度、序列号、抓包时间、源/目的地址哈希）
+
+读取端通过 mmap 映射两个文件，索引直接视为 numpy 结构化数组，
+按序列号或时间范围查找为 O(log n)，回放时按偏移切片，无需逐包解析。
+"""
+
+import os
+import mmap
+import time
+import struct
+import zlib
+import numpy as np
+
+from BackEnd.wrapper import _HEADER_SIZE, parse_packet, _encode_address
+
+INDEX_MAGIC = b"SATCAPIDX\x00\x00\x00\x00\x00\x00\x01"
+INDEX_DTYPE = np.dtype([
+    ("offset", "<u8"),
+    ("length", "<u4"),
+    ("sequence", "<u4"),
+    ("timestamp", "<f8"),
+    ("src_hash", "<u4"),
+    ("dst_hash", "<u4"),
+])
+_INDEX_STRUCT = struct.Struct("<QIIdII")
+assert _INDEX_STRUCT.size == INDEX_DTYPE.itemsize
+
+
+def address_hash(address) -> int:
+    """地址哈希：对16字节定长地址做CRC32"""
+    if isinstance(address, str):
+        address = _encode_address(address)
+    return zlib.crc32(address.ljust(16, b"\x00"))
+
+
+class CaptureWriter:
+    """
+    抓包文件写入器（仅追加）
+
+    用法:
+        with CaptureWriter("traffic.cap") as writer:
+            writer.write(packet)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data = open(path, "ab")
+        self._index = open(path + ".idx", "ab")
+        if self._index.tell() == 0:
+            self._index.write(INDEX_MAGIC)
+        self._offset = self._data.tell()
+
+    def write(self, packet, timestamp: float = None):
+        """追加一个协议包，timestamp 为抓包时间（秒），默认取当前时间"""
+        view = parse_packet(packet)
+        self._data.write(packet)
+        self._index.write(_INDEX_STRUCT.pack(
+            self._offset,
+            len(packet),
+            view.sequence,
+            time.time() if timestamp is None else timestamp,
+            zlib.crc32(view.source_bytes),
+            zlib.crc32(view.destination_bytes),
+        ))
+        self._offset += len(packet)
+
+    def write_batch(self, buffer, offsets, headers, timestamp: float = None):
+        """
+        追加一批首尾相接的协议包（wrapper_batch.pack_batch/parse_batch 的输出），索引向量化生成
+
+        参数:
+            buffer: 连续的协议包缓冲区
+            offsets: 每个包在 buffer 中的起始偏移
+            headers: 对应的 HEADER_DTYPE 结构化数组
+            timestamp: 抓包时间，标量或与包数等长的数组
+        """
+        offsets = np.asarray(offsets, dtype=np.int64)
+        lengths = headers["data_length"].astype(np.int64) + _HEADER_SIZE
+        records = np.empty(offsets.shape[0], dtype=INDEX_DTYPE)
+        records["offset"] = self._offset + offsets - (offsets[0] if offsets.size else 0)
+        records["length"] = lengths
+        records["sequence"] = headers["sequence"]
+        records["timestamp"] = time.time() if timestamp is None else timestamp
+        # S16 字段比较时去掉补零，哈希前统一补回16字节
+        records["src_hash"] = [zlib.crc32(a.ljust(16, b"\x00")) for a in headers["source"].tolist()]
+        records["dst_hash"] = [zlib.crc32(a.ljust(16, b"\x00")) for a in headers["destination"].tolist()]
+        if offsets.size:
+            start = int(offsets[0])
+            end = int(offsets[-1] + lengths[-1])
+            self._data.write(memoryview(buffer).cast("B")[start:end])
+            self._offset += end - start
+        self._index.write(records.tobytes())
+
+    def flush(self):
+        self._data.flush()
+        self._index.flush()
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _map_file(path: str):
+    """只读映射文件，空文件返回空 bytes"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class CaptureReader:
+    """
+    抓包文件读取器（mmap）
+
+    index 属性为 INDEX_DTYPE 结构化数组，可直接做向量化统计；
+    packet(i) 返回第 i 个包的 memoryview，不拷贝数据。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data = _map_file(path)
+        self._index_map = _map_file(path + ".idx")
+        if len(self._index_map) < len(INDEX_MAGIC) or \
+                bytes(self._index_map[:len(INDEX_MAGIC)]) != INDEX_MAGIC:
+            raise ValueError("不是有效的抓包索引文件")
+        count = (len(self._index_map) - len(INDEX_MAGIC)) // INDEX_DTYPE.itemsize
+        index = np.frombuffer(self._index_map, dtype=INDEX_DTYPE, count=count, offset=len(INDEX_MAGIC))
+        # 写入中断时可能留下数据不完整的尾部记录，忽略之
+        valid = int(np.searchsorted(index["offset"] + index["length"], len(self._data), side="right"))
+        self.index = index[:valid]
+        self._view = memoryview(self._data)
+        self._by_sequence = None
+        timestamps = self.index["timestamp"]
+        self._by_time = None if np.all(timestamps[1:] >= timestamps[:-1]) else np.argsort(timestamps, kind="stable")
+
+    def __len__(self) -> int:
+        return self.index.shape[0]
+
+    def packet(self, i: int) -> memoryview:
+        """第 i 个协议包（memoryview）"""
+        record = self.index[i]
+        offset = int(record["offset"])
+        return self._view[offset:offset + int(record["length"])]
+
+    def __getitem__(self, i: int) -> memoryview:
+        return self.packet(i)
+
+    def iter_packets(self, indices=None):
+        """按给定下标（默认全部，按写入顺序）依次产出协议包 memoryview，用于回放"""
+        offsets = self.index["offset"].tolist()
+        lengths = self.index["length"].tolist()
+        view = self._view
+        if indices is None:
+            for offset, length in zip(offsets, lengths):
+                yield view[offset:offset + length]
+        else:
+            for i in np.asarray(indices).tolist():
+                yield view[offsets[i]:offsets[i] + lengths[i]]
+
+    def find_sequence(self, sequence: int) -> np.ndarray:
+        """按序列号查找，返回所有匹配包的下标（首次调用时建立有序索引，O(n log n)，之后每次 O(log n)）"""
+        if self._by_sequence is None:
+            self._by_sequence = np.argsort(self.index["sequence"], kind="stable")
+        keys = self.index["sequence"][self._by_sequence]
+        lo = np.searchsorted(keys, sequence, side="left")
+        hi = np.searchsorted(keys, sequence, side="right")
+        return self._by_sequence[lo:hi]
+
+    def time_range(self, start: float, end: float) -> np.ndarray:
+        """返回抓包时间在 [start, end) 内的包下标（按时间顺序）"""
+        if self._by_time is None:
+            timestamps = self.index["timestamp"]
+            lo, hi = np.searchsorted(timestamps, [start, end], side="left")
+            return np.arange(lo, hi)
+        timestamps = self.index["timestamp"][self._by_time]
+        lo, hi = np.searchsorted(timestamps, [start, end], side="left")
+        return self._by_time[lo:hi]
+
+    def select(self, source=None, destination=None) -> np.ndarray:
+        """按源/目的地址哈希筛选，返回布尔掩码（哈希碰撞时需再核对协议头）"""
+        mask = np.ones(len(self), dtype=bool)
+        if source is not None:
+            mask &= self.index["src_hash"] == address_hash(source)
+        if destination is not None:
+            mask &= self.index["dst_hash"] == address_hash(destination)
+        return mask
+
+    def close(self):
+        """释放映射；若外部仍持有包的 memoryview，映射留给垃圾回收释放"""
+        self.index = None
+        self._by_sequence = self._by_time = None
+        try:
+            self._view.release()
+            for m in (self._data, self._index_map):
+                if isinstance(m, mmap.mmap):
+                    m.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from BackEnd.wrapper import unpack_protocol
+    from BackEnd.wrapper_batch import pack_batch, parse_batch
+
+    path = os.path.join(tempfile.mkdtemp(), "traffic.cap")
+    payloads = [f"frame-{i}".encode() for i in range(100000)]
+    buffer, offsets = pack_batch(payloads, "TerminalA", "TerminalB", checksum_method="crc32")
+    headers = parse_batch(buffer, offsets)
+    t0 = time.time()
+    with CaptureWriter(path) as writer:
+        for k in range(0, len(payloads), 10000):
+            sl = slice(k, k + 10000)
+            writer.write_batch(buffer, offsets[sl], headers[sl], timestamp=t0 + k / 1000.0)
+        writer.write(bytes(buffer[:offsets[1]]), timestamp=t0 + 200)
+    print("写入耗时: %.3fs" % (time.time() - t0))
+
+    with CaptureReader(path) as reader:
+        print("包数量:", len(reader))
+        hit = reader.find_sequence(4242)
+        print("序列号4242:", [unpack_protocol(bytes(reader.packet(i)))["data"] for i in hit])
+        print("时间范围内包数:", len(reader.time_range(t0 + 20, t0 + 40)))
+        print("源地址匹配包数:", int(reader.select(source="TerminalA").sum()))
+        t1 = time.time()
+        total = sum(len(p) for p in reader.iter_packets())
+        print("回放 %d 字节耗时: %.3fs" % (total, time.time() - t1))
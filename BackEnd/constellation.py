@@ -0,0 +1,199 @@
+"""
+星座状态的向量化表示
+
+所有卫星的轨道参数（半径、倾角、相位角、每帧转角）保存在 numpy 数组中，
+一次向量化计算即可推进整个星座并得到 (N, 3) 坐标数组，渲染、点击拾取和路由都直接读取该数组。
+openGLwidget.Satellite 对象可以绑定到星座中的一行，其 angle/x/y/z 等属性成为数组元素的视图。
+"""
+
+from typing import List, Optional
+
+import numpy as np
+
+# OpenGL 场景中地球球体半径（draw_textured_sphere(1.5, ...)）
+EARTH_RADIUS = 1.5
+
+
+def orbit_positions(r, inclination, angle, raan=None) -> np.ndarray:
+    """
+    向量化计算圆轨道卫星坐标（raan 为空时与 Satellite.update_position 的公式一致）
+
+    参数:
+        r: 轨道半径数组
+        inclination: 轨道倾角数组（弧度）
+        angle: 相位角数组（度），可以带额外的前置维度（如时间）
+        raan: 升交点赤经数组（弧度），轨道面绕 z 轴旋转的角度，默认全为 0
+
+    返回:
+        np.ndarray: 形状为 angle.shape + (3,) 的坐标数组
+    """
+    r = np.asarray(r, dtype=np.float64)
+    inclination = np.asarray(inclination, dtype=np.float64)
+    angle_rad = np.radians(angle)
+    sin_angle = np.sin(angle_rad)
+    x = r * np.cos(angle_rad)
+    y = r * sin_angle * np.cos(inclination)
+    z = r * sin_angle * np.sin(inclination)
+    if raan is not None:
+        cos_o, sin_o = np.cos(raan), np.sin(raan)
+        x, y = x * cos_o - y * sin_o, x * sin_o + y * cos_o
+    return np.stack([x, y, z], axis=-1)
+
+
+class Constellation:
+    """
+    星座状态（结构数组）
+
+    用法:
+        constellation = Constellation(r, inclination, angle, delta)
+        constellation.step()                 # 所有卫星前进一帧
+        xyz = constellation.positions        # (N, 3)
+    """
+
+    def __init__(self, r, inclination, angle, delta, indices: Optional[List[int]] = None,
+                 names: Optional[List[str]] = None, raan=None):
+        """
+        参数:
+            r: 轨道半径
+            inclination: 轨道倾角（弧度）
+            angle: 当前相位角（度）
+            delta: 每帧转过的角度（度）
+            indices: 卫星编号，默认 0..N-1
+            names: 卫星名称
+            raan: 升交点赤经（弧度），默认全为 0（与界面中的圆轨道一致）
+        """
+        self.r = np.array(r, dtype=np.float64)
+        self.inclination = np.array(inclination, dtype=np.float64)
+        self.angle = np.array(angle, dtype=np.float64)
+        self.delta = np.array(delta, dtype=np.float64)
+        n = self.angle.shape[0]
+        self.raan = np.zeros(n) if raan is None else np.array(raan, dtype=np.float64)
+        self.indices = list(range(n)) if indices is None else list(indices)
+        self.names = [str(i) for i in self.indices] if names is None else list(names)
+        self.rows = {index: row for row, index in enumerate(self.indices)}
+        self.positions = np.zeros((n, 3), dtype=np.float64)
+        self.tick = 0
+        self.update_positions()
+
+    @classmethod
+    def from_satellites(cls, satellites, bind: bool = True) -> "Constellation":
+        """
+        由 Satellite 对象列表构造星座
+
+        参数:
+            satellites: Satellite 对象列表
+            bind (bool): 是否将各 Satellite 绑定为星座对应行的视图
+        """
+        constellation = cls(
+            [sat.r for sat in satellites],
+            [sat.inclination for sat in satellites],
+            [sat.angle for sat in satellites],
+            [sat.delta_deg for sat in satellites],
+            indices=[sat.index for sat in satellites],
+            names=[sat.name for sat in satellites],
+        )
+        if bind:
+            for row, sat in enumerate(satellites):
+                sat.bind(constellation, row)
+        return constellation
+
+    def __len__(self) -> int:
+        return self.angle.shape[0]
+
+    def update_positions(self):
+        """由当前相位角重新计算坐标"""
+        self.positions[:] = orbit_positions(self.r, self.inclination, self.angle, self.raan)
+
+    def step(self, ticks: int = 1) -> np.ndarray:
+        """
+        所有卫星前进 ticks 帧
+
+        返回:
+            np.ndarray: 更新后的 (N, 3) 坐标数组
+        """
+        if ticks == 1:
+            self.angle += self.delta
+        else:
+            self.angle += self.delta * ticks
+        np.mod(self.angle, 360, out=self.angle)
+        self.tick += ticks
+        self.update_positions()
+        return self.positions
+
+    def angles_at(self, offsets) -> np.ndarray:
+        """从当前时刻起经过 offsets 帧后的相位角，形状 (T, N)"""
+        offsets = np.asarray(offsets, dtype=np.float64)
+        return (self.angle[None, :] + offsets[:, None] * self.delta[None, :]) % 360
+
+    def propagate(self, offsets) -> np.ndarray:
+        """从当前时刻起经过 offsets 帧后的坐标（不改变当前状态），形状 (T, N, 3)"""
+        return orbit_positions(self.r, self.inclination, self.angles_at(offsets), self.raan)
+
+    def orbits(self):
+        """不重复的 (轨道半径, 倾角, 升交点赤经) 组合，按首次出现顺序，用于绘制轨道"""
+        params = np.stack([self.r, self.inclination, self.raan], axis=1)
+        _, first = np.unique(params, axis=0, return_index=True)
+        first.sort()
+        return params[first].tolist()
+
+    def satellite_dicts(self, decimals: int = 2) -> List[dict]:
+        """路径规划使用的卫星字典（index 与四舍五入后的 angle）"""
+        return [{"index": index, "angle": round(angle, decimals)}
+                for index, angle in zip(self.indices, self.angle.tolist())]
+
+
+class ConstellationField:
+    """
+    Satellite 属性描述符：未绑定星座时读写实例自身的值，绑定后读写星座数组中对应的元素
+    """
+
+    def __init__(self, array: str, column: Optional[int] = None):
+        self.array = array
+        self.column = column
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = "_" + name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        constellation = obj.constellation
+        if constellation is None:
+            return obj.__dict__[self.name]
+        values = getattr(constellation, self.array)
+        if self.column is None:
+            return float(values[obj.row])
+        return float(values[obj.row, self.column])
+
+    def __set__(self, obj, value):
+        constellation = obj.constellation
+        if constellation is None:
+            obj.__dict__[self.name] = value
+            return
+        values = getattr(constellation, self.array)
+        if self.column is None:
+            values[obj.row] = value
+        else:
+            values[obj.row, self.column] = value
+
+
+if __name__ == "__main__":
+    import math
+    import time
+
+    n = 10000
+    rng = np.random.default_rng(0)
+    constellation = Constellation(rng.uniform(1.8, 3.0, n), np.radians(rng.uniform(0, 90, n)),
+                                  rng.uniform(0, 360, n), rng.uniform(0.05, 0.3, n))
+    t0 = time.perf_counter()
+    for _ in range(100):
+        constellation.step()
+    elapsed = (time.perf_counter() - t0) / 100
+    print(f"{n} 颗卫星单帧推进耗时 {elapsed * 1000:.3f}ms")
+
+    # 与逐颗标量计算一致
+    angle = math.radians(constellation.angle[7])
+    r, inc = constellation.r[7], constellation.inclination[7]
+    expected = (r * math.cos(angle), r * math.sin(angle) * math.cos(inc), r * math.sin(angle) * math.sin(inc))
+    print("与标量公式一致:", np.allclose(constellation.positions[7], expected))
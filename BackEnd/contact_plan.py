@@ -0,0 +1,357 @@
+"""
+时间扩展的接触计划与接触图路由（CGR）
+
+卫星每帧都在移动（Satellite.update_position），选星时规划的路径很快就会失效。
+本模块将星座在一段时间窗口内按步长向量化外推，逐步计算星间可见性（与 isl_router 相同的
+地球遮挡判定），把每对卫星连续可见的时间段记录为“接触”（链路建立/断开时刻），
+再在接触图上按最早到达时间做存储转发路由。
+
+时间单位为帧（tick），与 Satellite.delta_deg（每帧转过的角度）一致。
+接触计划只取决于轨道参数，轨道参数不变时 ContactPlanCache 直接复用已有计划。
+"""
+
+import heapq
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from BackEnd.constellation import Constellation
+from BackEnd.isl_router import EARTH_RADIUS, visible_links, _line_of_sight
+
+# 稠密计算可见性时每批最多处理的卫星对数（时间步数 × N × N）
+_DENSE_BATCH = 1 << 22
+
+
+def satellite_elements(satellites):
+    """
+    从 Constellation、Satellite 对象或字典列表中取出轨道参数
+
+    返回:
+        (List[int], np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+            卫星编号、轨道半径、倾角（弧度）、当前相位角（度）、每帧转角（度）
+    """
+    if isinstance(satellites, Constellation):
+        return (list(satellites.indices), satellites.r.copy(), satellites.inclination.copy(),
+                satellites.angle.copy(), satellites.delta.copy())
+    indices, r, inclination, angle, delta = [], [], [], [], []
+    for sat in satellites:
+        get = sat.get if isinstance(sat, dict) else lambda key: getattr(sat, key)
+        indices.append(get("index"))
+        r.append(get("r"))
+        inclination.append(get("inclination"))
+        angle.append(get("angle"))
+        delta.append(get("delta_deg"))
+    as_array = lambda values: np.asarray(values, dtype=np.float64)
+    return indices, as_array(r), as_array(inclination), as_array(angle), as_array(delta)
+
+
+def _link_samples(positions: np.ndarray, earth_radius: float, max_range: Optional[float]):
+    """
+    计算每个采样时刻的可见卫星对（只保留 i < j）
+
+    参数:
+        positions: (T, N, 3) 坐标
+
+    返回:
+        (np.ndarray, np.ndarray, np.ndarray, np.ndarray): 采样序号、i、j、距离
+    """
+    steps, n, _ = positions.shape
+    parts = []
+    if n * n <= _DENSE_BATCH:
+        # 卫星较少：一次处理多个时间步的 N×N 矩阵
+        batch = max(1, _DENSE_BATCH // max(n * n, 1))
+        norms = np.einsum("tik,tik->ti", positions, positions)
+        r2 = earth_radius * earth_radius
+        upper = np.triu(np.ones((n, n), dtype=bool), 1)
+        for start in range(0, steps, batch):
+            stop = min(start + batch, steps)
+            block = positions[start:stop]
+            gram = np.einsum("tik,tjk->tij", block, block)
+            ni = norms[start:stop, :, None]
+            nj = norms[start:stop, None, :]
+            d2 = np.maximum(ni + nj - 2.0 * gram, 0.0)
+            mask = _line_of_sight(gram, ni, nj, d2, r2) & upper
+            if max_range is not None:
+                mask &= d2 <= max_range * max_range
+            t, i, j = np.nonzero(mask)
+            parts.append((t + start, i, j, np.sqrt(d2[t, i, j])))
+    else:
+        # 卫星较多：逐时间步用稀疏方法计算
+        for t in range(steps):
+            rows, cols, dist = visible_links(positions[t], earth_radius, max_range)
+            upper = rows < cols
+            parts.append((np.full(int(upper.sum()), t), rows[upper], cols[upper], dist[upper]))
+    if not parts:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, np.empty(0)
+    return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+
+class ContactPlan:
+    """
+    接触计划：一组 (源卫星, 目的卫星, 开始帧, 结束帧, 最小距离) 的接触，双向各记录一次
+
+    contacts 为按源卫星、开始时间排序的结构化数组，便于按源卫星切片遍历。
+    """
+
+    CONTACT_DTYPE = np.dtype([
+        ("source", np.int64),
+        ("target", np.int64),
+        ("start", np.int64),
+        ("end", np.int64),
+        ("range", np.float64),
+    ])
+
+    def __init__(self, indices: List[int], start_tick: int, horizon: int, contacts: np.ndarray):
+        """
+        参数:
+            indices: 行号对应的卫星编号
+            start_tick: 计划起始帧
+            horizon: 计划覆盖的帧数
+            contacts: CONTACT_DTYPE 数组，source/target 为行号，start/end 为绝对帧号（end 不含）
+        """
+        self.indices = list(indices)
+        self.rows = {index: row for row, index in enumerate(self.indices)}
+        self.start_tick = start_tick
+        self.end_tick = start_tick + horizon
+        order = np.lexsort((contacts["start"], contacts["source"]))
+        self.contacts = contacts[order]
+        self.indptr = np.zeros(len(self.indices) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.contacts["source"], minlength=len(self.indices)), out=self.indptr[1:])
+        # 路由时逐个访问接触，使用 Python 列表
+        self._outgoing = [
+            list(zip(*(self.contacts[field][self.indptr[i]:self.indptr[i + 1]].tolist()
+                       for field in ("target", "start", "end"))))
+            for i in range(len(self.indices))
+        ]
+
+    def __len__(self) -> int:
+        return self.contacts.shape[0]
+
+    def windows(self, a: int, b: int) -> List[Tuple[int, int]]:
+        """两颗卫星（编号）之间的所有可见时间段 [开始帧, 结束帧)"""
+        row_a, row_b = self.rows[a], self.rows[b]
+        segment = self.contacts[self.indptr[row_a]:self.indptr[row_a + 1]]
+        segment = segment[segment["target"] == row_b]
+        return list(zip(segment["start"].tolist(), segment["end"].tolist()))
+
+    def links_at(self, tick: int) -> List[Tuple[int, int]]:
+        """指定帧处于连通状态的链路（编号对，每条链路只出现一次）"""
+        c = self.contacts
+        mask = (c["start"] <= tick) & (c["end"] > tick) & (c["source"] < c["target"])
+        return [(self.indices[a], self.indices[b])
+                for a, b in zip(c["source"][mask].tolist(), c["target"][mask].tolist())]
+
+    def route(self, start_index: int, end_index: int, tick: int, hop_delay: int = 0) -> Optional[Dict]:
+        """
+        存储转发路由：从 tick 时刻出发，求到达目的卫星的最早时间
+
+        卫星可以缓存数据等待下一个接触，因此较早到达某颗卫星总不会更差，
+        在卫星上按到达时间做 Dijkstra 即得最早到达路径。
+
+        参数:
+            start_index / end_index: 起止卫星编号
+            tick: 出发帧
+            hop_delay: 每一跳的转发时延（帧）
+
+        返回:
+            dict 或 None: {"arrival": 到达帧, "path": 卫星编号列表, "hops": [(发送卫星, 接收卫星, 发送帧), ...]}，
+                          在计划时间范围内不可达时返回 None
+        """
+        source = self.rows[start_index]
+        target = self.rows[end_index]
+        best = {source: tick}
+        parent = {}
+        heap = [(tick, source)]
+        outgoing = self._outgoing
+        while heap:
+            arrival, node = heapq.heappop(heap)
+            if node == target:
+                break
+            if arrival > best[node]:
+                continue
+            for neighbor, start, end in outgoing[node]:
+                depart = start if start > arrival else arrival
+                if depart >= end:
+                    continue
+                reach = depart + hop_delay
+                if reach < best.get(neighbor, self.end_tick):
+                    best[neighbor] = reach
+                    parent[neighbor] = (node, depart)
+                    heapq.heappush(heap, (reach, neighbor))
+        else:
+            if target != source:
+                return None
+
+        hops = []
+        node = target
+        while node != source:
+            prev, depart = parent[node]
+            hops.append((self.indices[prev], self.indices[node], depart))
+            node = prev
+        hops.reverse()
+        path = [start_index] + [hop[1] for hop in hops]
+        return {"arrival": best[target], "path": path, "hops": hops}
+
+
+def generate_contact_plan(
+    r,
+    inclination,
+    angle,
+    delta,
+    horizon: int,
+    step: int = 1,
+    start_tick: int = 0,
+    indices: Optional[List[int]] = None,
+    earth_radius: float = EARTH_RADIUS,
+    max_range: Optional[float] = None,
+    raan=None
+) -> ContactPlan:
+    """
+    向量化外推星座并生成接触计划
+
+    参数:
+        r / inclination / angle / delta: 轨道半径、倾角（弧度）、start_tick 时刻的相位角（度）、每帧转角（度）
+        horizon (int): 计划覆盖的帧数
+        step (int): 采样步长（帧），每个采样结果代表 [t, t+step) 内的链路状态
+        start_tick (int): 计划起始帧
+        indices: 卫星编号，默认 0..N-1
+        earth_radius / max_range: 同 isl_router.visibility_matrix
+        raan: 升交点赤经（弧度），默认全为 0
+
+    返回:
+        ContactPlan
+    """
+    constellation = Constellation(r, inclination, angle, delta, indices, raan=raan)
+    n = len(constellation)
+    indices = constellation.indices
+    positions = constellation.propagate(np.arange(0, horizon, step))
+    t, i, j, dist = _link_samples(positions, earth_radius, max_range)
+
+    # 同一对卫星在相邻采样均可见即属于同一次接触
+    key = i * n + j
+    order = np.lexsort((t, key))
+    key, t, dist = key[order], t[order], dist[order]
+    new_window = np.ones(key.size, dtype=bool)
+    new_window[1:] = (key[1:] != key[:-1]) | (t[1:] != t[:-1] + 1)
+    starts = np.flatnonzero(new_window)
+    ends = np.append(starts[1:], key.size) - 1
+    min_range = np.minimum.reduceat(dist, starts) if starts.size else np.empty(0)
+
+    count = starts.size
+    contacts = np.empty(2 * count, dtype=ContactPlan.CONTACT_DTYPE)
+    a, b = key[starts] // max(n, 1), key[starts] % max(n, 1)
+    start_ticks = start_tick + t[starts] * step
+    end_ticks = np.minimum(start_tick + (t[ends] + 1) * step, start_tick + horizon)
+    for half, (src, dst) in enumerate(((a, b), (b, a))):
+        block = contacts[half * count:(half + 1) * count]
+        block["source"] = src
+        block["target"] = dst
+        block["start"] = start_ticks
+        block["end"] = end_ticks
+        block["range"] = min_range
+    return ContactPlan(indices, start_tick, horizon, contacts)
+
+
+class ContactPlanCache:
+    """
+    接触计划缓存
+
+    轨道半径、倾角和角速度不变、且当前相位与计划外推的相位一致时，直接复用已生成的计划；
+    否则（或剩余时间不足）重新生成。
+
+    用法:
+        cache = ContactPlanCache(horizon=3600)
+        plan = cache.get(opengl_widget.satellites, tick)
+        result = plan.route(start, end, tick)
+    """
+
+    def __init__(self, horizon: int = 3600, step: int = 1, earth_radius: float = EARTH_RADIUS,
+                 max_range: Optional[float] = None, min_remaining: Optional[int] = None,
+                 tolerance: float = 1e-6, max_plans: int = 4):
+        """
+        参数:
+            horizon / step / earth_radius / max_range: 同 generate_contact_plan
+            min_remaining: 计划剩余帧数少于该值时重新生成，默认 horizon // 2
+            tolerance: 判定相位一致的角度容差（度）
+            max_plans: 最多缓存的计划数（不同的轨道参数组合）
+        """
+        self.horizon = horizon
+        self.step = step
+        self.earth_radius = earth_radius
+        self.max_range = max_range
+        self.min_remaining = horizon // 2 if min_remaining is None else min_remaining
+        self.tolerance = tolerance
+        self.max_plans = max_plans
+        self._plans = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, satellites, tick: int) -> ContactPlan:
+        """取得覆盖 tick 时刻的接触计划"""
+        raan = satellites.raan.copy() if isinstance(satellites, Constellation) else None
+        return self.get_for_elements(*satellite_elements(satellites), tick=tick, raan=raan)
+
+    def get_for_elements(self, indices, r, inclination, angle, delta, tick: int, raan=None) -> ContactPlan:
+        """同 get，直接传入 satellite_elements 的结果（raan 为升交点赤经，默认全为 0）"""
+        key = (tuple(indices), r.tobytes(), inclination.tobytes(), delta.tobytes(),
+               None if raan is None else np.asarray(raan, dtype=np.float64).tobytes())
+        entry = self._plans.get(key)
+        if entry is not None:
+            plan, epoch_angle = entry
+            elapsed = tick - plan.start_tick
+            if 0 <= elapsed and plan.end_tick - tick >= self.min_remaining:
+                predicted = (epoch_angle + delta * elapsed) % 360
+                drift = np.abs((angle - predicted + 180) % 360 - 180)
+                if not drift.size or drift.max() <= self.tolerance:
+                    self._plans.move_to_end(key)
+                    self.hits += 1
+                    return plan
+
+        self.misses += 1
+        plan = generate_contact_plan(r, inclination, angle, delta, self.horizon, self.step, tick,
+                                     indices, self.earth_radius, self.max_range, raan)
+        self._plans[key] = (plan, angle.copy())
+        self._plans.move_to_end(key)
+        while len(self._plans) > self.max_plans:
+            self._plans.popitem(last=False)
+        return plan
+
+    def clear(self):
+        self._plans.clear()
+
+
+if __name__ == "__main__":
+    import math
+    import time
+
+    # 与界面中相同的三颗卫星
+    satellites = [
+        {"index": 0, "r": 2.5, "inclination": math.radians(45), "angle": 0, "delta_deg": 0.2},
+        {"index": 1, "r": 2.8, "inclination": math.radians(60), "angle": 90, "delta_deg": 0.2},
+        {"index": 2, "r": 3.0, "inclination": math.radians(30), "angle": 180, "delta_deg": 0.2},
+    ]
+    cache = ContactPlanCache(horizon=3600)
+    t0 = time.perf_counter()
+    plan = cache.get(satellites, tick=0)
+    print(f"三颗卫星 3600 帧接触计划: {len(plan)} 个接触，耗时 {time.perf_counter() - t0:.3f}s")
+    print("卫星0与卫星2的可见时段:", plan.windows(0, 2))
+    print("存储转发路由 0 -> 2:", plan.route(0, 2, tick=0))
+
+    # 推进若干帧后轨道参数未变，直接复用
+    for sat in satellites:
+        sat["angle"] = (sat["angle"] + 100 * sat["delta_deg"]) % 360
+    cache.get(satellites, tick=100)
+    print("缓存命中:", cache.hits, "未命中:", cache.misses)
+
+    # 大规模星座
+    n = 600
+    rng = np.random.default_rng(0)
+    t0 = time.perf_counter()
+    big = generate_contact_plan(np.full(n, 1.8), np.radians(rng.choice([53.0, 70.0], n)),
+                                rng.uniform(0, 360, n), np.full(n, 0.2), horizon=600, step=5, max_range=0.6)
+    t1 = time.perf_counter()
+    result = big.route(0, n - 1, tick=0)
+    print(f"{n} 颗卫星 600 帧接触计划: {len(big)} 个接触，耗时 {t1 - t0:.3f}s，",
+          "最早到达帧:", result and result["arrival"])
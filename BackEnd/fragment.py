@@ -0,0 +1,211 @@
+"""
+协议包分片与重组
+
+将较大的数据（如整段语音）按 MTU 切分为多个协议包，每个分片单独计算校验和，
+单个比特错误只需重传对应分片。分片信息编码在协议头的 sequence 字段中：
+
+    sequence(32bit) = 消息ID(12bit) | 分片序号(10bit) | 最后分片序号(10bit)
+
+接收端按 (源地址, 目的地址, 消息ID) 为每条消息预分配缓冲区，用位图记录已收到的分片，
+支持乱序到达；超时未完成的消息按最久未更新顺序淘汰，内存占用按消息有上界。
+"""
+
+import time
+from collections import OrderedDict
+
+from BackEnd.wrapper import pack_protocol, parse_packet, _encode_address
+
+_MESSAGE_ID_BITS = 12
+_INDEX_BITS = 10
+MAX_FRAGMENTS = 1 << _INDEX_BITS
+MAX_MESSAGE_ID = (1 << _MESSAGE_ID_BITS) - 1
+_INDEX_MASK = MAX_FRAGMENTS - 1
+
+
+def encode_fragment_sequence(message_id: int, index: int, last_index: int) -> int:
+    """将消息ID、分片序号、最后分片序号编码为32位 sequence"""
+    return ((message_id & MAX_MESSAGE_ID) << (2 * _INDEX_BITS)) | (index << _INDEX_BITS) | last_index
+
+
+def decode_fragment_sequence(sequence: int):
+    """解析 sequence，返回 (消息ID, 分片序号, 最后分片序号)"""
+    return (
+        sequence >> (2 * _INDEX_BITS),
+        (sequence >> _INDEX_BITS) & _INDEX_MASK,
+        sequence & _INDEX_MASK,
+    )
+
+
+def fragment_payload(
+    data,
+    source: str,
+    destination: str,
+    message_id: int,
+    fragment_size: int = 1024,
+    **kwargs
+) -> list:
+    """
+    将数据切分为多个协议包
+
+    参数:
+        data: 待发送的数据（bytes/bytearray/memoryview）
+        source (str): 源地址
+        destination (str): 目的地址
+        message_id (int): 消息ID（0~4095，同一对地址间循环使用）
+        fragment_size (int): 每个分片的数据长度（MTU 减去83字节协议头）
+        kwargs: 透传给 pack_protocol 的其他参数（priority、data_type、checksum_method 等）
+
+    返回:
+        list[bytes]: 分片协议包列表，按分片序号排列
+    """
+    view = memoryview(data).cast("B")
+    count = max(1, -(-len(view) // fragment_size))
+    if count > MAX_FRAGMENTS:
+        raise ValueError(f"数据过大：最多 {MAX_FRAGMENTS} 个分片")
+    last = count - 1
+    return [
+        pack_protocol(view[i * fragment_size:(i + 1) * fragment_size], source, destination,
+                      sequence=encode_fragment_sequence(message_id, i, last), **kwargs)
+        for i in range(count)
+    ]
+
+
+class _PartialMessage:
+    """一条正在重组的消息"""
+
+    __slots__ = ("buffer", "bitmap", "received", "count", "total", "updated")
+
+    def __init__(self, count: int, fragment_size: int):
+        self.buffer = bytearray(count * fragment_size)
+        self.bitmap = 0
+        self.received = 0
+        self.count = count
+        self.total = None
+        self.updated = 0.0
+
+
+class Reassembler:
+    """
+    分片重组器
+
+    用法:
+        reassembler = Reassembler(fragment_size=1024)
+        for packet in packets:              # 可乱序、可重复
+            message = reassembler.push(packet)
+            if message is not None:
+                ...                          # 完整数据
+    """
+
+    def __init__(self, fragment_size: int = 1024, timeout: float = 5.0, max_messages: int = 256,
+                 verify: bool = True):
+        """
+        参数:
+            fragment_size (int): 分片数据长度，需与发送端一致
+            timeout (float): 消息超时时间（秒），超时未完成的消息被淘汰
+            max_messages (int): 同时重组的最大消息数，超出时淘汰最久未更新的消息
+            verify (bool): 是否校验每个分片的校验和，校验失败的分片被丢弃（等待重传）
+        """
+        self.fragment_size = fragment_size
+        self.timeout = timeout
+        self.max_messages = max_messages
+        self.verify = verify
+        self._messages = OrderedDict()
+        self.evicted = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def _evict(self, now: float):
+        """淘汰超时的消息以及超出数量上限的最旧消息（按更新时间有序，只检查队首）"""
+        messages = self._messages
+        while messages:
+            key, message = next(iter(messages.items()))
+            if now - message.updated <= self.timeout and len(messages) <= self.max_messages:
+                break
+            del messages[key]
+            self.evicted += 1
+
+    def push(self, packet, now: float = None):
+        """
+        接收一个分片
+
+        参数:
+            packet: 分片协议包
+            now (float): 当前时间（秒），默认 time.monotonic()
+
+        返回:
+            bytes 或 None: 消息收齐时返回完整数据，否则返回 None
+        """
+        now = time.monotonic() if now is None else now
+        view = parse_packet(packet)
+        if self.verify and not view.is_valid():
+            self.dropped += 1
+            return None
+        message_id, index, last = decode_fragment_sequence(view.sequence)
+        payload = view.payload
+        if index > last or len(payload) > self.fragment_size or \
+                (index < last and len(payload) != self.fragment_size):
+            self.dropped += 1
+            return None
+
+        key = (view.source_bytes, view.destination_bytes, message_id)
+        message = self._messages.get(key)
+        if message is None or message.count != last + 1:
+            message = _PartialMessage(last + 1, self.fragment_size)
+            self._messages[key] = message
+        self._messages.move_to_end(key)
+        message.updated = now
+
+        bit = 1 << index
+        if not message.bitmap & bit:
+            start = index * self.fragment_size
+            message.buffer[start:start + len(payload)] = payload
+            message.bitmap |= bit
+            message.received += 1
+            if index == last:
+                message.total = start + len(payload)
+
+        if message.received == message.count:
+            del self._messages[key]
+            buffer = message.buffer
+            del buffer[message.total:]
+            return bytes(buffer)
+        self._evict(now)
+        return None
+
+    def missing(self, source: str, destination: str, message_id: int) -> list:
+        """返回指定消息尚未收到的分片序号，用于选择性重传；消息不存在时返回空列表"""
+        key = (_encode_address(source), _encode_address(destination), message_id & MAX_MESSAGE_ID)
+        message = self._messages.get(key)
+        if message is None:
+            return []
+        return [i for i in range(message.count) if not message.bitmap >> i & 1]
+
+    def expire(self, now: float = None):
+        """主动淘汰超时消息"""
+        self._evict(time.monotonic() if now is None else now)
+
+
+if __name__ == "__main__":
+    import random
+
+    voice = bytes(random.getrandbits(8) for _ in range(16000))
+    fragments = fragment_payload(voice, "TerminalA", "TerminalB", message_id=7, fragment_size=1400,
+                                 checksum_method="crc32")
+    print("分片数量:", len(fragments))
+
+    # 乱序到达，并损坏其中一个分片
+    random.shuffle(fragments)
+    corrupted = bytearray(fragments[3])
+    corrupted[-1] ^= 0x01
+    reassembler = Reassembler(fragment_size=1400)
+    result = None
+    for i, fragment in enumerate(fragments):
+        result = reassembler.push(bytes(corrupted) if i == 3 else fragment) or result
+    print("损坏后缺失分片:", reassembler.missing("TerminalA", "TerminalB", 7))
+
+    # 只重传缺失的分片
+    _, index, _ = decode_fragment_sequence(parse_packet(fragments[3]).sequence)
+    result = reassembler.push(fragments[3])
+    print("重传分片", index, "后重组成功:", result == voice)
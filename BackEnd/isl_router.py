@@ -0,0 +1,352 @@
+"""
+星间链路（ISL）图路由
+
+plan_satellite_path 只按角度在一维环上选路，不考虑轨道半径、倾角以及链路是否被地球遮挡。
+本模块根据卫星三维坐标（openGLwidget.Satellite 的 x/y/z）构建星间链路图：
+先用 Gram 矩阵分块向量化计算 N×N 视线矩阵（两星连线与地球球体不相交且距离不超过最大链路距离），
+再按需保留每颗卫星最近的若干条链路，最后在稀疏图上按距离（A*）或跳数（BFS）搜索路径。
+"""
+
+import heapq
+import math
+from collections import deque
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from BackEnd.constellation import EARTH_RADIUS, Constellation, orbit_positions
+from BackEnd.spatial_index import CELL_LIMIT, cell_pairs, pack_cells
+
+
+def satellite_positions(satellites) -> Tuple[List[int], np.ndarray]:
+    """
+    从 Constellation、卫星对象（Satellite）或字典列表中取出编号和坐标
+
+    返回:
+        (List[int], np.ndarray): 卫星编号列表、(N, 3) 坐标数组
+    """
+    if isinstance(satellites, Constellation):
+        return list(satellites.indices), satellites.positions
+    indices = []
+    coords = []
+    for sat in satellites:
+        if isinstance(sat, dict):
+            indices.append(sat["index"])
+            coords.append((sat["x"], sat["y"], sat["z"]))
+        else:
+            indices.append(sat.index)
+            coords.append((sat.x, sat.y, sat.z))
+    return indices, np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+
+
+def _line_of_sight(gram, ni, nj, d2, r2):
+    """
+    由点积判断两星连线是否与地球球体相交（均可广播）
+
+    连线上离地心最近点的参数 t* = (n_i - g) / |d|²；当 t* 落在 (0, 1) 内
+    （即 g < n_i 且 g < n_j）时最近距离的平方为 (n_i·n_j - g²) / |d|²，
+    小于 R² 即被遮挡；否则最近点是端点本身，卫星都在地球外，不会被遮挡。
+    """
+    inside = (gram < ni) & (gram < nj)
+    return ~(inside & (ni * nj - gram * gram < r2 * d2))
+
+
+def visibility_matrix(
+    positions: np.ndarray,
+    earth_radius: float = EARTH_RADIUS,
+    max_range: Optional[float] = None,
+    chunk: int = 1024
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    计算卫星两两之间的视线可见性与距离
+
+    两星连线 p_i + t(p_j - p_i)，t∈[0,1] 到地心的最近距离小于地球半径时视为被遮挡。
+    所需的点积全部来自 Gram 矩阵 G = P·Pᵀ，按行分块计算以限制临时内存。
+
+    参数:
+        positions: (N, 3) 坐标数组
+        earth_radius: 地球半径（与坐标同单位）
+        max_range: 最大链路距离，None 表示不限制
+        chunk: 每次处理的行数
+
+    返回:
+        (np.ndarray, np.ndarray): (N, N) 布尔可见矩阵（对角线为 False）、(N, N) 距离矩阵
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    n = positions.shape[0]
+    norms = np.einsum("ij,ij->i", positions, positions)
+    visible = np.empty((n, n), dtype=bool)
+    distance = np.empty((n, n), dtype=np.float64)
+    r2 = earth_radius * earth_radius
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        gram = positions[start:stop] @ positions.T
+        ni = norms[start:stop, None]
+        d2 = ni + norms[None, :] - 2.0 * gram
+        np.maximum(d2, 0.0, out=d2)
+        block = _line_of_sight(gram, ni, norms[None, :], d2, r2)
+        if max_range is not None:
+            block &= d2 <= max_range * max_range
+        rows = np.arange(stop - start)
+        block[rows, rows + start] = False
+        visible[start:stop] = block
+        distance[start:stop] = np.sqrt(d2)
+    return visible, distance
+
+
+def _candidate_pairs(positions: np.ndarray, max_range: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    用边长为 max_range 的立方体网格找出距离可能不超过 max_range 的卫星对：
+    只需比较所在格子及其26个相邻格子中的卫星（spatial_index.cell_pairs），复杂度与候选对数成正比。
+    """
+    n = positions.shape[0]
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    cells = np.floor(positions / max_range)
+    # 平移到原点附近，使打包键的 21 位范围足够使用
+    cells -= np.floor((cells.min(axis=0) + cells.max(axis=0)) / 2)
+    if np.any(np.abs(cells) >= CELL_LIMIT):
+        raise ValueError("卫星分布范围相对 max_range 过大，超出网格范围")
+    rows, cols = cell_pairs(pack_cells(cells))
+    # 按 (行, 列) 排序，便于直接生成 CSR
+    pair_order = np.argsort(rows * n + cols, kind="stable")
+    return rows[pair_order], cols[pair_order]
+
+
+def visible_links(
+    positions: np.ndarray,
+    earth_radius: float = EARTH_RADIUS,
+    max_range: Optional[float] = None,
+    chunk: int = 1024
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    与 visibility_matrix 判定相同，但只返回可见链路的稀疏列表。
+
+    设置 max_range 时先用空间网格筛选候选对，只对候选对计算点积和遮挡，
+    不再构造 N×N 矩阵；未设置时按行分块计算 Gram 矩阵。
+
+    返回:
+        (np.ndarray, np.ndarray, np.ndarray): 行号、列号、距离（按行号、列号有序，双向各一条）
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    n = positions.shape[0]
+    norms = np.einsum("ij,ij->i", positions, positions)
+    r2 = earth_radius * earth_radius
+    if max_range is not None:
+        rows, cols = _candidate_pairs(positions, max_range)
+        gram = np.einsum("ij,ij->i", positions[rows], positions[cols])
+        d2 = np.maximum(norms[rows] + norms[cols] - 2.0 * gram, 0.0)
+        keep = (rows != cols) & (d2 <= max_range * max_range) & \
+            _line_of_sight(gram, norms[rows], norms[cols], d2, r2)
+        return rows[keep], cols[keep], np.sqrt(d2[keep])
+
+    out_rows, out_cols, out_dist = [], [], []
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        gram = positions[start:stop] @ positions.T
+        ni = norms[start:stop, None]
+        d2 = np.maximum(ni + norms[None, :] - 2.0 * gram, 0.0)
+        block = _line_of_sight(gram, ni, norms[None, :], d2, r2)
+        local = np.arange(stop - start)
+        block[local, local + start] = False
+        rows, cols = np.nonzero(block)
+        out_rows.append(rows + start)
+        out_cols.append(cols)
+        out_dist.append(np.sqrt(d2[rows, cols]))
+    if not out_rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    return np.concatenate(out_rows), np.concatenate(out_cols), np.concatenate(out_dist)
+
+
+class ISLRouter:
+    """
+    星间链路路由器
+
+    用法:
+        router = ISLRouter(max_links=4)
+        router.update_from_satellites(opengl_widget.satellites)
+        path = router.route(start_index, end_index)          # 按距离最短
+        path = router.route(start_index, end_index, "hops")  # 按跳数最少
+    """
+
+    def __init__(self, earth_radius: float = EARTH_RADIUS, max_range: Optional[float] = None,
+                 max_links: Optional[int] = None, chunk: int = 1024):
+        """
+        参数:
+            earth_radius: 地球半径（OpenGL 场景单位）
+            max_range: 最大链路距离，None 表示只受遮挡限制
+            max_links: 每颗卫星保留的最近可见链路数，None 表示保留全部（链路取并集，保持对称）
+            chunk: 计算视线矩阵时每次处理的行数
+        """
+        self.earth_radius = earth_radius
+        self.max_range = max_range
+        self.max_links = max_links
+        self.chunk = chunk
+        self.indices: List[int] = []
+        self.rows = {}
+        self.positions = np.empty((0, 3))
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.neighbors = np.empty(0, dtype=np.int64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self._adjacency = []
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def update(self, positions: np.ndarray, indices: Optional[List[int]] = None):
+        """
+        根据坐标重建链路图（CSR 邻接表）
+
+        参数:
+            positions: (N, 3) 坐标数组
+            indices: 每行对应的卫星编号，默认 0..N-1
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        n = positions.shape[0]
+        self.positions = positions
+        self.indices = list(range(n)) if indices is None else list(indices)
+        self.rows = {index: row for row, index in enumerate(self.indices)}
+
+        rows, cols, dist = visible_links(positions, self.earth_radius, self.max_range, self.chunk)
+        if self.max_links is not None:
+            # 每颗卫星保留最近的 max_links 条可见链路，再与反向链路取并集保证链路双向
+            order = np.lexsort((dist, rows))
+            starts = np.zeros(n, dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=n)[:-1], out=starts[1:])
+            chosen = np.zeros(rows.size, dtype=bool)
+            chosen[order] = np.arange(order.size) - starts[rows[order]] < self.max_links
+            # 链路按 (行, 列) 有序，二分查找反向链路
+            keys = rows * n + cols
+            reverse = np.minimum(np.searchsorted(keys, cols * n + rows), max(keys.size - 1, 0))
+            has_reverse = keys[reverse] == cols * n + rows
+            keep = chosen.copy()
+            keep[reverse[chosen & has_reverse]] = True
+            rows, cols, dist = rows[keep], cols[keep], dist[keep]
+
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=self.indptr[1:])
+        self.neighbors = cols
+        self.weights = dist
+        # 搜索时使用 Python 列表，避免逐元素访问 numpy 数组的开销
+        neighbors = cols.tolist()
+        weights = dist.tolist()
+        indptr = self.indptr.tolist()
+        self._adjacency = [
+            list(zip(neighbors[indptr[i]:indptr[i + 1]], weights[indptr[i]:indptr[i + 1]]))
+            for i in range(n)
+        ]
+
+    def update_from_satellites(self, satellites):
+        """从 Constellation、Satellite 对象或含 index/x/y/z 的字典列表重建链路图"""
+        indices, positions = satellite_positions(satellites)
+        self.update(positions, indices)
+
+    def links(self) -> List[Tuple[int, int]]:
+        """返回所有链路 (卫星编号, 卫星编号)，每条链路只出现一次"""
+        rows = np.repeat(np.arange(len(self.indices)), np.diff(self.indptr))
+        upper = rows < self.neighbors
+        return [(self.indices[a], self.indices[b])
+                for a, b in zip(rows[upper].tolist(), self.neighbors[upper].tolist())]
+
+    def _search_distance(self, source: int, target: int) -> Optional[List[int]]:
+        """A* 搜索，启发函数为到终点的直线距离（不会高估，结果与 Dijkstra 相同）"""
+        positions = self.positions
+        goal = positions[target]
+        heuristic = np.linalg.norm(positions - goal, axis=1).tolist()
+        adjacency = self._adjacency
+        best = {source: 0.0}
+        parent = {source: -1}
+        heap = [(heuristic[source], 0.0, source)]
+        while heap:
+            _, cost, node = heapq.heappop(heap)
+            if node == target:
+                break
+            if cost > best[node]:
+                continue
+            for neighbor, weight in adjacency[node]:
+                new_cost = cost + weight
+                if new_cost < best.get(neighbor, math.inf):
+                    best[neighbor] = new_cost
+                    parent[neighbor] = node
+                    heapq.heappush(heap, (new_cost + heuristic[neighbor], new_cost, neighbor))
+        else:
+            return None
+        return self._unwind(parent, target)
+
+    def _search_hops(self, source: int, target: int) -> Optional[List[int]]:
+        """BFS 求最少跳数路径"""
+        adjacency = self._adjacency
+        parent = {source: -1}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            if node == target:
+                return self._unwind(parent, target)
+            for neighbor, _ in adjacency[node]:
+                if neighbor not in parent:
+                    parent[neighbor] = node
+                    queue.append(neighbor)
+        return None
+
+    def _unwind(self, parent: dict, target: int) -> List[int]:
+        path = []
+        node = target
+        while node != -1:
+            path.append(self.indices[node])
+            node = parent[node]
+        path.reverse()
+        return path
+
+    def route(self, start_index: int, end_index: int, metric: str = "distance") -> List[int]:
+        """
+        计算两颗卫星之间的路径
+
+        参数:
+            start_index / end_index: 卫星编号
+            metric: "distance" 按链路总长度最短，"hops" 按跳数最少
+
+        返回:
+            List[int]: 路径上的卫星编号（包含起点和终点），不可达时返回空列表
+        """
+        source = self.rows[start_index]
+        target = self.rows[end_index]
+        if metric == "distance":
+            path = self._search_distance(source, target)
+        elif metric == "hops":
+            path = self._search_hops(source, target)
+        else:
+            raise ValueError(f"未知的路由度量: {metric}")
+        return path or []
+
+    def path_length(self, path: List[int]) -> float:
+        """路径总长度（场景单位）"""
+        points = self.positions[[self.rows[i] for i in path]]
+        return float(np.linalg.norm(np.diff(points, axis=0), axis=1).sum())
+
+
+if __name__ == "__main__":
+    import time
+
+    # 20 个轨道面 × 100 颗卫星的圆轨道星座
+    planes, per_plane = 20, 100
+    n = planes * per_plane
+    plane = np.repeat(np.arange(planes), per_plane)
+    r = np.full(n, 1.8)
+    inclination = np.radians(np.where(plane % 2 == 0, 53.0, 70.0))
+    angle = (np.tile(np.arange(per_plane), planes) * 360.0 / per_plane + plane * 7.0) % 360
+    positions = orbit_positions(r, inclination, angle)
+
+    router = ISLRouter(max_range=0.3, max_links=4)
+    t0 = time.perf_counter()
+    router.update(positions)
+    t1 = time.perf_counter()
+    path = router.route(0, n // 2 + 37)
+    t2 = time.perf_counter()
+    hops = router.route(0, n // 2 + 37, "hops")
+    print(f"{n} 颗卫星建图耗时 {t1 - t0:.3f}s，链路数 {len(router.links())}")
+    print(f"最短距离路径（{(t2 - t1) * 1000:.1f}ms）: {len(path) - 1} 跳，长度 {router.path_length(path):.3f}")
+    print(f"最少跳数路径: {len(hops) - 1} 跳，长度 {router.path_length(hops):.3f}")
+
+    # 两颗卫星位于地球两侧，直连被遮挡
+    visible, _ = visibility_matrix(np.array([[2.0, 0, 0], [-2.0, 0, 0], [1.8, 0.9, 0]]))
+    print("对跖卫星可见:", bool(visible[0, 1]), "相邻卫星可见:", bool(visible[0, 2]))
@@ -0,0 +1,259 @@
+"""
+开普勒轨道根数 / TLE 星座外推
+
+界面中的卫星轨道是写死的圆轨道，每帧转过固定角度。本模块读取 TLE 或开普勒根数文件，
+按二体模型（含升交点赤经 RAAN 与偏心率）一次调用即可外推全部卫星在一组时间点上的位置：
+平近点角 → 牛顿迭代解开普勒方程 → 近焦点坐标 → 惯性系坐标。
+与时间无关的三角函数（Ω、i、ω 对应的旋转）在加载时计算一次并缓存。
+
+惯性系坐标按 SCENE_EARTH_RADIUS / EARTH_RADIUS_KM 缩放后即为 OpenGL 场景坐标，
+RAAN 为 0 时与 Satellite.update_position 的公式完全一致；
+satellite_dicts 输出与 plan_satellite_path / api.md 相同格式的卫星字典。
+"""
+
+import csv
+import io
+import math
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import numpy as np
+
+from BackEnd.constellation import EARTH_RADIUS as SCENE_EARTH_RADIUS
+
+MU_EARTH = 398600.4418      # 地球引力常数 km^3/s^2
+EARTH_RADIUS_KM = 6371.0    # 地球平均半径 km
+SCENE_SCALE = SCENE_EARTH_RADIUS / EARTH_RADIUS_KM
+_TWO_PI = 2.0 * math.pi
+
+
+def _tle_epoch(field: str) -> float:
+    """TLE 历元（YYDDD.DDDDDDDD）转换为 Unix 时间（秒）"""
+    year = int(field[:2])
+    year += 2000 if year < 57 else 1900
+    day = float(field[2:])
+    start = datetime(year, 1, 1, tzinfo=timezone.utc).timestamp()
+    return start + (day - 1.0) * 86400.0
+
+
+class OrbitalElements:
+    """
+    一组卫星的开普勒轨道根数（按列存储的数组）
+
+    用法:
+        elements = load_elements("starlink.tle")
+        xyz = elements.scene_positions(times)     # (T, N, 3) OpenGL 场景坐标
+    """
+
+    def __init__(self, a, e, i, raan, argp, mean_anomaly, epoch=0.0,
+                 names: Optional[List[str]] = None, indices: Optional[List[int]] = None):
+        """
+        参数:
+            a: 半长轴（km）
+            e: 偏心率
+            i / raan / argp / mean_anomaly: 倾角、升交点赤经、近地点幅角、历元平近点角（度）
+            epoch: 历元（Unix 时间，秒），标量或数组
+            names / indices: 卫星名称与编号
+        """
+        self.a = np.atleast_1d(np.asarray(a, dtype=np.float64))
+        n = self.a.shape[0]
+        as_array = lambda values: np.broadcast_to(np.asarray(values, dtype=np.float64), (n,)).copy()
+        self.e = as_array(e)
+        self.i = as_array(i)
+        self.raan = as_array(raan)
+        self.argp = as_array(argp)
+        self.mean_anomaly = as_array(mean_anomaly)
+        self.epoch = as_array(epoch)
+        self.indices = list(range(n)) if indices is None else list(indices)
+        self.names = [f"Sat-{k}" for k in self.indices] if names is None else list(names)
+        if np.any((self.e < 0) | (self.e >= 1)):
+            raise ValueError("只支持椭圆轨道（0 <= e < 1）")
+        self._cache()
+
+    def _cache(self):
+        """缓存与时间无关的量：平均角速度、sqrt(1-e²) 以及近焦点坐标轴在惯性系中的方向"""
+        self.mean_motion = np.sqrt(MU_EARTH / self.a ** 3)          # rad/s
+        self._b_over_a = np.sqrt(1.0 - self.e ** 2)
+        cos_o, sin_o = np.cos(np.radians(self.raan)), np.sin(np.radians(self.raan))
+        cos_i, sin_i = np.cos(np.radians(self.i)), np.sin(np.radians(self.i))
+        cos_w, sin_w = np.cos(np.radians(self.argp)), np.sin(np.radians(self.argp))
+        # P 指向近地点，Q 为轨道面内与 P 垂直的方向
+        self._p = np.stack([cos_o * cos_w - sin_o * sin_w * cos_i,
+                            sin_o * cos_w + cos_o * sin_w * cos_i,
+                            sin_w * sin_i], axis=1)
+        self._q = np.stack([-cos_o * sin_w - sin_o * cos_w * cos_i,
+                            -sin_o * sin_w + cos_o * cos_w * cos_i,
+                            cos_w * sin_i], axis=1)
+        self._m0 = np.radians(self.mean_anomaly)
+
+    def __len__(self) -> int:
+        return self.a.shape[0]
+
+    def eccentric_anomaly(self, times, tolerance: float = 1e-12, max_iter: int = 30) -> np.ndarray:
+        """
+        求解开普勒方程 E - e·sinE = M（向量化牛顿迭代）
+
+        参数:
+            times: 时间点（Unix 时间，秒），形状 (T,)
+
+        返回:
+            np.ndarray: 偏近点角（弧度），形状 (T, N)
+        """
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+        mean = self._m0[None, :] + self.mean_motion[None, :] * (times[:, None] - self.epoch[None, :])
+        mean = np.mod(mean, _TWO_PI)
+        e = self.e[None, :]
+        # 高偏心率时以 π 作为初值更稳定
+        anomaly = np.where(e < 0.8, mean, math.pi)
+        for _ in range(max_iter):
+            step = (anomaly - e * np.sin(anomaly) - mean) / (1.0 - e * np.cos(anomaly))
+            anomaly -= step
+            if np.max(np.abs(step), initial=0.0) < tolerance:
+                break
+        return anomaly
+
+    def positions(self, times) -> np.ndarray:
+        """惯性系坐标（km），形状 (T, N, 3)"""
+        anomaly = self.eccentric_anomaly(times)
+        x = self.a * (np.cos(anomaly) - self.e)
+        y = self.a * self._b_over_a * np.sin(anomaly)
+        return x[..., None] * self._p + y[..., None] * self._q
+
+    def scene_positions(self, times) -> np.ndarray:
+        """OpenGL 场景坐标（地球半径 1.5），形状 (T, N, 3)，可直接用于 draw_satellite_model"""
+        return self.positions(times) * SCENE_SCALE
+
+    def argument_of_latitude(self, times) -> np.ndarray:
+        """纬度幅角 u = ω + ν（度，0~360），即卫星在轨道面内相对升交点的角度，形状 (T, N)"""
+        anomaly = self.eccentric_anomaly(times)
+        true_anomaly = 2.0 * np.arctan2(np.sqrt(1.0 + self.e) * np.sin(anomaly / 2),
+                                        np.sqrt(1.0 - self.e) * np.cos(anomaly / 2))
+        return np.mod(np.degrees(true_anomaly) + self.argp, 360.0)
+
+    def orbit_paths(self, samples: int = 360) -> np.ndarray:
+        """每条轨道一圈的场景坐标折线，形状 (N, samples, 3)，用于替代 draw_orbit 的圆轨道"""
+        anomaly = np.linspace(0.0, _TWO_PI, samples, endpoint=False)[:, None]
+        x = self.a * (np.cos(anomaly) - self.e)
+        y = self.a * self._b_over_a * np.sin(anomaly)
+        path = x[..., None] * self._p + y[..., None] * self._q
+        return np.transpose(path, (1, 0, 2)) * SCENE_SCALE
+
+    def satellite_dicts(self, time: float, decimals: int = 2) -> List[dict]:
+        """
+        生成 plan_satellite_path 与 api.md 使用的卫星字典
+
+        返回:
+            List[dict]: {"index", "name", "r"（地心距离 km）, "angle"（纬度幅角，度）, "speed"（度/秒）}
+        """
+        positions = self.positions([time])[0]
+        distance = np.linalg.norm(positions, axis=1)
+        angle = self.argument_of_latitude([time])[0]
+        # 纬度幅角变化率 = 角动量 / r²
+        rate = np.degrees(np.sqrt(MU_EARTH * self.a * (1.0 - self.e ** 2)) / distance ** 2)
+        return [
+            {"index": index, "name": name, "r": round(r, decimals), "angle": round(u, decimals),
+             "speed": round(w, 4)}
+            for index, name, r, u, w in zip(self.indices, self.names, distance.tolist(), angle.tolist(),
+                                            rate.tolist())
+        ]
+
+
+def parse_tle(text: str) -> OrbitalElements:
+    """
+    解析 TLE 文本（两行或带名称的三行格式，可混合）
+
+    返回:
+        OrbitalElements
+    """
+    lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+    names, epoch, i, raan, e, argp, mean_anomaly, mean_motion = [], [], [], [], [], [], [], []
+    k = 0
+    while k < len(lines):
+        name = None
+        if not lines[k].startswith("1 "):
+            name = lines[k].strip()
+            k += 1
+        if k + 1 >= len(lines) or not lines[k].startswith("1 ") or not lines[k + 1].startswith("2 "):
+            raise ValueError(f"TLE 格式错误（第 {k + 1} 行附近）")
+        line1, line2 = lines[k], lines[k + 1]
+        names.append(name or line1[2:7].strip())
+        epoch.append(_tle_epoch(line1[18:32]))
+        i.append(float(line2[8:16]))
+        raan.append(float(line2[17:25]))
+        e.append(float("0." + line2[26:33].strip()))
+        argp.append(float(line2[34:42]))
+        mean_anomaly.append(float(line2[43:51]))
+        mean_motion.append(float(line2[52:63]))
+        k += 2
+    # 平均运动（圈/天）换算为半长轴
+    n = np.asarray(mean_motion) * _TWO_PI / 86400.0
+    a = np.cbrt(MU_EARTH / n ** 2)
+    return OrbitalElements(a, e, i, raan, argp, mean_anomaly, epoch, names=names)
+
+
+# 开普勒根数 CSV 的必填列（name 与 epoch 可省略）
+_KEPLERIAN_COLUMNS = ("a_km", "e", "i_deg", "raan_deg", "argp_deg", "mean_anomaly_deg")
+
+
+def parse_keplerian(text: str) -> OrbitalElements:
+    """
+    解析开普勒根数 CSV，表头：
+        name,a_km,e,i_deg,raan_deg,argp_deg,mean_anomaly_deg[,epoch]
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    if reader.fieldnames is None:
+        raise ValueError("开普勒根数文件为空")
+    missing = [key for key in _KEPLERIAN_COLUMNS if key not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"开普勒根数表头缺少列: {', '.join(missing)}")
+    rows = list(reader)
+    if not rows:
+        raise ValueError("开普勒根数文件为空")
+    for line, row in enumerate(rows, start=2):
+        missing = [key for key in _KEPLERIAN_COLUMNS if not (row.get(key) or "").strip()]
+        if missing:
+            raise ValueError(f"开普勒根数第 {line} 行缺少字段: {', '.join(missing)}")
+    column = lambda key, default=None: [float(row.get(key) or default) for row in rows]
+    return OrbitalElements(
+        column("a_km"), column("e"), column("i_deg"), column("raan_deg"), column("argp_deg"),
+        column("mean_anomaly_deg"), column("epoch", 0.0), names=[row.get("name") or "" for row in rows],
+    )
+
+
+def load_elements(path: str) -> OrbitalElements:
+    """按内容自动识别 TLE 或开普勒根数 CSV 文件"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    first = text.lstrip().splitlines()[0] if text.strip() else ""
+    if os.path.splitext(path)[1].lower() == ".csv" or first.startswith("name,"):
+        return parse_keplerian(text)
+    return parse_tle(text)
+
+
+if __name__ == "__main__":
+    import time
+
+    iss = parse_tle("""ISS (ZARYA)
+1 25544U 98067A   24001.50000000  .00016717  00000-0  10270-3 0  9005
+2 25544  51.6416 247.4627 0006703 130.5360 325.0288 15.72125391428300
+""")
+    print("ISS 半长轴: %.1f km, 周期: %.1f 分钟" % (iss.a[0], _TWO_PI / iss.mean_motion[0] / 60))
+    print("ISS 卫星字典:", iss.satellite_dicts(iss.epoch[0]))
+
+    # 与圆轨道公式一致性：RAAN=0、e=0 时等同于 Satellite.update_position
+    circle = OrbitalElements(2.5 / SCENE_SCALE, 0.0, 45.0, 0.0, 0.0, 30.0)
+    u = math.radians(30.0)
+    print("与圆轨道公式一致:", np.allclose(circle.scene_positions([0.0])[0, 0],
+                                   [2.5 * math.cos(u), 2.5 * math.sin(u) * math.cos(math.radians(45)),
+                                    2.5 * math.sin(u) * math.sin(math.radians(45))]))
+
+    # 1000 颗卫星、一天内每分钟一个时间点
+    rng = np.random.default_rng(0)
+    n = 1000
+    elements = OrbitalElements(rng.uniform(6700, 7500, n), rng.uniform(0, 0.05, n), rng.uniform(0, 98, n),
+                               rng.uniform(0, 360, n), rng.uniform(0, 360, n), rng.uniform(0, 360, n))
+    times = np.arange(0, 86400, 60.0)
+    t0 = time.perf_counter()
+    xyz = elements.scene_positions(times)
+    print(f"{n} 颗卫星 × {times.size} 个时间点外推耗时 {time.perf_counter() - t0:.3f}s，输出形状 {xyz.shape}")
@@ -0,0 +1,291 @@
+"""
+路径规划 Socket 服务（api.md “数据链路规划 API”）
+
+基于 asyncio 的 TCP 服务，监听 127.0.0.1:12346。每条消息为
+4字节大端长度前缀 + UTF-8 JSON，请求格式：
+
+    {"satellites": [...], "start": [0, 3], "end": [2, 5]}
+
+start/end 可包含多个元素，按位置配对成一批路径查询，返回：
+
+    {"path": [...第一组路径...], "paths": [[...], [...]]}
+
+同一连接上可以连续发送多个请求而不必等待响应（pipelining），响应按请求顺序返回；
+{"cmd": "stats"} 返回请求数与处理时延的 p50/p99。
+"""
+
+import asyncio
+import json
+import struct
+import sys
+import time
+from collections import deque
+from typing import List, Optional
+
+from BackEnd.plan_satellite_path import RingPlanner
+from BackEnd.route_cache import RouteCache, ring_links
+
+HOST = "127.0.0.1"
+PORT = 12346
+_LENGTH = struct.Struct("!I")
+# 单条消息的最大长度，超出视为非法请求并断开连接
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+
+def encode_message(obj) -> bytes:
+    """JSON 对象编码为带长度前缀的消息"""
+    body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _LENGTH.pack(len(body)) + body
+
+
+async def read_message(reader: asyncio.StreamReader):
+    """读取一条消息，连接关闭时返回 None"""
+    try:
+        header = await reader.readexactly(_LENGTH.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (length,) = _LENGTH.unpack(header)
+    if length > MAX_MESSAGE_SIZE:
+        raise ValueError(f"消息过长: {length} 字节")
+    return json.loads(await reader.readexactly(length))
+
+
+class LatencyStats:
+    """最近若干次请求的处理时延统计"""
+
+    def __init__(self, window: int = 10000):
+        self.samples = deque(maxlen=window)
+        self.requests = 0
+        self.queries = 0
+        self.errors = 0
+
+    def record(self, seconds: float, queries: int):
+        self.samples.append(seconds)
+        self.requests += 1
+        self.queries += queries
+
+    def percentile(self, q: float) -> float:
+        """第 q 百分位时延（毫秒）"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100.0 * len(ordered)))] * 1000.0
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "errors": self.errors,
+            "p50_ms": round(self.percentile(50), 3),
+            "p99_ms": round(self.percentile(99), 3),
+        }
+
+
+class PathService:
+    """
+    路径规划服务
+
+    用法:
+        service = PathService()
+        asyncio.run(service.serve_forever())
+    """
+
+    def __init__(self, host: str = HOST, port: int = PORT):
+        self.host = host
+        self.port = port
+        self.planner = RingPlanner()
+        self.cache = RouteCache()
+        self.stats = LatencyStats()
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    def plan(self, request: dict, planner: Optional[RingPlanner] = None, cache: Optional[RouteCache] = None) -> dict:
+        """
+        处理一个请求（同步执行，规划过程中不会切换协程，无需加锁）
+
+        参数:
+            request (dict): 请求对象
+            planner / cache: 所用的规划器与路径缓存，默认为服务自身的实例；
+                handle 为每个连接单独创建，不同客户端的卫星集合互不影响
+        """
+        planner = self.planner if planner is None else planner
+        cache = self.cache if cache is None else cache
+        if not isinstance(request, dict):
+            raise TypeError("请求必须为 JSON 对象")
+        if request.get("cmd") == "stats":
+            return self.stats.snapshot()
+        starts = request["start"]
+        ends = request["end"]
+        if isinstance(starts, int):
+            starts, ends = [starts], [ends]
+        if len(starts) != len(ends):
+            raise ValueError("start 与 end 长度不一致")
+        if planner.update(request["satellites"]):
+            cache.update_topology(ring_links(planner.ring))
+
+        paths: List[Optional[List[int]]] = [cache.get(s, e) for s, e in zip(starts, ends)]
+        missing = [i for i, path in enumerate(paths) if path is None]
+        if missing:
+            # 未命中的查询一次性批量规划
+            planned = planner.plan_paths([starts[i] for i in missing], [ends[i] for i in missing])
+            for i, path in zip(missing, planned):
+                cache.put(starts[i], ends[i], path)
+                paths[i] = path
+        return {"path": paths[0] if paths else [], "paths": paths}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """处理一个客户端连接：按顺序读取请求并逐个应答"""
+        planner, cache = RingPlanner(), RouteCache()
+        try:
+            while True:
+                try:
+                    request = await read_message(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    self.stats.errors += 1
+                    break
+                if request is None:
+                    break
+                t0 = time.perf_counter()
+                try:
+                    response = self.plan(request, planner, cache)
+                    queries = len(response.get("paths", ()))
+                except Exception as e:
+                    # 任何非法请求都只回复错误帧，不影响同一连接上的后续请求
+                    self.stats.errors += 1
+                    response = {"error": f"{type(e).__name__}: {e}"}
+                    queries = 0
+                writer.write(encode_message(response))
+                await writer.drain()
+                self.stats.record(time.perf_counter() - t0, queries)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        return self.server
+
+    async def serve_forever(self):
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+class PathClient:
+    """
+    路径规划客户端
+
+    用法:
+        client = await PathClient.connect()
+        result = await client.request(satellites, [0], [2])
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str = HOST, port: int = PORT):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    def send(self, satellites, start, end):
+        """只发送请求，不等待响应（用于 pipelining）"""
+        self.writer.write(encode_message({"satellites": satellites, "start": start, "end": end}))
+
+    async def receive(self) -> dict:
+        response = await read_message(self.reader)
+        if response is None:
+            raise ConnectionError("服务端已断开连接")
+        return response
+
+    async def request(self, satellites, start, end) -> dict:
+        self.send(satellites, start, end)
+        await self.writer.drain()
+        return await self.receive()
+
+    async def stats(self) -> dict:
+        self.writer.write(encode_message({"cmd": "stats"}))
+        await self.writer.drain()
+        return await self.receive()
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def benchmark(clients: int = 16, requests: int = 200, pipeline: int = 8, batch: int = 4,
+                    satellites: int = 64, host: str = HOST, port: int = PORT) -> dict:
+    """
+    本地压测：多个并发客户端，每个客户端保持 pipeline 个未完成请求
+
+    返回:
+        dict: 客户端侧吞吐量与往返时延 p50/p99，以及服务端统计
+    """
+    import random
+
+    sats = [{"index": i, "name": f"Sat-{i}", "r": 2.5, "angle": round(random.uniform(0, 360), 2), "speed": 12.5}
+            for i in range(satellites)]
+    round_trips = []
+
+    async def run_client():
+        client = await PathClient.connect(host, port)
+        sent_at = deque()
+        sent = received = 0
+        while received < requests:
+            while sent < requests and len(sent_at) < pipeline:
+                for sat in sats:
+                    sat["angle"] = round((sat["angle"] + 0.2) % 360, 2)
+                start = [random.randrange(satellites) for _ in range(batch)]
+                end = [random.randrange(satellites) for _ in range(batch)]
+                client.send(sats, start, end)
+                sent_at.append(time.perf_counter())
+                sent += 1
+            await client.writer.drain()
+            await client.receive()
+            round_trips.append(time.perf_counter() - sent_at.popleft())
+            received += 1
+        await client.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(run_client() for _ in range(clients)))
+    elapsed = time.perf_counter() - t0
+    client = await PathClient.connect(host, port)
+    server_stats = await client.stats()
+    await client.close()
+    round_trips.sort()
+    return {
+        "requests_per_s": round(clients * requests / elapsed, 1),
+        "queries_per_s": round(clients * requests * batch / elapsed, 1),
+        "rtt_p50_ms": round(round_trips[len(round_trips) // 2] * 1000, 3),
+        "rtt_p99_ms": round(round_trips[int(len(round_trips) * 0.99)] * 1000, 3),
+        "server": server_stats,
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        print(f"路径规划服务监听 {HOST}:{PORT}")
+        asyncio.run(PathService().serve_forever())
+    else:
+        async def main():
+            service = PathService(port=0)
+            server = await service.start()
+            port = server.sockets[0].getsockname()[1]
+            client = await PathClient.connect(HOST, port)
+            example = [
+                {"index": 0, "name": "Hubble", "r": 6789.0, "angle": 132.45, "speed": 3.21},
+                {"index": 1, "name": "ISS", "r": 6791.5, "angle": 85.30, "speed": 2.98},
+                {"index": 2, "name": "GPS-3", "r": 20345.8, "angle": 14.78, "speed": 1.05},
+            ]
+            print("示例请求:", await client.request(example, [0], [2]))
+            await client.close()
+            print("压测结果:", await benchmark(port=port))
+            await service.close()
+
+        asyncio.run(main())
@@ -1,3 +1,204 @@
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class RingPlanner:
+    """
+    维护按角度排序的卫星环，供多次路径规划复用。
+
+    卫星之间很少互相超越，每次更新角度后对上一次的环重新排序几乎是线性的
+    （Timsort 对近乎有序的序列只需 O(n)），卫星在环上的位置由字典直接查到，
+    单次查询只需遍历路径本身。
+
+    用法:
+        planner = RingPlanner()
+        planner.update(satellites)      # 每帧或每次选星前更新角度
+        path = planner.plan(start_index, end_index)
+    """
+
+    def __init__(self, satellites=None):
+        self.ring = []          # 按角度排序的卫星 index
+        self.positions = {}     # 卫星 index -> 在环上的位置
+        self.angles = {}        # 卫星 index -> 角度
+        self._order = {}        # 卫星 index -> 在输入列表中的位置（角度相同时保持输入顺序）
+        self._tables = None     # 批量查询用的稀疏表，角度更新后失效
+        if satellites is not None:
+            self.update(satellites)
+
+    def __len__(self):
+        return len(self.ring)
+
+    def update(self, satellites):
+        """
+        更新卫星角度并维护有序环。
+
+        Args:
+            satellites (List[dict]): 卫星列表，每个字典至少包含 'index' 与 'angle'
+
+        Returns:
+            bool: 环上的顺序是否发生了变化
+        """
+        self.angles = {sat['index']: sat['angle'] for sat in satellites}
+        order = {sat['index']: i for i, sat in enumerate(satellites)}
+        old_ring = list(self.ring)
+        rebuilt = order.keys() != self._order.keys()
+        if rebuilt:
+            # 卫星集合变化，重新建环
+            self.ring = list(order)
+        self._order = order
+        self._tables = None
+
+        angles = self.angles
+        self.ring.sort(key=lambda i: (angles[i], order[i]))
+        changed = rebuilt or self.ring != old_ring
+        if changed:
+            self.positions = {index: pos for pos, index in enumerate(self.ring)}
+        return changed
+
+    def build_path(self, start, end, clockwise=True):
+        """沿环构造从 start 到 end 的路径（包含起点和终点）"""
+        ring = self.ring
+        n = len(ring)
+        start_pos = self.positions[start]
+        end_pos = self.positions[end]
+        if clockwise:
+            if end_pos < start_pos:
+                end_pos += n
+            return [ring[i % n] for i in range(start_pos, end_pos + 1)]
+        if end_pos > start_pos:
+            start_pos += n
+        return [ring[i % n] for i in range(start_pos, end_pos - 1, -1)]
+
+    def max_jump_angle(self, path):
+        """路径中相邻两跳的最大角度变化，单点路径为 0"""
+        angles = self.angles
+        return max(
+            ((angles[path[i + 1]] - angles[path[i]]) % 360 for i in range(len(path) - 1)),
+            default=0
+        )
+
+    def plan(self, start_index, end_index):
+        """
+        计算从起始卫星到目标卫星的最优转发路径（规则同 plan_satellite_path）。
+
+        Returns:
+            List[int]: 最优路径上经过的卫星索引列表（包含起点和终点）
+        """
+        cw_path = self.build_path(start_index, end_index, clockwise=True)
+        ccw_path = self.build_path(start_index, end_index, clockwise=False)
+        cw_max = self.max_jump_angle(cw_path)
+        ccw_max = self.max_jump_angle(ccw_path)
+
+        if cw_max <= ccw_max:
+            logger.info("Using clockwise path (max jump %s°): %s", cw_max, cw_path)
+            return cw_path
+        logger.info("Using counter-clockwise path (max jump %s°): %s", ccw_max, ccw_path)
+        return ccw_path
+
+    def _sparse_tables(self):
+        """
+        构建环上相邻间隔的区间最大值稀疏表。
+
+        cw_gap[k] 为从环上位置 k 顺时针跳到 k+1 的角度，ccw_gap[k] 为从 k+1 逆时针跳回 k 的角度，
+        两者都复制一份接在后面，环上任意一段连续间隔都对应数组中的一个区间。
+        """
+        if self._tables is None:
+            ring_angles = np.array([self.angles[i] for i in self.ring], dtype=np.float64)
+            following = np.roll(ring_angles, -1)
+            tables = []
+            for gaps in ((following - ring_angles) % 360, (ring_angles - following) % 360):
+                level = np.concatenate([gaps, gaps])
+                levels = [level]
+                width = 1
+                while 2 * width <= len(self.ring):
+                    level = np.maximum(level[:-width], level[width:])
+                    levels.append(level)
+                    width *= 2
+                tables.append(levels)
+            # 卫星 index 升序排列及其在环上的位置，查询时二分查找（index 可以很大或不连续）
+            indices = np.fromiter(self.positions.keys(), dtype=np.int64, count=len(self.positions))
+            order = np.argsort(indices)
+            positions = np.fromiter(self.positions.values(), dtype=np.int64, count=len(self.positions))
+            self._tables = (tables[0], tables[1], (indices[order], positions[order]))
+        return self._tables
+
+    @staticmethod
+    def _range_max(levels, left, length):
+        """查询 levels[0][left:left+length] 的最大值，length 为 0 时结果为 0"""
+        result = np.zeros(left.shape, dtype=np.float64)
+        nonempty = length > 0
+        left = left[nonempty]
+        length = length[nonempty]
+        k = np.floor(np.log2(length)).astype(np.int64)
+        # 浮点 log2 在2的幂附近可能有误差，修正层号
+        k -= (1 << k) > length
+        k += (2 << k) <= length
+        values = np.empty(left.shape, dtype=np.float64)
+        for level in np.unique(k):
+            sel = k == level
+            table = levels[level]
+            l = left[sel]
+            r = l + length[sel] - (1 << int(level))
+            values[sel] = np.maximum(table[l], table[r])
+        result[nonempty] = values
+        return result
+
+    @staticmethod
+    def _ring_positions(lookup, indices):
+        """卫星 index 数组 -> 环上位置，任一 index 不在环上时抛出 KeyError"""
+        keys, positions = lookup
+        indices = np.asarray(indices, dtype=np.int64)
+        found = np.minimum(np.searchsorted(keys, indices), max(keys.size - 1, 0))
+        if keys.size == 0 or (keys[found] != indices).any():
+            raise KeyError("卫星 index 不在环上")
+        return positions[found]
+
+    def max_jumps(self, start_indices, end_indices):
+        """
+        批量计算顺时针与逆时针路径的最大跳跃角度，预处理 O(n log n)，每个查询 O(1)。
+
+        Args:
+            start_indices / end_indices: 起止卫星 index 数组（等长）
+
+        Returns:
+            (np.ndarray, np.ndarray): 顺时针最大跳跃角度、逆时针最大跳跃角度
+        """
+        cw_levels, ccw_levels, lookup = self._sparse_tables()
+        n = len(self.ring)
+        start_pos = self._ring_positions(lookup, start_indices)
+        end_pos = self._ring_positions(lookup, end_indices)
+        # 顺时针经过间隔 start..end-1，逆时针经过间隔 end..start-1
+        cw_max = self._range_max(cw_levels, start_pos, (end_pos - start_pos) % n)
+        ccw_max = self._range_max(ccw_levels, end_pos, (start_pos - end_pos) % n)
+        return cw_max, ccw_max
+
+    def plan_batch(self, start_indices, end_indices):
+        """
+        批量选择路径方向（规则同 plan：顺时针最大跳跃不大于逆时针时走顺时针）。
+
+        Returns:
+            (np.ndarray, np.ndarray): 是否顺时针的布尔数组、所选路径的最大跳跃角度
+        """
+        cw_max, ccw_max = self.max_jumps(start_indices, end_indices)
+        clockwise = cw_max <= ccw_max
+        return clockwise, np.where(clockwise, cw_max, ccw_max)
+
+    def plan_paths(self, start_indices, end_indices):
+        """批量规划并展开路径，返回与输入等长的路径列表"""
+        clockwise, _ = self.plan_batch(start_indices, end_indices)
+        return [
+            self.build_path(start, end, cw)
+            for start, end, cw in zip(np.asarray(start_indices).tolist(), np.asarray(end_indices).tolist(),
+                                      clockwise.tolist())
+        ]
+
+
+# plan_satellite_path 共用的规划器，连续调用时复用上一次的有序环
+_planner = RingPlanner()
+
+
 def plan_satellite_path(satellites, start_index, end_index):
     """
     计算从起始卫星到目标卫星的最优转发路径，自动选择顺时针或逆时针方向，
@@ -15,45 +216,26 @@ def plan_satellite_path(satellites, start_index, end_index):
 
     Returns:
         List[int]: 最优路径上经过的卫星索引列表（包含起点和终点）
-    """   
-    # 按角度排序
-    sorted_sats = sorted(satellites, key=lambda s: s['angle'])
-    index_ring = [sat['index'] for sat in sorted_sats]
-    angle_map = {sat['index']: sat['angle'] for sat in satellites}
-
-    def build_path(start, end, clockwise=True):
-        start_pos = index_ring.index(start)
-        end_pos = index_ring.index(end)
-        path = []
-
-        if clockwise:
-            if end_pos < start_pos:
-                end_pos += len(index_ring)
-            path = [index_ring[i % len(index_ring)] for i in range(start_pos, end_pos + 1)]
-        else:
-            if end_pos > start_pos:
-                start_pos += len(index_ring)
-            path = [index_ring[i % len(index_ring)] for i in range(start_pos, end_pos - 1, -1)]
-        return path
-
-    def max_jump_angle(path):
-        return max(
-            (angle_map[path[i+1]] - angle_map[path[i]]) % 360
-            for i in range(len(path) - 1)
-        )
+    """
+    _planner.update(satellites)
+    return _planner.plan(start_index, end_index)
 
-    # 构造两种路径
-    cw_path = build_path(start_index, end_index, clockwise=True)
-    ccw_path = build_path(start_index, end_index, clockwise=False)
 
-    # 计算每种路径的最大跳跃角度
-    cw_max = max_jump_angle(cw_path)
-    ccw_max = max_jump_angle(ccw_path)
+if __name__ == "__main__":
+    # 回归检查：共用规划器先后处理两组不同的卫星集合（数量相同、输入已按角度有序），
+    # 第二次调用必须使用新集合的位置表
+    first = [{'index': i, 'angle': i * 60.0} for i in range(6)]
+    second = [{'index': i + 5, 'angle': i * 60.0} for i in range(6)]
+    print(plan_satellite_path(first, 0, 3))
+    path = plan_satellite_path(second, 5, 10)
+    print(path, "使用新集合的位置表:", path[0] == 5 and path[-1] == 10 and sorted(_planner.positions) == list(range(5, 11)))
 
-    # 选择更平滑的路径
-    if cw_max <= ccw_max:
-        print(f"Using clockwise path (max jump {cw_max}°): {cw_path}")
-        return cw_path
-    else:
-        print(f"Using counter-clockwise path (max jump {ccw_max}°): {ccw_path}")
-        return ccw_path
+    # 批量查询：不在环上的 index（负数、大于最大 index）抛出 KeyError，稀疏的大 index 不会分配巨大的表
+    sparse = RingPlanner([{'index': i * 10 ** 9, 'angle': i * 60.0} for i in range(6)])
+    print("稀疏 index 批量查询:", sparse.plan_paths([0], [3 * 10 ** 9]))
+    for bad in ([-1], [11], [10 ** 12]):
+        try:
+            _planner.max_jumps([10], bad)
+            print(bad, "未被拒绝")
+        except KeyError as e:
+            print(bad, "被拒绝:", e)
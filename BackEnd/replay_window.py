@@ -0,0 +1,199 @@
+"""
+接收端重复包/重放包检测
+
+每个 (源地址, 目的地址) 流维护一个定长滑动窗口：记录已接收的最大序列号，
+窗口内每个位置保存最近一次在该位置接收的序列号（位置 = sequence % window），
+判断一个包是否已接收只需一次数组访问，窗口前移时无需移位或清零。
+所有流的状态预分配在固定大小的 numpy 数组中，超出容量时按LRU淘汰最久未活动的流，
+内存占用与包数量无关。accept_batch 可直接处理 wrapper_batch 解析出的整批协议头。
+"""
+
+from collections import OrderedDict
+import time
+import numpy as np
+
+from BackEnd.wrapper import _encode_address
+from BackEnd.wrapper_batch import HEADER_DTYPE
+
+# 组合排序键时序列号所占位数（序列号为32位）
+_SEQ_SHIFT = 33
+
+
+class ReplayFilter:
+    """
+    基于滑动窗口的重放检测器
+
+    用法:
+        replay = ReplayFilter(window=512)
+        if replay.accept("TerminalA", "TerminalB", info["sequence"]):
+            ...   # 新包
+    """
+
+    def __init__(self, window: int = 512, max_flows: int = 1024, max_age: float = None):
+        """
+        参数:
+            window (int): 窗口大小，序列号落后最大值超过窗口的包视为过期
+            max_flows (int): 同时跟踪的最大流数，超出时淘汰最久未活动的流
+            max_age (float): 协议头时间戳允许的最大时延（秒），None 表示不检查
+        """
+        self.window = window
+        self.max_flows = max_flows
+        self.max_age = max_age
+        self._highest = np.full(max_flows, -1, dtype=np.int64)
+        self._seen = np.full((max_flows, window), -1, dtype=np.int64)
+        self._flows = OrderedDict()
+        self._free = list(range(max_flows - 1, -1, -1))
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._flows)
+
+    def _slot(self, key: bytes) -> int:
+        """取得流对应的状态槽位，必要时淘汰最久未活动的流"""
+        slot = self._flows.get(key)
+        if slot is not None:
+            self._flows.move_to_end(key)
+            return slot
+        if self._free:
+            slot = self._free.pop()
+        else:
+            _, slot = self._flows.popitem(last=False)
+            self.evicted += 1
+        self._highest[slot] = -1
+        self._seen[slot] = -1
+        self._flows[key] = slot
+        return slot
+
+    def accept(self, source, destination, sequence: int, timestamp: int = None, now: float = None) -> bool:
+        """
+        判断单个包是否为新包，是则记录并返回 True，重复/过期返回 False
+
+        参数:
+            source / destination: 地址（str 或16字节 bytes）
+            sequence (int): 协议头序列号
+            timestamp (int): 协议头时间戳，仅在设置了 max_age 时使用
+            now (float): 当前时间，默认 time.time()
+        """
+        if self.max_age is not None and timestamp is not None:
+            if timestamp < (time.time() if now is None else now) - self.max_age:
+                return False
+        if isinstance(source, str):
+            source = _encode_address(source)
+        if isinstance(destination, str):
+            destination = _encode_address(destination)
+        slot = self._slot(source.ljust(16, b"\x00") + destination.ljust(16, b"\x00"))
+        highest = int(self._highest[slot])
+        if highest >= 0 and sequence <= highest - self.window:
+            return False
+        pos = sequence % self.window
+        if self._seen[slot, pos] == sequence:
+            return False
+        self._seen[slot, pos] = sequence
+        if sequence > highest:
+            self._highest[slot] = sequence
+        return True
+
+    def accept_batch(self, headers: np.ndarray, now: float = None) -> np.ndarray:
+        """
+        向量化处理一批协议头（HEADER_DTYPE），结果与按顺序逐个调用 accept 相同
+
+        返回:
+            np.ndarray: 布尔掩码，True 表示新包
+        """
+        n = headers.shape[0]
+        mask = np.zeros(n, dtype=bool)
+        if n == 0:
+            return mask
+        live = np.ones(n, dtype=bool)
+        if self.max_age is not None:
+            live = headers["timestamp"].astype(np.float64) >= (time.time() if now is None else now) - self.max_age
+        idx = np.flatnonzero(live)
+        if idx.size == 0:
+            return mask
+
+        # 以源+目的地址的32字节作为流键
+        raw = np.ascontiguousarray(headers.view(np.uint8).reshape(n, HEADER_DTYPE.itemsize)[idx, 1:33])
+        keys, inverse = np.unique(raw.view("V32").ravel(), return_inverse=True)
+        if keys.size > self.max_flows:
+            # 流数超过状态容量时对半拆分批次，避免同一批次内槽位被复用
+            half = n // 2
+            mask[:half] = self.accept_batch(headers[:half], now)
+            mask[half:] = self.accept_batch(headers[half:], now)
+            return mask
+        slot_of_key = np.fromiter((self._slot(k.tobytes()) for k in keys), dtype=np.int64, count=keys.size)
+        slots = slot_of_key[inverse]
+        seqs = headers["sequence"][idx].astype(np.int64)
+
+        # 按流稳定排序，组内保持到达顺序
+        order = np.argsort(slots, kind="stable")
+        s_slot = slots[order]
+        s_seq = seqs[order]
+        first = np.empty(idx.size, dtype=bool)
+        first[0] = True
+        np.not_equal(s_slot[1:], s_slot[:-1], out=first[1:])
+
+        # 每个包到达之前本流的最大序列号（批内前缀最大值与已有状态取大）
+        combined = (s_slot << _SEQ_SHIFT) + s_seq
+        running = np.maximum.accumulate(combined)
+        before = np.empty(idx.size, dtype=np.int64)
+        before[0] = -1
+        before[1:] = running[:-1] - (s_slot[1:] << _SEQ_SHIFT)
+        before[first] = -1
+        prior = np.maximum(before, self._highest[s_slot])
+
+        too_old = (prior >= 0) & (s_seq <= prior - self.window)
+        pos = s_seq % self.window
+        seen_before = self._seen[s_slot, pos] == s_seq
+        # 批内重复：同一流同一序列号只有第一次出现有效
+        dup_order = np.lexsort((np.arange(idx.size), s_seq, s_slot))
+        dup = np.zeros(idx.size, dtype=bool)
+        dup[dup_order[1:]] = (s_slot[dup_order[1:]] == s_slot[dup_order[:-1]]) & \
+                             (s_seq[dup_order[1:]] == s_seq[dup_order[:-1]])
+        accepted = ~(too_old | seen_before | dup)
+
+        # 对被接受的序列号，同一位置上已有的记录必然更小，取最大值即得到顺序处理的结果
+        np.maximum.at(self._seen, (s_slot[accepted], pos[accepted]), s_seq[accepted])
+        np.maximum.at(self._highest, s_slot[accepted], s_seq[accepted])
+
+        result = np.empty(idx.size, dtype=bool)
+        result[order] = accepted
+        mask[idx] = result
+        return mask
+
+    def forget(self, source, destination):
+        """删除某个流的状态（例如会话结束）"""
+        if isinstance(source, str):
+            source = _encode_address(source)
+        if isinstance(destination, str):
+            destination = _encode_address(destination)
+        slot = self._flows.pop(source.ljust(16, b"\x00") + destination.ljust(16, b"\x00"), None)
+        if slot is not None:
+            self._free.append(slot)
+
+
+if __name__ == "__main__":
+    from BackEnd.wrapper_batch import make_headers
+
+    rng = np.random.default_rng(0)
+    n = 1000000
+    flows = np.array([f"T{i}" for i in range(64)])
+    seq = np.arange(n) // 64 + rng.integers(-20, 20, size=n)
+    seq = np.clip(seq, 0, None)
+    headers = make_headers(flows[np.arange(n) % 64], "Ground", np.zeros(n), sequence=seq)
+    # 注入10%的重复包
+    dup = rng.choice(n, size=n // 10, replace=False)
+    headers = np.concatenate([headers, headers[dup]])
+
+    replay = ReplayFilter(window=512, max_flows=128)
+    t0 = time.perf_counter()
+    mask = np.concatenate([replay.accept_batch(headers[k:k + 100000]) for k in range(0, headers.shape[0], 100000)])
+    t1 = time.perf_counter()
+    print(f"处理 {headers.shape[0]} 个包耗时 {t1 - t0:.3f}s（{headers.shape[0] / (t1 - t0) / 1e6:.1f}M包/秒）")
+    print("接受:", int(mask.sum()), "拒绝:", int((~mask).sum()))
+
+    # 与逐包处理结果对比
+    scalar = ReplayFilter(window=512, max_flows=128)
+    sample = headers[:20000]
+    expected = [scalar.accept(h["source"], h["destination"], int(h["sequence"])) for h in sample]
+    check = ReplayFilter(window=512, max_flows=128)
+    print("批量与逐包结果一致:", bool((check.accept_batch(sample) == np.array(expected)).all()))
@@ -0,0 +1,157 @@
+"""
+路由表缓存
+
+路径只依赖拓扑（卫星环的顺序或星间链路集合），而拓扑在绝大多数帧之间不变。
+RouteCache 维护一个拓扑版本号（epoch），只有链路集合真正变化时才递增；
+每条缓存路由记录计算时的 epoch，并按所经过的链路建立反向索引，
+拓扑变化时只删除经过已断开链路的路由，其余路由在新 epoch 下继续有效。
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+Link = Tuple[int, int]
+
+
+def _link(a: int, b: int) -> Link:
+    """无向链路统一表示为 (较小编号, 较大编号)"""
+    return (a, b) if a <= b else (b, a)
+
+
+def ring_links(ring: List[int]) -> Set[Link]:
+    """卫星环（RingPlanner.ring）上相邻卫星之间的链路集合"""
+    n = len(ring)
+    if n < 2:
+        return set()
+    return {_link(ring[i], ring[(i + 1) % n]) for i in range(n)}
+
+
+def path_links(path: List[int]) -> Set[Link]:
+    """路径经过的链路集合"""
+    return {_link(path[i], path[i + 1]) for i in range(len(path) - 1)}
+
+
+class RouteCache:
+    """
+    按 (起点, 终点, 拓扑版本) 缓存的路由表
+
+    用法:
+        cache = RouteCache()
+        if planner.update(satellites):                 # 环的顺序发生变化
+            cache.update_topology(ring_links(planner.ring))
+        path = cache.get_or_plan(start, end, planner.plan)
+    """
+
+    def __init__(self, max_routes: int = 4096):
+        """
+        参数:
+            max_routes (int): 最多缓存的路由条数，超出时淘汰最久未使用的路由
+        """
+        self.max_routes = max_routes
+        self.epoch = 0
+        self._links: Set[Link] = set()
+        # (起点, 终点) -> (计算时的 epoch, 路径)
+        self._routes = OrderedDict()
+        # 链路 -> 经过该链路的路由键
+        self._by_link: Dict[Link, Set[Tuple[int, int]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def __contains__(self, key: Tuple[int, int]) -> bool:
+        return key in self._routes
+
+    def update_topology(self, links: Iterable[Link]) -> bool:
+        """
+        设置当前链路集合
+
+        返回:
+            bool: 拓扑是否变化（变化时 epoch 加一，并删除经过已断开链路的路由）
+        """
+        links = {_link(a, b) for a, b in links}
+        if links == self._links:
+            return False
+        removed = self._links - links
+        self._links = links
+        self.epoch += 1
+        for link in removed:
+            for key in self._by_link.pop(link, ()):
+                if self._discard(key):
+                    self.invalidated += 1
+        return True
+
+    def _discard(self, key: Tuple[int, int]) -> bool:
+        """删除一条路由及其链路索引，返回路由是否存在"""
+        entry = self._routes.pop(key, None)
+        if entry is None:
+            return False
+        for link in path_links(entry[1]):
+            keys = self._by_link.get(link)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_link[link]
+        return True
+
+    def get(self, start: int, end: int) -> Optional[List[int]]:
+        """查询缓存路由，不存在时返回 None"""
+        entry = self._routes.get((start, end))
+        if entry is None:
+            self.misses += 1
+            return None
+        self._routes.move_to_end((start, end))
+        self.hits += 1
+        return entry[1]
+
+    def route_epoch(self, start: int, end: int) -> Optional[int]:
+        """缓存路由计算时的拓扑版本，不存在时返回 None"""
+        entry = self._routes.get((start, end))
+        return None if entry is None else entry[0]
+
+    def put(self, start: int, end: int, path: List[int]):
+        """写入一条路由（路径中必须只包含当前拓扑中存在的链路，否则不缓存）"""
+        key = (start, end)
+        self._discard(key)
+        links = path_links(path)
+        if self._links and not links <= self._links:
+            return
+        self._routes[key] = (self.epoch, list(path))
+        for link in links:
+            self._by_link.setdefault(link, set()).add(key)
+        while len(self._routes) > self.max_routes:
+            self._discard(next(iter(self._routes)))
+
+    def get_or_plan(self, start: int, end: int, plan: Callable[[int, int], List[int]]) -> List[int]:
+        """查询缓存，未命中时调用 plan(start, end) 计算并写入缓存"""
+        path = self.get(start, end)
+        if path is None:
+            path = plan(start, end)
+            self.put(start, end, path)
+        return path
+
+    def clear(self):
+        """清空所有路由（拓扑和 epoch 保持不变）"""
+        self._routes.clear()
+        self._by_link.clear()
+
+
+if __name__ == "__main__":
+    from BackEnd.plan_satellite_path import RingPlanner
+
+    satellites = [{"index": i, "angle": i * 30.0 + (7 if i % 3 == 0 else 0)} for i in range(12)]
+    planner = RingPlanner()
+    cache = RouteCache()
+
+    for tick in range(100):
+        for sat in satellites:
+            sat["angle"] = (sat["angle"] + 0.5 + 0.5 * (sat["index"] == 4)) % 360
+        if planner.update(satellites):
+            cache.update_topology(ring_links(planner.ring))
+        for start, end in ((0, 6), (1, 3), (5, 9), (10, 2)):
+            cache.get_or_plan(start, end, planner.plan)
+
+    print("拓扑版本:", cache.epoch, "命中:", cache.hits, "未命中:", cache.misses, "失效:", cache.invalidated)
+    print("0 -> 6:", cache.get(0, 6), "计算于版本", cache.route_epoch(0, 6))
@@ -0,0 +1,285 @@
+"""
+卫星位置的空间网格索引
+
+将三维空间划分为边长 cell_size 的立方体网格，三个方向的格子坐标打包成一个整数键，
+每个格子保存其中卫星的行号集合。每帧卫星只移动很小一段距离，绝大多数卫星不会跨越格子，
+update 只对跨格子的卫星修改字典，代价与移动的卫星数成正比。
+
+“距离 X 不超过 R 的卫星”只需检查 X 附近的格子，最近邻查询按格子逐层向外扩展，
+所有卫星对的候选链路则由排序后的键向量化求出，均无需遍历全部卫星。
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+_BITS = 21
+_OFFSET = 1 << (_BITS - 1)
+# pack_cells 可表示的格子坐标绝对值上限（不含）
+CELL_LIMIT = _OFFSET
+
+
+def pack_cells(cells: np.ndarray) -> np.ndarray:
+    """将 (…, 3) 的整数格子坐标打包为 int64 键（每个方向 21 位）"""
+    cells = cells.astype(np.int64) + _OFFSET
+    return (cells[..., 0] << (2 * _BITS)) | (cells[..., 1] << _BITS) | cells[..., 2]
+
+
+def neighbor_offsets(reach: int) -> np.ndarray:
+    """中心格子周围 reach 层以内所有格子的键偏移"""
+    r = np.arange(-reach, reach + 1, dtype=np.int64)
+    dx, dy, dz = np.meshgrid(r, r, r, indexing="ij")
+    return ((dx << (2 * _BITS)) + (dy << _BITS) + dz).ravel()
+
+
+def expand_ranges(lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    把若干区间 [lo, hi) 依次展开为下标数组
+
+    返回:
+        (np.ndarray, np.ndarray): 每个下标所属区间的序号、下标本身
+    """
+    counts = np.asarray(hi) - np.asarray(lo)
+    owner = np.repeat(np.arange(counts.size), counts)
+    return owner, np.arange(owner.size) + np.repeat(lo - (np.cumsum(counts) - counts), counts)
+
+
+def neighbor_matches(keys: np.ndarray, sorted_keys: np.ndarray, offsets) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    对每个偏移，找出 keys[q] + 偏移 在 sorted_keys 中的全部匹配
+
+    返回:
+        (np.ndarray, np.ndarray): keys 中的序号 q、匹配项在 sorted_keys 中的下标
+    """
+    query_parts, index_parts = [], []
+    for offset in np.asarray(offsets).tolist():
+        neighbor = keys + offset
+        lo = np.searchsorted(sorted_keys, neighbor, side="left")
+        hi = np.searchsorted(sorted_keys, neighbor, side="right")
+        query, index = expand_ranges(lo, hi)
+        if index.size:
+            query_parts.append(query)
+            index_parts.append(index)
+    if not query_parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(query_parts), np.concatenate(index_parts)
+
+
+def cell_pairs(keys: np.ndarray, reach: int = 1, unique: bool = False,
+               order: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    所在格子相距不超过 reach 层的所有点对（距离候选，不含 i == j）
+
+    参数:
+        keys: 每个点的格子键（pack_cells 的结果）
+        reach: 检查的相邻格子层数
+        unique: 为 True 时每对只给出一次且 i < j，否则双向各一条
+        order: keys 的稳定排序下标，已缓存时传入可省去一次排序
+
+    返回:
+        (np.ndarray, np.ndarray): 行号 i、列号 j（未排序）
+    """
+    if order is None:
+        order = np.argsort(keys, kind="stable")
+    offsets = neighbor_offsets(reach)
+    if unique:
+        # 每对相邻格子只从键较小的一侧检查一次
+        offsets = offsets[offsets >= 0]
+    rows, index = neighbor_matches(keys, keys[order], offsets)
+    cols = order[index]
+    if not unique:
+        keep = rows != cols
+        return rows[keep], cols[keep]
+    # 同一格子内的点对会从两侧各出现一次，只保留 i < j
+    keep = (rows < cols) | (keys[rows] != keys[cols])
+    rows, cols = rows[keep], cols[keep]
+    return np.minimum(rows, cols), np.maximum(rows, cols)
+
+
+class CellGridIndex:
+    """
+    增量更新的三维网格索引
+
+    用法:
+        index = CellGridIndex(cell_size=0.3)
+        index.update(constellation.positions)           # 每帧调用
+        rows = index.query_radius(point, 0.5)
+        rows, dist = index.knn(point, k=4)
+    """
+
+    def __init__(self, cell_size: float, positions: Optional[np.ndarray] = None):
+        """
+        参数:
+            cell_size (float): 格子边长，取常用查询半径附近的值效果最好
+            positions: 初始坐标 (N, 3)
+        """
+        if cell_size <= 0:
+            raise ValueError("cell_size 必须为正数")
+        self.cell_size = float(cell_size)
+        self.positions = np.empty((0, 3))
+        self._keys = np.empty(0, dtype=np.int64)
+        self._cells = {}
+        self._sorted = None
+        self.moved = 0
+        if positions is not None:
+            self.update(positions)
+
+    def __len__(self) -> int:
+        return self._keys.shape[0]
+
+    def cell_keys(self, points: np.ndarray) -> np.ndarray:
+        """坐标所在格子的键"""
+        cells = np.floor(np.asarray(points, dtype=np.float64) / self.cell_size)
+        if np.any(np.abs(cells) >= CELL_LIMIT):
+            raise ValueError("坐标超出网格范围，请增大 cell_size")
+        return pack_cells(cells)
+
+    def rebuild(self, positions: np.ndarray):
+        """完全重建索引"""
+        self.positions = np.array(positions, dtype=np.float64)
+        self._keys = self.cell_keys(self.positions)
+        cells = {}
+        for row, key in enumerate(self._keys.tolist()):
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = {row}
+            else:
+                cell.add(row)
+        self._cells = cells
+        self._sorted = None
+        self.moved = len(self._keys)
+
+    def update(self, positions: np.ndarray) -> int:
+        """
+        更新坐标，只移动跨越格子的卫星
+
+        返回:
+            int: 本次跨越格子的卫星数
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        if positions.shape[0] != self._keys.shape[0]:
+            self.rebuild(positions)
+            return self.moved
+        keys = self.cell_keys(positions)
+        self.positions = positions.copy()
+        changed = np.flatnonzero(keys != self._keys)
+        cells = self._cells
+        for row, old, new in zip(changed.tolist(), self._keys[changed].tolist(), keys[changed].tolist()):
+            cell = cells[old]
+            cell.discard(row)
+            if not cell:
+                del cells[old]
+            target = cells.get(new)
+            if target is None:
+                cells[new] = {row}
+            else:
+                target.add(row)
+        self._keys = keys
+        if changed.size:
+            self._sorted = None
+        self.moved = int(changed.size)
+        return self.moved
+
+    def _gather(self, keys) -> np.ndarray:
+        """取出若干格子中的全部行号"""
+        rows: List[int] = []
+        cells = self._cells
+        for key in keys:
+            cell = cells.get(key)
+            if cell:
+                rows.extend(cell)
+        return np.asarray(rows, dtype=np.int64)
+
+    def query_radius(self, point, radius: float) -> np.ndarray:
+        """返回与 point 距离不超过 radius 的卫星行号（升序）"""
+        point = np.asarray(point, dtype=np.float64)
+        reach = int(np.ceil(radius / self.cell_size))
+        center = int(self.cell_keys(point))
+        rows = self._gather((center + neighbor_offsets(reach)).tolist())
+        if rows.size == 0:
+            return rows
+        d2 = np.sum((self.positions[rows] - point) ** 2, axis=1)
+        return np.sort(rows[d2 <= radius * radius])
+
+    def query_radius_batch(self, points, radius: float) -> List[np.ndarray]:
+        """对多个查询点分别执行 query_radius"""
+        return [self.query_radius(point, radius) for point in np.asarray(points, dtype=np.float64)]
+
+    def knn(self, point, k: int, exclude: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        最近的 k 颗卫星
+
+        以查询点所在格子为中心逐层扩大搜索范围，第 m 层立方体覆盖查询点周围至少 m·cell_size 的距离，
+        当已找到的第 k 近距离不超过该值时结果即为精确解。
+
+        参数:
+            exclude: 需要排除的行号（例如查询卫星自身）
+
+        返回:
+            (np.ndarray, np.ndarray): 行号与距离，按距离升序
+        """
+        point = np.asarray(point, dtype=np.float64)
+        n = len(self) - (exclude is not None)
+        k = min(k, n)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        center = int(self.cell_keys(point))
+        reach = 0
+        while True:
+            rows = self._gather((center + neighbor_offsets(reach)).tolist())
+            if exclude is not None:
+                rows = rows[rows != exclude]
+            if rows.size >= k:
+                dist = np.linalg.norm(self.positions[rows] - point, axis=1)
+                nearest = np.argpartition(dist, k - 1)[:k]
+                if dist[nearest].max() <= reach * self.cell_size or rows.size == n:
+                    order = nearest[np.argsort(dist[nearest], kind="stable")]
+                    return rows[order], dist[order]
+            reach = reach + 1 if reach < 4 else reach * 2
+
+    def pairs_within(self, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        所有距离不超过 radius 的卫星对（星间链路候选），双向各一条
+
+        返回:
+            (np.ndarray, np.ndarray, np.ndarray): 行号、列号、距离，按 (行号, 列号) 排序
+        """
+        n = len(self)
+        if n == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        if self._sorted is None:
+            self._sorted = np.argsort(self._keys, kind="stable")
+        rows, cols = cell_pairs(self._keys, int(np.ceil(radius / self.cell_size)), order=self._sorted)
+        dist = np.linalg.norm(self.positions[rows] - self.positions[cols], axis=1)
+        keep = dist <= radius
+        rows, cols, dist = rows[keep], cols[keep], dist[keep]
+        pair_order = np.lexsort((cols, rows))
+        return rows[pair_order], cols[pair_order], dist[pair_order]
+
+
+if __name__ == "__main__":
+    import time
+    from BackEnd.walker import walker_constellation
+
+    constellation = walker_constellation(10000, 100, 37, 53.0, radius=1.64)
+    index = CellGridIndex(cell_size=0.1, positions=constellation.positions)
+
+    t0 = time.perf_counter()
+    for _ in range(50):
+        constellation.step()
+        index.update(constellation.positions)
+    elapsed = (time.perf_counter() - t0) / 50
+    print(f"{len(index)} 颗卫星每帧更新索引 {elapsed * 1000:.2f}ms，最近一帧跨格子卫星 {index.moved} 颗")
+
+    point = constellation.positions[0]
+    t0 = time.perf_counter()
+    rows = index.query_radius(point, 0.15)
+    rows_knn, dist = index.knn(point, 4, exclude=0)
+    t1 = time.perf_counter()
+    brute = np.flatnonzero(np.linalg.norm(constellation.positions - point, axis=1) <= 0.15)
+    print(f"半径查询 {len(rows)} 颗、4 近邻 {rows_knn.tolist()}，耗时 {(t1 - t0) * 1000:.2f}ms，与暴力结果一致:",
+          np.array_equal(rows, brute))
+
+    t0 = time.perf_counter()
+    a, b, d = index.pairs_within(0.1)
+    print(f"距离 0.1 以内的候选链路 {len(a) // 2} 条，耗时 {(time.perf_counter() - t0) * 1000:.1f}ms")
@@ -0,0 +1,240 @@
+"""
+地面站点—卫星可见性与仰角计算
+
+波束站点（BeamDataManager.get_optimized_beam_centers）是地面上的经纬度点。本模块把全部
+（站点, 卫星）组合在一组时间点上的仰角与斜距作为一次广播计算：
+站点随地球自转（地球自转角 ERA）转换到惯性系，与 orbit.OrbitalElements 外推出的卫星坐标做点积，
+    斜距² = |卫星|² + |站点|² - 2·|站点|·(卫星·天顶方向)
+    sin(仰角) = (卫星·天顶方向 - |站点|) / 斜距
+不需要构造 (T, S, N, 3) 的相对位置数组。仰角高于遮蔽角的连续时间段由差分得到可见窗口。
+
+地球按半径 6371 km 的球体处理，与 beam_control 中的距离公式一致。
+"""
+
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+from BackEnd.orbit import OrbitalElements, EARTH_RADIUS_KM
+
+_TWO_PI = 2.0 * math.pi
+_J2000_UNIX = 946728000.0          # 2000-01-01 12:00:00 UTC
+# 每批最多计算的 (时间, 站点, 卫星) 组合数
+_BATCH = 1 << 24
+
+WINDOW_DTYPE = np.dtype([
+    ("site", np.int64),
+    ("satellite", np.int64),
+    ("start", np.int64),           # 开始时间点序号
+    ("end", np.int64),             # 结束时间点序号（不含）
+    ("start_time", np.float64),
+    ("end_time", np.float64),      # 最后一个可见时间点
+    ("max_elevation", np.float64),
+])
+
+
+def earth_rotation_angle(times) -> np.ndarray:
+    """地球自转角（弧度），times 为 Unix 时间（秒）"""
+    days = (np.asarray(times, dtype=np.float64) - _J2000_UNIX) / 86400.0
+    return np.mod(_TWO_PI * (0.7790572732640 + 1.00273781191135448 * days), _TWO_PI)
+
+
+def site_vectors(sites, altitude_km=0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    站点经纬度转换为地固系坐标
+
+    参数:
+        sites: [(纬度, 经度), ...]（度）
+        altitude_km: 站点海拔（km），标量或数组
+
+    返回:
+        (np.ndarray, np.ndarray): 天顶方向单位向量 (S, 3)、站点地心距离 (S,)
+    """
+    sites = np.asarray(sites, dtype=np.float64).reshape(-1, 2)
+    lat, lon = np.radians(sites[:, 0]), np.radians(sites[:, 1])
+    up = np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=1)
+    radius = np.broadcast_to(EARTH_RADIUS_KM + np.asarray(altitude_km, dtype=np.float64), (sites.shape[0],))
+    return up, radius.copy()
+
+
+def _satellite_positions(satellites, times) -> np.ndarray:
+    """OrbitalElements 外推为 (T, N, 3)；数组则直接使用"""
+    if isinstance(satellites, OrbitalElements):
+        return satellites.positions(times)
+    positions = np.asarray(satellites, dtype=np.float64)
+    if positions.ndim == 2:
+        positions = positions[None]
+    return positions
+
+
+def look_angles(sites, satellites, times, earth_rotation: bool = True,
+                altitude_km=0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    所有（时间, 站点, 卫星）组合的仰角与斜距
+
+    参数:
+        sites: [(纬度, 经度), ...]（度）
+        satellites: OrbitalElements，或惯性系坐标数组 (T, N, 3)（km）
+        times: Unix 时间（秒），形状 (T,)
+        earth_rotation (bool): 是否考虑地球自转；为 False 时把卫星坐标视为地固系坐标
+        altitude_km: 站点海拔（km）
+
+    返回:
+        (np.ndarray, np.ndarray): 仰角（度）与斜距（km），形状均为 (T, S, N)
+    """
+    times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+    positions = _satellite_positions(satellites, times)
+    up, radius = site_vectors(sites, altitude_km)
+    return _look_angles(up, radius, positions, times, earth_rotation)
+
+
+def _look_angles(up, radius, positions, times, earth_rotation):
+    if earth_rotation:
+        # 站点随地球转到惯性系：(T, S, 3)
+        theta = earth_rotation_angle(times)[:, None]
+        cos_t, sin_t = np.cos(theta), np.sin(theta)
+        up = np.stack([up[:, 0] * cos_t - up[:, 1] * sin_t,
+                       up[:, 0] * sin_t + up[:, 1] * cos_t,
+                       np.broadcast_to(up[:, 2], cos_t.shape[:1] + up.shape[:1])], axis=-1)
+    else:
+        up = np.broadcast_to(up, (positions.shape[0],) + up.shape)
+    projection = np.matmul(up, np.swapaxes(positions, 1, 2))                  # (T, S, N)
+    norms = np.einsum("tnk,tnk->tn", positions, positions)[:, None, :]
+    r = radius[None, :, None]
+    slant = np.sqrt(np.maximum(norms + r * r - 2.0 * r * projection, 0.0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sin_el = np.where(slant > 0, (projection - r) / slant, 1.0)
+    elevation = np.degrees(np.arcsin(np.clip(sin_el, -1.0, 1.0)))
+    return elevation, slant
+
+
+def visibility_mask(elevation: np.ndarray, min_elevation=10.0) -> np.ndarray:
+    """
+    仰角不低于遮蔽角的组合
+
+    参数:
+        elevation: (T, S, N) 仰角（度）
+        min_elevation: 遮蔽角（度），标量、每站点 (S,) 或每组合 (S, N)
+    """
+    mask = np.asarray(min_elevation, dtype=np.float64)
+    if mask.ndim == 1:
+        mask = mask[:, None]
+    return elevation >= mask
+
+
+def visibility_windows(elevation: np.ndarray, min_elevation=10.0, times=None,
+                       site_offset: int = 0) -> np.ndarray:
+    """
+    由仰角序列提取可见窗口
+
+    参数:
+        elevation: (T, S, N) 仰角（度）
+        min_elevation: 同 visibility_mask
+        times: 时间点（秒），默认为序号
+        site_offset: 结果中站点序号的偏移（分批计算时使用）
+
+    返回:
+        np.ndarray: WINDOW_DTYPE 数组，按 (站点, 卫星, 开始时间) 排序
+    """
+    steps, n_sites, n_sats = elevation.shape
+    times = np.arange(steps, dtype=np.float64) if times is None else np.asarray(times, dtype=np.float64)
+    visible = visibility_mask(elevation, min_elevation)
+    # 转为 (S, N, T) 后按时间差分，窗口天然按 (站点, 卫星, 开始时间) 排序
+    visible = np.ascontiguousarray(np.moveaxis(visible, 0, -1))
+    edges = np.diff(visible.astype(np.int8), axis=-1, prepend=0, append=0)
+    site, sat, start = np.nonzero(edges == 1)
+    end = np.nonzero(edges == -1)[2]
+
+    windows = np.empty(start.size, dtype=WINDOW_DTYPE)
+    windows["site"] = site + site_offset
+    windows["satellite"] = sat
+    windows["start"] = start
+    windows["end"] = end
+    windows["start_time"] = times[start] if start.size else 0.0
+    windows["end_time"] = times[end - 1] if end.size else 0.0
+    if start.size:
+        flat = np.moveaxis(elevation, 0, -1).reshape(-1)
+        base = (site * n_sats + sat) * steps
+        bounds = np.empty(2 * start.size, dtype=np.int64)
+        bounds[0::2] = base + start
+        bounds[1::2] = base + end
+        windows["max_elevation"] = np.maximum.reduceat(np.append(flat, 0.0), bounds)[0::2]
+    return windows
+
+
+def compute_visibility(sites, satellites, times, min_elevation=10.0, earth_rotation: bool = True,
+                       altitude_km=0.0) -> np.ndarray:
+    """
+    计算全部站点对全部卫星的可见窗口
+
+    窗口只与单个（站点, 卫星）组合有关，因此按站点分批计算，内存占用受 _BATCH 限制而无需合并跨批窗口。
+
+    参数:
+        sites / satellites / times / earth_rotation / altitude_km: 同 look_angles
+        min_elevation: 遮蔽角（度），标量或每站点数组
+
+    返回:
+        np.ndarray: WINDOW_DTYPE 数组
+    """
+    times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+    positions = _satellite_positions(satellites, times)
+    up, radius = site_vectors(sites, altitude_km)
+    n_sites = up.shape[0]
+    mask = np.broadcast_to(np.asarray(min_elevation, dtype=np.float64), (n_sites,))
+    batch = max(1, _BATCH // max(positions.shape[0] * positions.shape[1], 1))
+    parts = []
+    for start in range(0, n_sites, batch):
+        stop = min(start + batch, n_sites)
+        elevation, _ = _look_angles(up[start:stop], radius[start:stop], positions, times, earth_rotation)
+        parts.append(visibility_windows(elevation, mask[start:stop], times, site_offset=start))
+    return np.concatenate(parts) if parts else np.empty(0, dtype=WINDOW_DTYPE)
+
+
+def serving_satellites(elevation: np.ndarray, min_elevation=10.0) -> np.ndarray:
+    """
+    每个时间点每个站点仰角最高的可见卫星
+
+    返回:
+        np.ndarray: (T, S) 卫星行号，无可见卫星时为 -1
+    """
+    best = np.argmax(elevation, axis=-1)
+    best_elevation = np.take_along_axis(elevation, best[..., None], axis=-1)[..., 0]
+    threshold = np.broadcast_to(np.asarray(min_elevation, dtype=np.float64), best_elevation.shape[-1:])
+    return np.where(best_elevation >= threshold, best, -1)
+
+
+if __name__ == "__main__":
+    import time
+
+    from BackEnd.beam_logic import BeamDataManager
+    from BackEnd.walker import walker_elements
+
+    sites = BeamDataManager.get_optimized_beam_centers()
+    elements = walker_elements(1584, 72, 17, 53.0, altitude_km=550.0, epoch=_J2000_UNIX)
+    times = _J2000_UNIX + np.arange(0, 3600, 10.0)
+
+    t0 = time.perf_counter()
+    elevation, slant = look_angles(sites, elements, times)
+    t1 = time.perf_counter()
+    print(f"{len(times)} 个时间点 × {len(sites)} 个站点 × {len(elements)} 颗卫星，仰角计算耗时 {t1 - t0:.3f}s")
+
+    # 与逐点向量计算一致
+    t, s, n = 17, 3, 200
+    theta = earth_rotation_angle(times[t])
+    lat, lon = np.radians(sites[s])
+    site = EARTH_RADIUS_KM * np.array([math.cos(lat) * math.cos(lon + theta),
+                                       math.cos(lat) * math.sin(lon + theta), math.sin(lat)])
+    rel = elements.positions([times[t]])[0, n] - site
+    expected = math.degrees(math.asin(rel @ site / np.linalg.norm(rel) / np.linalg.norm(site)))
+    print("与逐点计算一致:", np.isclose(elevation[t, s, n], expected), np.isclose(slant[t, s, n], np.linalg.norm(rel)))
+
+    t0 = time.perf_counter()
+    windows = compute_visibility(sites, elements, times, min_elevation=25.0)
+    print(f"遮蔽角 25° 下可见窗口 {len(windows)} 个，耗时 {time.perf_counter() - t0:.3f}s")
+    first = windows[windows["site"] == 0][:3]
+    for w in first:
+        print(f"  站点 0 - 卫星 {w['satellite']}: {w['start_time'] - _J2000_UNIX:.0f}s ~ "
+              f"{w['end_time'] - _J2000_UNIX:.0f}s，最大仰角 {w['max_elevation']:.1f}°")
+    serving = serving_satellites(elevation, 25.0)
+    print("各站点在首个时间点的服务卫星:", serving[0].tolist())
@@ -0,0 +1,108 @@
+"""
+Walker 星座生成器
+
+按 Walker 记法 i: T/P/F 生成大规模星座：
+    T 颗卫星均匀分布在 P 个轨道面上（每面 S = T/P 颗），
+    相邻轨道面之间的相位差为 F·360/T 度。
+delta 构型的升交点赤经均匀分布在 360° 上（如 Starlink、Galileo），
+star 构型分布在 180° 上（如 Iridium，轨道面近极轨）。
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from BackEnd.constellation import Constellation
+from BackEnd.orbit import OrbitalElements, EARTH_RADIUS_KM, SCENE_SCALE
+
+
+def walker_layout(total: int, planes: int, phasing: int, pattern: str = "delta") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    计算 Walker 星座每颗卫星的升交点赤经与初始相位
+
+    参数:
+        total (int): 卫星总数 T
+        planes (int): 轨道面数 P（需整除 T）
+        phasing (int): 相位因子 F（0 ~ P-1）
+        pattern (str): "delta" 或 "star"
+
+    返回:
+        (np.ndarray, np.ndarray): 升交点赤经（度）、初始相位角（度），均为长度 T 的数组，按轨道面依次排列
+    """
+    if planes <= 0 or total % planes:
+        raise ValueError("卫星总数必须能被轨道面数整除")
+    if not 0 <= phasing < planes:
+        raise ValueError("相位因子 F 必须在 0 ~ P-1 之间")
+    if pattern not in ("delta", "star"):
+        raise ValueError(f"未知的 Walker 构型: {pattern}")
+    per_plane = total // planes
+    plane = np.repeat(np.arange(planes), per_plane)
+    slot = np.tile(np.arange(per_plane), planes)
+    spread = 360.0 if pattern == "delta" else 180.0
+    raan = plane * spread / planes
+    angle = (slot * 360.0 / per_plane + plane * phasing * 360.0 / total) % 360.0
+    return raan, angle
+
+
+def walker_constellation(
+    total: int,
+    planes: int,
+    phasing: int,
+    inclination_deg: float,
+    radius: float = 2.0,
+    delta_deg: float = 0.2,
+    pattern: str = "delta"
+) -> Constellation:
+    """
+    生成可直接用于界面渲染与路由的 Walker 星座
+
+    参数:
+        total / planes / phasing / pattern: 同 walker_layout
+        inclination_deg (float): 轨道倾角（度）
+        radius (float): 轨道半径（OpenGL 场景单位，地球半径为 1.5）
+        delta_deg (float): 每帧转过的角度（度）
+
+    返回:
+        Constellation
+    """
+    raan, angle = walker_layout(total, planes, phasing, pattern)
+    return Constellation(
+        np.full(total, radius),
+        np.full(total, np.radians(inclination_deg)),
+        angle,
+        np.full(total, delta_deg),
+        names=[f"W{p}-{s}" for p in range(planes) for s in range(total // planes)],
+        raan=np.radians(raan),
+    )
+
+
+def walker_elements(
+    total: int,
+    planes: int,
+    phasing: int,
+    inclination_deg: float,
+    altitude_km: float = 550.0,
+    pattern: str = "delta",
+    epoch: float = 0.0
+) -> OrbitalElements:
+    """生成 Walker 星座的开普勒根数（圆轨道），用于 orbit 模块按真实时间外推"""
+    raan, angle = walker_layout(total, planes, phasing, pattern)
+    return OrbitalElements(
+        np.full(total, EARTH_RADIUS_KM + altitude_km), 0.0, inclination_deg, raan, 0.0, angle, epoch,
+        names=[f"W{p}-{s}" for p in range(planes) for s in range(total // planes)],
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    # Starlink 第一壳层近似：53°: 1584/72/17，轨道高度 550 km
+    t0 = time.perf_counter()
+    constellation = walker_constellation(1584, 72, 17, 53.0,
+                                         radius=(EARTH_RADIUS_KM + 550.0) * SCENE_SCALE, pattern="delta")
+    print(f"生成 {len(constellation)} 颗卫星耗时 {(time.perf_counter() - t0) * 1000:.1f}ms，"
+          f"轨道数 {len(constellation.orbits())}")
+
+    elements = walker_elements(66, 6, 2, 86.4, altitude_km=780.0, pattern="star")
+    xyz = elements.positions(np.arange(0, 6000, 60.0))
+    print("Iridium 星座外推形状:", xyz.shape, "轨道高度: %.1f km" % (np.linalg.norm(xyz[0, 0]) - EARTH_RADIUS_KM))
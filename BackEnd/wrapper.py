@@ -2,28 +2,121 @@ import time
 import struct
 import hashlib
 import json
+import zlib
+import warnings
+from functools import lru_cache
+
+try:
+    import crc32c as _crc32c_lib  # 可选依赖：硬件加速的CRC32C
+except ImportError:
+    _crc32c_lib = None
 
 # 协议头格式定义
-# version(1B), source源地址(16B), dest目的地(16B), 
+# version(1B, 低4位为协议版本，高4位为校验和算法标志), source源地址(16B), dest目的地(16B), 
 # timestamp时间戳(8B), data_length数据长度(4B),
 # checksum校验和(32B), priority(1B), data_type(1B), seq序列号(4B)
 _HEADER_FORMAT = "!B16s16sQI32sBBI"
 _HEADER_SIZE = struct.calcsize(_HEADER_FORMAT)# 计算二进制协议头的总字节数：83字节
+# 预编译的协议头结构，避免每次调用重新解析格式字符串
+_HEADER_STRUCT = struct.Struct(_HEADER_FORMAT)
 
 # 定义异常类
 class ProtocolError(Exception):
     pass
 
+# 校验和算法标志，写入 version 字节的高4位，接收端据此自动识别算法
+# sha256 对应 0，与未携带标志的旧数据包兼容
+_CHECKSUM_IDS = {
+    "sha256": 0,
+    "md5": 1,
+    "crc32": 2,
+    "crc32c": 3,
+    "adler32": 4,
+    "blake2b": 5,
+}
+_CHECKSUM_NAMES = {v: k for k, v in _CHECKSUM_IDS.items()}
+_UINT32_STRUCT = struct.Struct("!I")
+
+
+def _crc32c_table():
+    """生成 CRC32C（Castagnoli，反射多项式 0x82F63B78）查找表"""
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC32C_TABLE = _crc32c_table()
+
+
+_crc32c_warned = False
+
+
+def _warn_crc32c_fallback():
+    """未安装 crc32c 包时首次使用 crc32c 给出警告：查表实现比 sha256 慢两个数量级"""
+    global _crc32c_warned
+    if not _crc32c_warned:
+        _crc32c_warned = True
+        warnings.warn("未安装 crc32c 包，crc32c 校验和使用纯Python查表实现，速度远低于 sha256/crc32；"
+                      "请执行 pip install crc32c", RuntimeWarning, stacklevel=3)
+
+
+def _crc32c(data) -> int:
+    """计算CRC32C；安装了 crc32c 包时使用其加速实现，否则退化为查表实现"""
+    if _crc32c_lib is not None:
+        return _crc32c_lib.crc32c(data)
+    _warn_crc32c_fallback()
+    crc = 0xFFFFFFFF
+    table = _CRC32C_TABLE
+    for byte in bytes(data):
+        crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
 def _checksum(data: bytes, method: str = "sha256") -> bytes:
-    """计算校验和，支持sha256和md5"""
+    """计算校验和，结果补零到32字节，支持sha256、md5、crc32、crc32c、adler32、blake2b（16字节摘要）"""
     if method == "sha256":
         return hashlib.sha256(data).digest()
     elif method == "md5":
         return hashlib.md5(data).digest().ljust(32, b'\x00')
+    elif method == "crc32":
+        return _UINT32_STRUCT.pack(zlib.crc32(data)).ljust(32, b'\x00')
+    elif method == "crc32c":
+        return _UINT32_STRUCT.pack(_crc32c(data)).ljust(32, b'\x00')
+    elif method == "adler32":
+        return _UINT32_STRUCT.pack(zlib.adler32(data)).ljust(32, b'\x00')
+    elif method == "blake2b":
+        return hashlib.blake2b(data, digest_size=16).digest().ljust(32, b'\x00')
     else:
         raise ValueError("不支持的校验和算法")
 
 
+def _version_byte(version: int, checksum_method: str) -> int:
+    """将协议版本（低4位）和校验和算法标志（高4位）合成 version 字节"""
+    if checksum_method not in _CHECKSUM_IDS:
+        raise ValueError("不支持的校验和算法")
+    if not 0 <= version <= 0x0F:
+        raise ValueError("协议版本号范围为0~15")
+    return (_CHECKSUM_IDS[checksum_method] << 4) | version
+
+
+def _checksum_method_of(version_byte: int) -> str:
+    """从 version 字节的高4位识别校验和算法"""
+    method = _CHECKSUM_NAMES.get(version_byte >> 4)
+    if method is None:
+        raise ProtocolError("未知的校验和算法标志")
+    return method
+
+
+@lru_cache(maxsize=1024)
+def _encode_address(address: str) -> bytes:
+    """将地址编码为定长16字节（截断或补零），结果缓存以便重复使用"""
+    return address.encode('utf-8')[:16].ljust(16, b'\x00')
+
+
 def pack_protocol(
     data: bytes,
     source: str,
@@ -41,11 +134,12 @@ def pack_protocol(
         data (bytes): 需要封装的数据
         source (str): 源地址（最长16字节）
         destination (str): 目标地址（最长16字节）
-        version (int): 协议版本号（默认1）
+        version (int): 协议版本号（0~15，默认1）
         priority (int): 优先级（0~255，默认0）
         data_type (int): 数据类型（0~255，默认0），可自定义类型：
         sequence (int): 序列号（默认0）
-        checksum_method (str): 校验和算法（"sha256"或"md5"），默认sha256
+        checksum_method (str): 校验和算法（"sha256"、"md5"、"crc32"、"crc32c"、"adler32"、"blake2b"），默认sha256
+            算法标志写入协议头，接收端可自动识别
 
     返回:
         bytes: 完整协议包
@@ -53,11 +147,10 @@ def pack_protocol(
     timestamp = int(time.time())
     data_length = len(data)
     checksum = _checksum(data, checksum_method)
-    header = struct.pack(
-        _HEADER_FORMAT,
-        version,
-        source.encode('utf-8')[:16].ljust(16, b'\x00'),
-        destination.encode('utf-8')[:16].ljust(16, b'\x00'),
+    header = _HEADER_STRUCT.pack(
+        _version_byte(version, checksum_method),
+        _encode_address(source),
+        _encode_address(destination),
         timestamp,
         data_length,
         checksum,
@@ -67,10 +160,304 @@ def pack_protocol(
     )
     return header + data
 
+
+def _write_packet(buffer, offset, data, version, source_bytes, destination_bytes,
+                  timestamp, priority, data_type, sequence, checksum_method) -> int:
+    """在 buffer[offset:] 处写入协议头和数据，返回包结束位置"""
+    data_length = len(data)
+    end = offset + _HEADER_SIZE + data_length
+    if end > len(buffer):
+        raise ProtocolError("缓冲区空间不足")
+    _HEADER_STRUCT.pack_into(
+        buffer,
+        offset,
+        _version_byte(version, checksum_method),
+        source_bytes,
+        destination_bytes,
+        timestamp,
+        data_length,
+        _checksum(data, checksum_method),
+        priority,
+        data_type,
+        sequence
+    )
+    memoryview(buffer)[offset + _HEADER_SIZE:end] = data
+    return end
+
+
+def pack_protocol_into(
+    buffer,
+    offset: int,
+    data,
+    source: str,
+    destination: str,
+    version: int = 1,
+    priority: int = 0,
+    data_type: int = 0,
+    sequence: int = 0,
+    checksum_method: str = "sha256",
+    timestamp: int = None
+) -> int:
+    """
+    将协议包直接写入调用方提供的可写缓冲区（bytearray/memoryview），不产生中间拷贝
+
+    参数:
+        buffer: 可写缓冲区，需至少有 offset + _HEADER_SIZE + len(data) 字节
+        offset (int): 写入起始位置
+        data: 需要封装的数据（bytes/bytearray/memoryview）
+        timestamp (int): 时间戳，默认取当前时间
+        其余参数同 pack_protocol
+
+    返回:
+        int: 本包结束位置（即下一个包的写入偏移）
+    """
+    return _write_packet(
+        buffer, offset, data, version,
+        _encode_address(source), _encode_address(destination),
+        int(time.time()) if timestamp is None else timestamp,
+        priority, data_type, sequence, checksum_method
+    )
+
+
+class ProtocolPacker:
+    """
+    可复用缓冲区的协议封装器
+
+    固定源地址/目的地址的编码结果，内部维护一个按需增长的 bytearray 作为发送缓冲池，
+    可将多个数据包首尾相接地写入同一块连续的发送缓冲区。
+    返回的 memoryview 指向内部缓冲区，在下一次调用 pack/pack_many 之前有效。
+    """
+
+    def __init__(
+        self,
+        source: str,
+        destination: str,
+        version: int = 1,
+        checksum_method: str = "sha256",
+        capacity: int = 4096
+    ):
+        self.version = version
+        self.checksum_method = checksum_method
+        self.set_addresses(source, destination)
+        self._buffer = bytearray(capacity)
+
+    def set_addresses(self, source: str, destination: str):
+        """更新源/目的地址并缓存其编码"""
+        self.source = source
+        self.destination = destination
+        self._source_bytes = _encode_address(source)
+        self._destination_bytes = _encode_address(destination)
+
+    def _reserve(self, size: int):
+        """确保内部缓冲区至少有 size 字节，按倍数增长以摊还扩容开销"""
+        if size > len(self._buffer):
+            self._buffer = bytearray(max(size, 2 * len(self._buffer)))
+
+    def pack_into(self, buffer, offset: int, data, priority: int = 0, data_type: int = 0,
+                  sequence: int = 0, timestamp: int = None) -> int:
+        """将一个协议包写入外部缓冲区，返回下一个包的写入偏移"""
+        return _write_packet(
+            buffer, offset, data, self.version,
+            self._source_bytes, self._destination_bytes,
+            int(time.time()) if timestamp is None else timestamp,
+            priority, data_type, sequence, self.checksum_method
+        )
+
+    def pack(self, data, priority: int = 0, data_type: int = 0, sequence: int = 0) -> memoryview:
+        """封装单个数据包到内部缓冲区，返回该包的 memoryview"""
+        self._reserve(_HEADER_SIZE + len(data))
+        end = self.pack_into(self._buffer, 0, data, priority, data_type, sequence)
+        return memoryview(self._buffer)[:end]
+
+    def pack_many(self, payloads, priority: int = 0, data_type: int = 0, first_sequence: int = 0) -> memoryview:
+        """
+        将多个数据首尾相接封装进同一块连续发送缓冲区
+
+        参数:
+            payloads: 数据列表（bytes/bytearray/memoryview）
+            first_sequence (int): 第一个包的序列号，后续依次加1
+
+        返回:
+            memoryview: 所有协议包拼接后的连续缓冲区
+        """
+        payloads = list(payloads)
+        self._reserve(sum(len(p) for p in payloads) + _HEADER_SIZE * len(payloads))
+        timestamp = int(time.time())
+        offset = 0
+        for i, payload in enumerate(payloads):
+            offset = self.pack_into(self._buffer, offset, payload, priority, data_type,
+                                    (first_sequence + i) & 0xFFFFFFFF, timestamp)
+        return memoryview(self._buffer)[:offset]
+
+# 协议头各字段在包内的字节偏移，供 PacketView 按需读取单个字段
+_SOURCE_SLICE = slice(1, 17)
+_DESTINATION_SLICE = slice(17, 33)
+_TIMESTAMP_STRUCT = struct.Struct("!Q")
+_TIMESTAMP_OFFSET = 33
+_DATA_LENGTH_STRUCT = struct.Struct("!I")
+_DATA_LENGTH_OFFSET = 41
+_CHECKSUM_SLICE = slice(45, 77)
+_PRIORITY_OFFSET = 77
+_DATA_TYPE_OFFSET = 78
+_SEQUENCE_OFFSET = 79
+
+
+class PacketView:
+    """
+    协议包的零拷贝只读视图
+
+    基于 memoryview 按需读取协议头字段，数据部分以 memoryview 切片返回，不拷贝负载；
+    校验和只在调用 verify()/is_valid() 时计算一次并缓存结果。
+    只读取 destination/priority 的转发路径几乎没有额外开销。
+    视图引用原始缓冲区，缓冲区被复用或修改后视图内容随之变化。
+    """
+
+    __slots__ = ("_view", "_verified")
+
+    def __init__(self, packet):
+        view = memoryview(packet)
+        if view.ndim != 1 or view.itemsize != 1:
+            view = view.cast("B")
+        if len(view) < _HEADER_SIZE:
+            raise ProtocolError("协议包长度不足")
+        self._view = view
+        self._verified = None
+
+    @property
+    def version(self) -> int:
+        return self._view[0] & 0x0F
+
+    @property
+    def checksum_method(self) -> str:
+        """协议头中标记的校验和算法"""
+        return _checksum_method_of(self._view[0])
+
+    @property
+    def source_bytes(self) -> bytes:
+        """源地址原始16字节（含补零）"""
+        return bytes(self._view[_SOURCE_SLICE])
+
+    @property
+    def source(self) -> str:
+        return self.source_bytes.decode('utf-8').rstrip('\x00')
+
+    @property
+    def destination_bytes(self) -> bytes:
+        """目的地址原始16字节（含补零），适合作为路由表键，避免解码"""
+        return bytes(self._view[_DESTINATION_SLICE])
+
+    @property
+    def destination(self) -> str:
+        return self.destination_bytes.decode('utf-8').rstrip('\x00')
+
+    @property
+    def timestamp(self) -> int:
+        return _TIMESTAMP_STRUCT.unpack_from(self._view, _TIMESTAMP_OFFSET)[0]
+
+    @property
+    def data_length(self) -> int:
+        return _DATA_LENGTH_STRUCT.unpack_from(self._view, _DATA_LENGTH_OFFSET)[0]
+
+    @property
+    def checksum(self) -> bytes:
+        return bytes(self._view[_CHECKSUM_SLICE])
+
+    @property
+    def priority(self) -> int:
+        return self._view[_PRIORITY_OFFSET]
+
+    @property
+    def data_type(self) -> int:
+        return self._view[_DATA_TYPE_OFFSET]
+
+    @property
+    def sequence(self) -> int:
+        return _DATA_LENGTH_STRUCT.unpack_from(self._view, _SEQUENCE_OFFSET)[0]
+
+    @property
+    def payload(self) -> memoryview:
+        """数据部分的 memoryview（零拷贝），长度与 data_length 不一致时抛出 ProtocolError"""
+        payload = self._view[_HEADER_SIZE:]
+        if len(payload) != self.data_length:
+            raise ProtocolError("数据长度不匹配")
+        return payload
+
+    def header(self) -> tuple:
+        """一次性解析全部协议头字段，返回与 _HEADER_FORMAT 顺序一致的元组"""
+        return _HEADER_STRUCT.unpack_from(self._view)
+
+    def verify(self, checksum_method: str = None) -> "PacketView":
+        """
+        校验数据长度和校验和，失败时抛出 ProtocolError；结果按 (视图, 算法) 缓存，同一算法重复调用不重复计算。
+        缓存假定底层缓冲区在视图存续期间不被修改，修改后应重新构造 PacketView
+
+        参数:
+            checksum_method (str): 校验和算法，默认None表示按协议头中的标志自动识别
+
+        返回:
+            PacketView: 自身，便于链式调用
+        """
+        method = checksum_method or self.checksum_method
+        if self._verified is None or self._verified[0] != method:
+            self._verified = (method, _checksum(self.payload, method) == self.checksum)
+        if not self._verified[1]:
+            raise ProtocolError("数据校验和错误")
+        return self
+
+    def is_valid(self, checksum_method: str = None) -> bool:
+        """校验数据包完整性，返回布尔值而不抛出异常"""
+        try:
+            self.verify(checksum_method)
+        except ProtocolError:
+            return False
+        return True
+
+    def to_dict(self, decode: bool = False) -> dict:
+        """转换为与 unpack_protocol 相同结构的字典（会拷贝数据部分）"""
+        unpacked = self.header()
+        data = bytes(self.payload)
+        if decode:
+            try:
+                data = data.decode('utf-8')
+            except UnicodeDecodeError:
+                data = f"<Binary {len(data)} bytes - 非UTF8可解码>"
+        return {
+            "version": unpacked[0] & 0x0F,
+            "source": unpacked[1].decode('utf-8').rstrip('\x00'),
+            "destination": unpacked[2].decode('utf-8').rstrip('\x00'),
+            "timestamp": unpacked[3],
+            "data_length": unpacked[4],
+            "checksum": unpacked[5].hex(),
+            "checksum_method": _CHECKSUM_NAMES.get(unpacked[0] >> 4),
+            "priority": unpacked[6],
+            "data_type": unpacked[7],
+            "sequence": unpacked[8],
+            "data": data
+        }
+
+
+def parse_packet(packet, verify: bool = False, checksum_method: str = None) -> PacketView:
+    """
+    零拷贝解析协议包，返回惰性读取字段的 PacketView
+
+    参数:
+        packet: 完整协议包（bytes/bytearray/memoryview）
+        verify (bool): 是否立即校验长度和校验和（默认False，可稍后调用 view.verify()）
+        checksum_method (str): 校验和算法，默认None表示按协议头标志自动识别
+
+    返回:
+        PacketView: 协议包视图
+    """
+    view = PacketView(packet)
+    if verify:
+        view.verify(checksum_method)
+    return view
+
+
 def unpack_protocol(
     packet: bytes,
     decode: bool = False,
-    checksum_method: str = "sha256"
+    checksum_method: str = None
 ) -> dict:
     """
     解析协议数据包，支持扩展字段和多种校验和算法
@@ -78,59 +465,17 @@ def unpack_protocol(
     参数:
         packet (bytes): 完整协议包
         decode (bool): 是否将data字段自动解码为utf-8字符串（默认False）
-        checksum_method (str): 校验和算法（"sha256"或"md5"）
+        checksum_method (str): 校验和算法，默认None表示按协议头标志自动识别；
+            解析未携带标志的旧版md5数据包时需显式传入"md5"
 
     返回:
         dict: 协议头信息及数据内容
         其中 data_type 字段含义参见 pack_protocol 的说明
     """
-    if len(packet) < _HEADER_SIZE:
-        raise ProtocolError("协议包长度不足")
-
-    header = packet[:_HEADER_SIZE]
-    data = packet[_HEADER_SIZE:]
-
-    unpacked = struct.unpack(_HEADER_FORMAT, header)
-    version = unpacked[0]
-    source = unpacked[1].decode('utf-8').rstrip('\x00')
-    destination = unpacked[2].decode('utf-8').rstrip('\x00')
-    timestamp = unpacked[3]
-    data_length = unpacked[4]
-    checksum = unpacked[5]
-    priority = unpacked[6]
-    data_type = unpacked[7]
-    sequence = unpacked[8]
-
-    if len(data) != data_length:
-        raise ProtocolError("数据长度不匹配")
-    if _checksum(data, checksum_method) != checksum:
-        raise ProtocolError("数据校验和错误")
-
-    # 尝试解码
-    if decode:
-        try:
-            data_decoded = data.decode('utf-8')
-        except UnicodeDecodeError:
-            data_decoded = f"<Binary {len(data)} bytes - 非UTF8可解码>"
-    else:
-        data_decoded = data
-
-    result = {
-        "version": version,
-        "source": source,
-        "destination": destination,
-        "timestamp": timestamp,
-        "data_length": data_length,
-        "checksum": checksum.hex(),
-        "priority": priority,
-        "data_type": data_type,
-        "sequence": sequence,
-        "data": data_decoded
-    }
-    return result
+    return parse_packet(packet, verify=True, checksum_method=checksum_method).to_dict(decode)
 
 
-def unpack_protocol_to_json(packet: bytes, checksum_method: str = "sha256") -> str:
+def unpack_protocol_to_json(packet: bytes, checksum_method: str = None) -> str:
     """
     解析协议并返回JSON字符串
 
@@ -157,15 +502,15 @@ def extract_header(packet: bytes) -> dict:
     if len(packet) < _HEADER_SIZE:
         raise ProtocolError("协议包长度不足")
 
-    header = packet[:_HEADER_SIZE]
-    unpacked = struct.unpack(_HEADER_FORMAT, header)
+    unpacked = _HEADER_STRUCT.unpack_from(packet)
     return {
-        "version": unpacked[0],
+        "version": unpacked[0] & 0x0F,
         "source": unpacked[1].decode('utf-8').rstrip('\x00'),
         "destination": unpacked[2].decode('utf-8').rstrip('\x00'),
         "timestamp": unpacked[3],
         "data_length": unpacked[4],
         "checksum": unpacked[5].hex(),
+        "checksum_method": _CHECKSUM_NAMES.get(unpacked[0] >> 4),
         "priority": unpacked[6],
         "data_type": unpacked[7],
         "sequence": unpacked[8]
@@ -185,6 +530,47 @@ def extract_data(packet: bytes) -> bytes:
         raise ProtocolError("协议包长度不足")
     return packet[_HEADER_SIZE:]
 
+def benchmark_checksums(payload_sizes=(64, 1024, 16384, 262144), number: int = None) -> list:
+    """
+    比较各校验和算法的单包开销（pack_protocol + unpack_protocol），并打印对比表
+
+    参数:
+        payload_sizes: 待测试的负载长度（字节）
+        number (int): 每组重复次数，默认按负载长度自动选择
+
+    返回:
+        list[dict]: 每行包含 method、payload_size、us_per_packet
+    """
+    import timeit
+
+    rows = []
+    methods = list(_CHECKSUM_IDS)
+    for size in payload_sizes:
+        data = bytes(size)
+        n = number or max(20, 2000000 // (size + 1000))
+        for method in methods:
+            if method == "crc32c" and _crc32c_lib is None and size > 16384:
+                # 纯Python查表实现过慢，大负载时跳过
+                continue
+            packet = pack_protocol(data, "A", "B", checksum_method=method)
+            cost = timeit.timeit(
+                lambda: unpack_protocol(pack_protocol(data, "A", "B", checksum_method=method)),
+                number=n
+            ) / n
+            assert unpack_protocol(packet)["checksum_method"] == method
+            rows.append({"method": method, "payload_size": size, "us_per_packet": cost * 1e6})
+
+    header = f"{'method':<10}" + "".join(f"{str(size) + 'B':>12}" for size in payload_sizes)
+    print(header)
+    for method in methods:
+        cells = []
+        for size in payload_sizes:
+            hit = [r for r in rows if r["method"] == method and r["payload_size"] == size]
+            cells.append(f"{hit[0]['us_per_packet']:>10.2f}us" if hit else f"{'-':>12}")
+        print(f"{method:<10}" + "".join(cells))
+    print("crc32c 实现:", "crc32c 包（加速）" if _crc32c_lib is not None else "纯Python查表（未安装 crc32c 包）")
+    return rows
+
 if __name__ == "__main__":
     # 待发送的数据
     data = "卫星遥测数据".encode("utf-8")
@@ -223,6 +609,13 @@ if __name__ == "__main__":
     data_bytes = extract_data(packet)
     print("原始数据内容：", data_bytes.decode("utf-8"))
 
+    # 6. 使用快速校验和，接收端按协议头标志自动识别算法
+    fast_packet = pack_protocol(data, source, destination, checksum_method="crc32")
+    print("CRC32校验的数据包：", unpack_protocol(fast_packet, decode=True))
+
+    # 7. 各校验和算法单包开销对比
+    benchmark_checksums()
+
 
 # API使用说明
 """
@@ -230,10 +623,12 @@ API接口说明：
 
 1. pack_protocol(data, source, destination, version=1, priority=0, data_type=0, sequence=0, checksum_method="sha256")
    - 功能：封装数据为协议包，支持优先级、数据类型、序列号、校验和算法选择。
+   - checksum_method: "sha256"、"md5"、"crc32"、"crc32c"、"adler32"、"blake2b"，
+     算法标志写入 version 字节高4位（version 取值0~15）。
    - data_type: int，数据类型，可选值及含义：
 
-2. unpack_protocol(packet, decode=False, checksum_method="sha256")
-   - 功能：解析协议包，返回协议头和数据内容，支持校验和算法选择。
+2. unpack_protocol(packet, decode=False, checksum_method=None)
+   - 功能：解析协议包，返回协议头和数据内容；默认按协议头标志自动识别校验和算法。
    - 返回：dict，包含所有字段，data_type 字段含义同上
 
 3. extract_header(packet)
@@ -244,10 +639,26 @@ API接口说明：
    - 功能：仅提取数据部分。
    - 返回：bytes
 
-5. unpack_protocol_to_json(packet, checksum_method="sha256")
+5. unpack_protocol_to_json(packet, checksum_method=None)
    - 功能：解析协议包并返回JSON字符串，便于接口或日志输出。
    - 返回：str
 
+6. pack_protocol_into(buffer, offset, data, source, destination, ...)
+   - 功能：将协议包直接写入调用方提供的 bytearray/memoryview，不拼接中间bytes。
+   - 返回：int，下一个包的写入偏移
+
+7. ProtocolPacker(source, destination, version=1, checksum_method="sha256", capacity=4096)
+   - 功能：缓存地址编码并复用内部缓冲区；pack_many 可将多个包首尾相接写入同一块发送缓冲区。
+   - 返回：memoryview（在下一次 pack/pack_many 前有效）
+
+8. parse_packet(packet, verify=False, checksum_method=None)
+   - 功能：零拷贝解析协议包，字段按需读取，payload 为 memoryview，校验可延后调用 verify()。
+   - 返回：PacketView
+
+9. benchmark_checksums(payload_sizes=(64, 1024, 16384, 262144), number=None)
+   - 功能：测量各校验和算法在不同负载长度下的单包封装+解析耗时，并打印对比表。
+   - 返回：list[dict]
+
 异常：
 - ProtocolError：协议格式或校验错误时抛出
 
@@ -276,6 +687,10 @@ API接口说明：
     仅提取数据部分（bytes）。
 - unpack_protocol_to_json(packet, ...)
     解析协议包并返回JSON字符串，便于接口或日志输出。
+- pack_protocol_into(buffer, offset, data, ...) / ProtocolPacker
+    零拷贝写入调用方或内部复用的缓冲区，适合批量连续发送。
+- parse_packet(packet, verify=False, ...)
+    返回 PacketView，惰性读取协议头字段，零拷贝访问数据，校验可选/延后。
 
 异常：
 - ProtocolError：协议格式或校验错误时抛出
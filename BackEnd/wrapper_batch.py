@@ -0,0 +1,291 @@
+"""
+协议包批量编解码
+
+用与 wrapper._HEADER_FORMAT 完全一致的 numpy 结构化 dtype（大端、83字节）表示协议头，
+一次向量化调用即可封装/解析整批数据包，并可用数组表达式按源地址、目的地址、优先级、
+序列号等字段筛选，适合大规模流量仿真。
+"""
+
+import time
+import numpy as np
+
+from BackEnd.wrapper import (
+    _HEADER_SIZE,
+    _CHECKSUM_NAMES,
+    _checksum,
+    _version_byte,
+    _encode_address,
+    ProtocolError,
+)
+
+# 与 _HEADER_FORMAT = "!B16s16sQI32sBBI" 逐字节对应
+HEADER_DTYPE = np.dtype([
+    ("version", "u1"),
+    ("source", "S16"),
+    ("destination", "S16"),
+    ("timestamp", ">u8"),
+    ("data_length", ">u4"),
+    ("checksum", "S32"),
+    ("priority", "u1"),
+    ("data_type", "u1"),
+    ("sequence", ">u4"),
+])
+assert HEADER_DTYPE.itemsize == _HEADER_SIZE
+
+_HEADER_RANGE = np.arange(_HEADER_SIZE)
+
+
+def _as_address_array(address, n):
+    """将单个地址或地址序列转换为长度为 n 的 S16 数组（超长截断、不足补零）"""
+    if isinstance(address, str):
+        return np.full(n, _encode_address(address), dtype="S16")
+    if isinstance(address, bytes):
+        return np.full(n, address[:16], dtype="S16")
+    arr = np.asarray(address)
+    if arr.dtype.kind == "U":
+        arr = np.char.encode(arr, "utf-8")
+    return arr.astype("S16")
+
+
+def make_headers(
+    source,
+    destination,
+    data_length,
+    sequence=0,
+    priority=0,
+    data_type=0,
+    version: int = 1,
+    checksum_method: str = "sha256",
+    timestamp=None,
+    checksums=None
+) -> np.ndarray:
+    """
+    向量化构造一批协议头
+
+    参数:
+        source / destination: 单个地址（str/bytes）或与包数等长的地址数组
+        data_length: 每个包的数据长度数组（决定包数）
+        sequence / priority / data_type: 标量或数组
+        version (int): 协议版本号（0~15）
+        checksum_method (str): 写入 version 字节高4位的校验和算法标志
+        timestamp: 标量或数组，默认取当前时间
+        checksums: 每个包的32字节校验和（可选，默认全零）
+
+    返回:
+        np.ndarray: dtype 为 HEADER_DTYPE 的结构化数组
+    """
+    data_length = np.asarray(data_length)
+    n = data_length.shape[0]
+    headers = np.zeros(n, dtype=HEADER_DTYPE)
+    headers["version"] = _version_byte(version, checksum_method)
+    headers["source"] = _as_address_array(source, n)
+    headers["destination"] = _as_address_array(destination, n)
+    headers["timestamp"] = int(time.time()) if timestamp is None else timestamp
+    headers["data_length"] = data_length
+    if checksums is not None:
+        headers["checksum"] = checksums
+    headers["priority"] = priority
+    headers["data_type"] = data_type
+    headers["sequence"] = sequence
+    return headers
+
+
+def pack_batch(
+    payloads,
+    source,
+    destination,
+    sequence=None,
+    priority=0,
+    data_type=0,
+    version: int = 1,
+    checksum_method: str = "sha256",
+    timestamp=None
+):
+    """
+    批量封装数据包到一块连续缓冲区
+
+    参数:
+        payloads: 数据列表（bytes/bytearray/memoryview）
+        sequence: 序列号数组，默认从0开始递增
+        其余参数同 make_headers
+
+    返回:
+        (np.ndarray, np.ndarray): (uint8 连续缓冲区, 每个包的起始偏移)
+    """
+    n = len(payloads)
+    lengths = np.fromiter((len(p) for p in payloads), dtype=np.int64, count=n)
+    if sequence is None:
+        sequence = np.arange(n, dtype=np.uint64) & 0xFFFFFFFF
+    # 校验和只能逐包计算（hashlib/zlib 在C层完成）
+    checksums = np.fromiter((_checksum(p, checksum_method) for p in payloads), dtype="S32", count=n)
+    headers = make_headers(source, destination, lengths, sequence, priority, data_type,
+                           version, checksum_method, timestamp, checksums)
+
+    sizes = lengths + _HEADER_SIZE
+    offsets = np.zeros(n, dtype=np.int64)
+    np.cumsum(sizes[:-1], out=offsets[1:])
+    buffer = np.empty(int(sizes.sum()), dtype=np.uint8)
+
+    # 协议头：按行散射到各包起始位置
+    buffer[offsets[:, None] + _HEADER_RANGE] = headers.view(np.uint8).reshape(n, _HEADER_SIZE)
+    # 数据部分：拼接后按包平移到头部之后
+    body = np.frombuffer(b"".join(payloads), dtype=np.uint8)
+    if body.size:
+        body_starts = np.zeros(n, dtype=np.int64)
+        np.cumsum(lengths[:-1], out=body_starts[1:])
+        shift = np.repeat(offsets + _HEADER_SIZE - body_starts, lengths)
+        buffer[np.arange(body.size) + shift] = body
+    return buffer, offsets
+
+
+def scan_offsets(buffer) -> np.ndarray:
+    """
+    顺序扫描首尾相接的数据包，依据 data_length 字段找出每个包的起始偏移
+
+    参数:
+        buffer: 连续的协议包缓冲区
+
+    返回:
+        np.ndarray: 各包起始偏移（int64）
+    """
+    view = memoryview(buffer).cast("B")
+    total = len(view)
+    offsets = []
+    offset = 0
+    while offset < total:
+        if offset + _HEADER_SIZE > total:
+            raise ProtocolError("协议包长度不足")
+        offsets.append(offset)
+        offset += _HEADER_SIZE + int.from_bytes(view[offset + 41:offset + 45], "big")
+    if offset != total:
+        raise ProtocolError("数据长度不匹配")
+    return np.asarray(offsets, dtype=np.int64)
+
+
+def parse_batch(buffer, offsets=None) -> np.ndarray:
+    """
+    向量化解析一批协议头
+
+    参数:
+        buffer: 连续的协议包缓冲区（bytes/bytearray/np.ndarray）
+        offsets: 每个包的起始偏移，默认调用 scan_offsets 自动扫描
+
+    返回:
+        np.ndarray: dtype 为 HEADER_DTYPE 的结构化数组（数据部分位于 offsets + _HEADER_SIZE 处）
+    """
+    raw = np.frombuffer(buffer, dtype=np.uint8)
+    if offsets is None:
+        offsets = scan_offsets(raw)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if offsets.size and offsets.max() + _HEADER_SIZE > raw.size:
+        raise ProtocolError("协议包长度不足")
+    rows = raw[offsets[:, None] + _HEADER_RANGE]
+    return rows.reshape(-1).view(HEADER_DTYPE)
+
+
+def headers_from_bytes(data) -> np.ndarray:
+    """零拷贝地将只含协议头的连续字节（n*83字节）视为结构化数组"""
+    return np.frombuffer(data, dtype=HEADER_DTYPE)
+
+
+def payloads(buffer, headers: np.ndarray, offsets) -> list:
+    """按解析结果返回每个包数据部分的 memoryview 列表（零拷贝）"""
+    view = memoryview(buffer).cast("B")
+    starts = np.asarray(offsets, dtype=np.int64) + _HEADER_SIZE
+    ends = starts + headers["data_length"].astype(np.int64)
+    return [view[s:e] for s, e in zip(starts.tolist(), ends.tolist())]
+
+
+def verify_batch(buffer, headers: np.ndarray, offsets) -> np.ndarray:
+    """逐包校验数据长度和校验和（算法按协议头标志识别），返回布尔数组"""
+    ok = np.zeros(headers.shape[0], dtype=bool)
+    for i, (data, version, checksum) in enumerate(zip(payloads(buffer, headers, offsets),
+                                                       headers["version"].tolist(),
+                                                       headers["checksum"].tolist())):
+        method = _CHECKSUM_NAMES.get(version >> 4)
+        if method is None or len(data) != headers["data_length"][i]:
+            continue
+        # S32 字段取出时会去掉末尾补零，比较前对计算结果做同样处理
+        ok[i] = _checksum(data, method).rstrip(b"\x00") == checksum
+    return ok
+
+
+def versions(headers: np.ndarray) -> np.ndarray:
+    """协议版本号（version 字节低4位）"""
+    return headers["version"] & 0x0F
+
+
+def checksum_ids(headers: np.ndarray) -> np.ndarray:
+    """校验和算法标志（version 字节高4位），对应 wrapper._CHECKSUM_NAMES"""
+    return headers["version"] >> 4
+
+
+def decode_addresses(addresses: np.ndarray) -> np.ndarray:
+    """将 S16 地址数组解码为字符串数组（去掉补零）"""
+    return np.char.decode(addresses, "utf-8")
+
+
+def select(
+    headers: np.ndarray,
+    source=None,
+    destination=None,
+    priority=None,
+    min_priority=None,
+    data_type=None,
+    sequence_range=None
+) -> np.ndarray:
+    """
+    以数组表达式筛选协议头，返回布尔掩码
+
+    参数:
+        source / destination: 地址（str/bytes）或地址列表
+        priority: 优先级值或值列表
+        min_priority: 最低优先级
+        data_type: 数据类型值或值列表
+        sequence_range: (起始, 结束) 半开区间
+
+    返回:
+        np.ndarray: 布尔掩码，可直接用于 headers[mask]
+    """
+    mask = np.ones(headers.shape[0], dtype=bool)
+    for field, value in (("source", source), ("destination", destination)):
+        if value is None:
+            continue
+        if isinstance(value, (str, bytes)):
+            mask &= headers[field] == _as_address_array(value, 1)[0]
+        else:
+            mask &= np.isin(headers[field], _as_address_array(value, len(value)))
+    for field, value in (("priority", priority), ("data_type", data_type)):
+        if value is None:
+            continue
+        mask &= np.isin(headers[field], np.atleast_1d(value))
+    if min_priority is not None:
+        mask &= headers["priority"] >= min_priority
+    if sequence_range is not None:
+        lo, hi = sequence_range
+        seq = headers["sequence"]
+        mask &= (seq >= lo) & (seq < hi)
+    return mask
+
+
+if __name__ == "__main__":
+    from BackEnd.wrapper import unpack_protocol
+
+    n = 200000
+    rng = np.random.default_rng(0)
+    data = [bytes(rng.integers(0, 256, size=int(k), dtype=np.uint8)) for k in rng.integers(0, 64, size=n)]
+    sources = np.array([f"Terminal{i % 8}" for i in range(n)])
+
+    t0 = time.perf_counter()
+    buf, offs = pack_batch(data, sources, "Ground", priority=rng.integers(0, 4, size=n), checksum_method="crc32")
+    t1 = time.perf_counter()
+    hdr = parse_batch(buf)
+    t2 = time.perf_counter()
+    print(f"封装 {n} 个包: {t1 - t0:.3f}s, 解析协议头: {t2 - t1:.3f}s")
+
+    mask = select(hdr, source="Terminal3", min_priority=2, sequence_range=(1000, 50000))
+    print("筛选结果数量:", int(mask.sum()))
+    first = int(np.flatnonzero(mask)[0])
+    end = int(offs[first]) + _HEADER_SIZE + int(hdr["data_length"][first])
+    print("与逐包解析一致:", unpack_protocol(buf[offs[first]:end].tobytes())["sequence"] == hdr["sequence"][first])
+    print("全部校验通过:", bool(verify_batch(buf, hdr, offs).all()))
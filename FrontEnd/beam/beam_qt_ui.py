@@ -310,10 +310,9 @@ class BeamControlUI(QWidget):
             beamwidth = float(self.beamwidth_input.text())
             if bid not in self.bcs.beams:
                 raise ValueError(f"Beam {bid} 不存在")
-            # 调用后端方法设置方向和宽度
-            self.bcs.beams[bid].set_azimuth(azimuth)
-            self.bcs.beams[bid].set_beamwidth(beamwidth)
-            self.bcs.assign_users_to_beams()  # 重新分配用户
+            # 调用后端方法设置方向和宽度（只重新分配受该波束影响的用户）
+            self.bcs.set_beam_azimuth(bid, azimuth)
+            self.bcs.set_beam_beamwidth(bid, beamwidth)
             self.refresh_tables()
             QMessageBox.information(self, "成功", f"Beam {bid} 方向设置为 {azimuth}°，宽度 {beamwidth}°")
         except Exception as e:
@@ -8,8 +8,20 @@ from PyQt5.QtCore import Qt, QTimer
 from OpenGL.GL import *
 from OpenGL.GLU import *
 from OpenGL.GLUT import *
+from BackEnd.constellation import Constellation, ConstellationField
 
 class Satellite:
+    # 绑定到 Constellation 后，以下属性直接读写星座数组中对应的元素
+    constellation = None
+    row = None
+    r = ConstellationField("r")
+    inclination = ConstellationField("inclination")
+    angle = ConstellationField("angle")
+    delta_deg = ConstellationField("delta")
+    x = ConstellationField("positions", 0)
+    y = ConstellationField("positions", 1)
+    z = ConstellationField("positions", 2)
+
     def __init__(self, name, index, r, inclination_deg, angle_deg, delta_deg, callback):
         """初始化卫星对象
 
@@ -42,6 +54,11 @@ class Satellite:
         self.y = self.r * math.sin(angle_rad) * math.cos(self.inclination)
         self.z = self.r * math.sin(angle_rad) * math.sin(self.inclination)
 
+    def bind(self, constellation, row):
+        """绑定为星座第 row 行的视图，之后位置由 Constellation.step 统一更新"""
+        self.constellation = constellation
+        self.row = row
+
 
 class OpenGLWindow(QOpenGLWidget):
     # 地球，卫星模型和纹理路径
@@ -62,6 +79,7 @@ class OpenGLWindow(QOpenGLWidget):
         self.sat_display_list = None
 
         self.satellites = []
+        self.constellation = Constellation([], [], [], [])
 
         self.setAutoFillBackground(False)
         self.setAttribute(Qt.WA_TranslucentBackground, False)
@@ -98,6 +116,8 @@ class OpenGLWindow(QOpenGLWidget):
             Satellite("Sat-B", 1, 2.8, 60, 90, 0.2, self.on_satellite_clicked),
             Satellite("Sat-C", 2, 3.0, 30, 180, 0.2, self.on_satellite_clicked),
         ]
+        # 卫星状态统一保存在星座数组中，每帧一次向量化推进
+        self.constellation = Constellation.from_satellites(self.satellites)
 
     def resizeGL(self, w, h):
         glViewport(0, 0, w, h)
@@ -117,10 +137,14 @@ class OpenGLWindow(QOpenGLWidget):
         glColor3f(1.0, 1.0, 1.0)
         self.draw_textured_sphere(1.5, 32, 32)  # 绘制地球
 
-        # 绘制卫星轨道和卫星模型
-        for sat in self.satellites:
-            self.draw_orbit(sat.r, sat.inclination)
-            self.draw_satellite_model(sat.x, sat.y, sat.z)
+        # 绘制卫星轨道和卫星模型（相同轨道只绘制一次）
+        for r, inclination, raan in self.constellation.orbits():
+            glPushMatrix()
+            glRotatef(math.degrees(raan), 0.0, 0.0, 1.0)
+            self.draw_orbit(r, inclination)
+            glPopMatrix()
+        for x, y, z in self.constellation.positions.tolist():
+            self.draw_satellite_model(x, y, z)
 
         # 添加闪烁轨道
         for i in range(len(self.orbitQueue) - 1):
@@ -128,8 +152,7 @@ class OpenGLWindow(QOpenGLWidget):
         # self.draw_blinking_arc_between(self.satellites[0], self.satellites[1])
 
     def update_frame(self):
-        for sat in self.satellites:
-            sat.update_position()
+        self.constellation.step()
         self.update()
 
     def load_texture(self, texture_file):
@@ -269,15 +292,16 @@ class OpenGLWindow(QOpenGLWidget):
             ray_dir = np.subtract(ray_end, ray_start)
             ray_dir = ray_dir / np.linalg.norm(ray_dir)
 
-            for sat in self.satellites:
-                sat_pos = np.array([sat.x, sat.y, sat.z])
-                to_sat = sat_pos - ray_start
-                proj_len = np.dot(to_sat, ray_dir)
-                closest = ray_start + ray_dir * proj_len
-                dist = np.linalg.norm(closest - sat_pos)
-                if dist < self.sat_scale * 3000:  # 放宽命中半径
-                    sat.callback(sat)
-                    break
+            # 所有卫星到射线的距离一次算出，取第一颗命中的卫星
+            positions = self.constellation.positions
+            to_sat = positions - ray_start
+            proj_len = to_sat @ ray_dir
+            closest = ray_start + proj_len[:, None] * ray_dir
+            dist = np.linalg.norm(closest - positions, axis=1)
+            hits = np.flatnonzero(dist < self.sat_scale * 3000)  # 放宽命中半径
+            if hits.size:
+                sat = self.satellites[hits[0]]
+                sat.callback(sat)
 
     def on_satellite_clicked(self, sat):
         # 去除重复
@@ -7,6 +7,7 @@ from FrontEnd.query.queryClass import QueryWindow
 from FrontEnd.watcher.watcherClass import WatcherWindow, ensure_data_key
 from FrontEnd.beam.beam_qt_ui import BeamControlUI
 import BackEnd.plan_satellite_path as plan_satellite_path
+import BackEnd.route_cache as route_cache
 import BackEnd.bpsk as bpsk
 import BackEnd.qpsk as qpsk
 import BackEnd.ADtrans as ADtrans
@@ -34,6 +35,10 @@ class MainWindow(QMainWindow):
         self.watcher_window = WatcherWindow()
         self.ground_control = BeamControlUI()
 
+        # 路径规划：有序卫星环 + 按拓扑版本缓存的路由表
+        self.ring_planner = plan_satellite_path.RingPlanner()
+        self.route_cache = route_cache.RouteCache()
+
         layout = QVBoxLayout(self.ui.widget)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.addWidget(self.opengl_widget)
@@ -476,19 +481,11 @@ class MainWindow(QMainWindow):
         self.start_sat = self.opengl_widget.clickQueue[-2]
         self.end_sat = self.opengl_widget.clickQueue[-1]
         self.add_log(f"Successfully select 2 satellites: {self.start_sat}, {self.end_sat}")
-        sattelites_dics = []
-        for sat in self.opengl_widget.satellites:
-            sat_data = {
-                "index": sat.index,
-                "name": sat.name,
-                "r": sat.r,
-                "angle": round(sat.angle, 2),
-                "speed": round(1000.0 / self.opengl_widget.update_delta_t * sat.delta_deg, 2)
-            }
-            sattelites_dics.append(sat_data)
-        
-
-        self.opengl_widget.orbitQueue = plan_satellite_path.plan_satellite_path(sattelites_dics, self.start_sat, self.end_sat)
+        sattelites_dics = self.opengl_widget.constellation.satellite_dicts()
+        # 只有环的顺序变化时才更新拓扑，缓存中未受影响的路由继续有效
+        if self.ring_planner.update(sattelites_dics):
+            self.route_cache.update_topology(route_cache.ring_links(self.ring_planner.ring))
+        self.opengl_widget.orbitQueue = self.route_cache.get_or_plan(self.start_sat, self.end_sat, self.ring_planner.plan)
         log = "Best Path:" + ", ".join(map(str, self.opengl_widget.orbitQueue))
         self.add_log(log)
 